@@ -0,0 +1,108 @@
+"""
+Cached cart reads
+
+get_cart renders a cart once, from the cart row and one prefetch of its
+items, and keeps the rendering in the shared cache (Redis in production)
+for CART_CACHE_TTL seconds under a key that includes the cart's version:
+- cart:<id>:version is bumped once every transaction that changes the cart
+  or its items commits (cart.signals, plus explicit bump_cart_version()
+  calls after bulk updates and upserts, which send no signals), so a
+  rendering is never served after a change; old ones simply expire
+- cart:user:<user_id> remembers the user's active cart id, so repeated views
+  of an unchanged cart are answered from the cache alone. Status changes
+  bump the version too, and a pointer to a cart that is no longer active is
+  dropped on the next miss
+
+A version key that was evicted is recreated from the clock, never reusing a
+version a stale rendering could still be stored under.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Cart
+
+KEY_PREFIX = 'cart'
+
+
+def version_key(cart_id):
+    return f"{KEY_PREFIX}:{cart_id}:version"
+
+
+def render_key(cart_id, version):
+    return f"{KEY_PREFIX}:{cart_id}:v{version}"
+
+
+def user_key(user_id):
+    return f"{KEY_PREFIX}:user:{user_id}"
+
+
+def ttl():
+    return getattr(settings, 'CART_CACHE_TTL', 300)
+
+
+def get_cart_version(cart_id):
+    key = version_key(cart_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), ttl())
+        version = cache.get(key)
+    return version
+
+
+def bump_cart_version(*cart_ids, using=None):
+    """Invalidate the cached renderings of `cart_ids` once the current transaction commits."""
+    def bump():
+        for cart_id in cart_ids:
+            try:
+                cache.incr(version_key(cart_id))
+            except ValueError:
+                pass  # No version yet, so nothing was rendered under it
+    transaction.on_commit(bump, using=using)
+
+
+def render_cart(cart):
+    from .serializers import CartSerializer  # serializers -> utils -> this module
+    cart_data = CartSerializer(cart).data
+    return {
+        "cart_id": str(cart.id),
+        "cart": cart_data,
+        "items": cart_data.get("items", [])
+    }
+
+
+def get_cart_payload(user_id=None, cart_id=None):
+    """
+    Rendered active cart of user `user_id`, or anonymous cart `cart_id`.
+    Returns None if there is no such cart.
+    """
+    from_pointer = False
+    if user_id is not None:
+        cart_id = cache.get(user_key(user_id))
+        from_pointer = cart_id is not None
+        if cart_id is None:
+            cart_id = Cart.objects.filter(user_id=user_id, status='active').order_by('-created_at').values_list(
+                'id', flat=True
+            ).first()
+            if cart_id is None:
+                return None
+            cache.set(user_key(user_id), cart_id, ttl())
+
+    # Read the version before the rows, so a change committed meanwhile bumps past what is stored
+    version = get_cart_version(cart_id)
+    payload = cache.get(render_key(cart_id, version))
+    if payload is not None:
+        return payload
+
+    cart = Cart.objects.prefetch_related('items').filter(id=cart_id, user_id=user_id).first()
+    if user_id is not None and (cart is None or cart.status != 'active'):
+        # The remembered cart was checked out, abandoned or deleted
+        cache.delete(user_key(user_id))
+        return get_cart_payload(user_id=user_id) if from_pointer else None
+    if cart is None:
+        return None
+    payload = render_cart(cart)
+    cache.set(render_key(cart_id, version), payload, ttl())
+    return payload
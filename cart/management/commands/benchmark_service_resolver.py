@@ -0,0 +1,46 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from causehive_monolith.service_resolver import get_service_resolver, RESOLVER_BACKENDS, ServiceUnavailable
+from causes.models import Causes
+from users_n_auth.models import User
+
+
+class Command(BaseCommand):
+    help = "Compares per-lookup latency of the in-process and HTTP service resolvers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--backend', action='append', choices=list(RESOLVER_BACKENDS),
+                            help='Backend to benchmark (repeatable). Defaults to all backends.')
+
+    def handle(self, *args, **options):
+        user = User.objects.first()
+        cause = Causes.objects.first()
+        if not user or not cause:
+            raise CommandError("Need at least one user and one cause to benchmark against.")
+
+        for backend in options['backend'] or list(RESOLVER_BACKENDS):
+            resolver = get_service_resolver(backend)
+            for label, lookup, key in (
+                ('get_user', resolver.get_user, user.id),
+                ('get_cause', resolver.get_cause, cause.id),
+            ):
+                timings = []
+                try:
+                    for _ in range(options['iterations']):
+                        started = time.perf_counter()
+                        lookup(key)
+                        timings.append((time.perf_counter() - started) * 1000)
+                except ServiceUnavailable as e:
+                    self.stderr.write(f"{backend:<10} {label:<10} unavailable: {e}")
+                    continue
+
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                self.stdout.write(
+                    f"{backend:<10} {label:<10} mean={statistics.mean(timings):.3f}ms "
+                    f"p50={statistics.median(timings):.3f}ms p95={p95:.3f}ms"
+                )
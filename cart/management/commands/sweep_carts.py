@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from cart.sweeper import sweep_carts
+
+
+class Command(BaseCommand):
+    help = "Deletes expired abandoned, completed and anonymous carts with their items."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted.')
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        reclaimed = sweep_carts(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        verb = 'would be deleted' if options['dry_run'] else 'deleted'
+        for kind, counts in reclaimed.items():
+            self.stdout.write(f"{kind:<10} {counts['carts']} carts, {counts['items']} items {verb}")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_alter_cart_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='cart',
+            name='unique_active_cart_per_user',
+        ),
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['status', 'updated_at', 'id'], name='cart_status_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'active'), ('user_id__isnull', False)), fields=('user_id', 'status'), name='unique_active_cart_per_user'),
+        ),
+    ]
@@ -20,12 +20,17 @@ class Cart(models.Model):
 
     class Meta:
         constraints = [
+            # Anonymous carts (user_id NULL) never conflict, so they are left out of the index
             models.UniqueConstraint(
                 fields=['user_id', 'status'],
-                condition=models.Q(status='active'),
+                condition=models.Q(status='active', user_id__isnull=False),
                 name='unique_active_cart_per_user'
             )
         ]
+        indexes = [
+            # Keyset scans of the cart sweeper (cart.sweeper)
+            models.Index(fields=['status', 'updated_at', 'id'], name='cart_status_updated_idx'),
+        ]
 
 class CartItem(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -19,6 +19,37 @@ class CartItemSerializer(serializers.ModelSerializer):
             'quantity': {'required': False, 'default': 1},
         }
 
+class CartOperationSerializer(serializers.Serializer):
+    """One operation of a batch: add a cause, or update/remove an item of the cart"""
+    op = serializers.ChoiceField(choices=['add', 'update', 'remove'])
+    cause_id = serializers.UUIDField(required=False)
+    donation_amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    item_id = serializers.UUIDField(required=False)
+    quantity = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        required = {
+            'add': ['cause_id', 'donation_amount'],
+            'update': ['item_id', 'quantity'],
+            'remove': ['item_id'],
+        }[attrs['op']]
+        missing = [field for field in required if field not in attrs]
+        if missing:
+            raise serializers.ValidationError({field: f"Required for {attrs['op']}." for field in missing})
+        if attrs['op'] == 'add' and attrs.get('quantity', 1) < 1:
+            raise serializers.ValidationError({'quantity': 'Must be at least 1 for add.'})
+        return attrs
+
+class CartBatchSerializer(serializers.Serializer):
+    cart_id = serializers.UUIDField(required=False)
+    operations = CartOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        limit = getattr(settings, 'CART_BATCH_MAX_OPERATIONS', 100)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} operations per batch.")
+        return value
+
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
 
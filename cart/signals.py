@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cart_cache import bump_cart_version
+from .models import Cart, CartItem
+
+@receiver(post_save, sender=Cart)
+@receiver(post_delete, sender=Cart)
+def invalidate_cart(sender, instance, using=None, **kwargs):
+    bump_cart_version(instance.pk, using=using)
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def invalidate_cart_of_item(sender, instance, using=None, **kwargs):
+    bump_cart_version(instance.cart_id, using=using)
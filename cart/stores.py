@@ -0,0 +1,345 @@
+"""
+Where anonymous carts live
+
+Carts of signed-in users are always Cart/CartItem rows. Anonymous carts
+(user_id None) are kept by the store selected with CART_ANONYMOUS_STORE:
+- database: Cart/CartItem rows, as for users
+- redis: one Redis hash per cart (cart:anon:<cart_id>) that expires
+  CART_ANONYMOUS_TTL seconds after it was last read or written, so
+  drive-by visitors and bots cost no Postgres writes. The cart is written
+  to Postgres only when it is checked out (checkout_cart) or merged into the
+  visitor's own cart when they log in with its cart_id (claim)
+
+Both stores take and return the same shapes, so cart.views does not depend
+on which one is configured. Item ids of Redis carts are derived from the
+cart and cause ids, so they stay stable across requests and promotion.
+"""
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import serializers
+
+from causehive_monolith.streams import get_redis
+from .cart_cache import get_cart_payload, render_cart
+from .models import Cart, CartItem
+from .serializers import CartItemSerializer
+from .utils import (create_user_cart, acquire_user_cart, add_cart_item, add_cart_items,
+                    apply_cart_operations, set_item_quantity, touch_cart)
+
+ITEM_NOT_FOUND = "No CartItem matches the given query."
+
+
+class DatabaseCartStore:
+    """Anonymous carts as Cart/CartItem rows."""
+
+    def _get_or_create(self, cart_id):
+        if cart_id:
+            try:
+                return Cart.objects.get(id=cart_id, user_id=None)
+            except Cart.DoesNotExist:
+                pass
+        return create_user_cart(None)
+
+    def render(self, cart_id):
+        return get_cart_payload(cart_id=cart_id)
+
+    def add_item(self, cart_id, cause_id, donation_amount, quantity=1):
+        """Add to cart `cart_id`, or to a new cart if it does not exist. Returns (cart id, item)."""
+        cart = self._get_or_create(cart_id)
+        return str(cart.id), add_cart_item(cart, cause_id, donation_amount, quantity)
+
+    def apply(self, cart_id, operations):
+        """Apply batch operations (see apply_cart_operations). Returns the rendered cart."""
+        cart = self._get_or_create(cart_id)
+        apply_cart_operations(cart, operations)
+        return render_cart(cart)
+
+    def set_quantity(self, cart_id, item_id, quantity):
+        """Set an item's quantity, removing it at 0 or below; None leaves it as is."""
+        try:
+            cart_item = CartItem.objects.get(id=item_id, cart__id=cart_id, cart__user_id=None)
+        except CartItem.DoesNotExist:
+            raise Http404(ITEM_NOT_FOUND)
+        set_item_quantity(cart_item, quantity)
+
+    def remove_item(self, cart_id, item_id, delete_empty_cart=False):
+        deleted, _ = CartItem.objects.filter(id=item_id, cart__id=cart_id, cart__user_id=None).delete()
+        if not deleted:
+            raise Http404(ITEM_NOT_FOUND)
+        touch_cart(cart_id)
+        if delete_empty_cart:
+            Cart.objects.filter(id=cart_id, user_id=None, items__isnull=True).delete()
+
+    def delete(self, cart_id):
+        """Delete the cart. Returns False if there was none."""
+        deleted, _ = Cart.objects.filter(id=cart_id, user_id=None).delete()
+        return bool(deleted)
+
+    def checkout_cart(self, cart_id):
+        """Return the active Cart to check out, or None."""
+        try:
+            return Cart.objects.get(id=cart_id, user_id=None, status='active')
+        except (Cart.DoesNotExist, ValidationError):
+            return None
+
+    def checked_out(self, cart_id):
+        """Called once the cart returned by checkout_cart() was checked out."""
+
+    def claim(self, cart_id, user_id):
+        """Move the items of anonymous cart `cart_id` into the user's active cart. Returns the number moved."""
+        items = list(CartItem.objects.filter(cart__id=cart_id, cart__user_id=None, cart__status='active'))
+        if not items:
+            return 0
+        with transaction.atomic(using=router.db_for_write(Cart)):
+            add_cart_items(
+                acquire_user_cart(user_id),
+                [(item.cause_id, item.donation_amount, item.quantity) for item in items]
+            )
+            Cart.objects.filter(id=cart_id, user_id=None).delete()
+        return len(items)
+
+
+class RedisCartStore:
+    """Anonymous carts as Redis hashes with a sliding TTL."""
+
+    KEY_PREFIX = 'cart:anon'
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_redis()
+
+    def key(self, cart_id):
+        return f"{self.KEY_PREFIX}:{cart_id}"
+
+    def ttl(self):
+        return getattr(settings, 'CART_ANONYMOUS_TTL', 604800)
+
+    @staticmethod
+    def item_id(cart_id, cause_id):
+        return uuid.uuid5(uuid.UUID(str(cart_id)), str(cause_id))
+
+    @staticmethod
+    def _now():
+        return serializers.DateTimeField().to_representation(timezone.now())
+
+    @staticmethod
+    def _parse_id(cart_id):
+        try:
+            return str(uuid.UUID(str(cart_id))) if cart_id else None
+        except ValueError:
+            return None
+
+    def _load(self, cart_id):
+        """Return (fields, items) of the cart, refreshing its TTL, or None if it does not exist."""
+        cart_id = self._parse_id(cart_id)
+        if cart_id is None:
+            return None
+        pipeline = self.client.pipeline()
+        pipeline.hgetall(self.key(cart_id))
+        pipeline.expire(self.key(cart_id), self.ttl())
+        fields, _ = pipeline.execute()
+        if not fields:
+            return None
+        items = []
+        for field, quantity in fields.items():
+            # A q: field without its a: field is a partial write; the item is gone
+            if field.startswith('q:') and f"a:{field[2:]}" in fields:
+                cause_id = field[2:]
+                items.append(CartItem(
+                    id=self.item_id(cart_id, cause_id), cart_id=cart_id, cause_id=uuid.UUID(cause_id),
+                    donation_amount=Decimal(fields[f"a:{cause_id}"]), quantity=int(quantity)
+                ))
+        return fields, items
+
+    def _find(self, cart_id, item_id):
+        loaded = self._load(cart_id)
+        for item in loaded[1] if loaded else ():
+            if str(item.id) == str(item_id):
+                return item
+        raise Http404(ITEM_NOT_FOUND)
+
+    def _open(self, cart_id):
+        """Id of the existing cart `cart_id`, or of a new cart."""
+        cart_id = self._parse_id(cart_id)
+        if cart_id is None or not self.client.exists(self.key(cart_id)):
+            return str(uuid.uuid4())
+        return cart_id
+
+    def _write(self, cart_id, adds=(), quantities=None, removed=()):
+        """
+        Apply item changes to the cart in one MULTI/EXEC. Returns the results of the adds.
+        Quantities are only set on items still in the cart: the cart is WATCHed
+        and CartItem.DoesNotExist is raised if one was removed meanwhile.
+        """
+        key = self.key(cart_id)
+        quantities = quantities or {}
+        now = self._now()
+
+        def write(pipeline):
+            if quantities:
+                amounts = pipeline.hmget(key, [f"a:{cause_id}" for cause_id in quantities])
+                missing = [str(cause_id) for cause_id, amount in zip(quantities, amounts) if amount is None]
+                if missing:
+                    raise CartItem.DoesNotExist(f"Items not in cart: {', '.join(missing)}")
+            pipeline.multi()
+            pipeline.hsetnx(key, 'created_at', now)
+            pipeline.hset(key, 'updated_at', now)
+            for cause_id, donation_amount, quantity in adds:
+                pipeline.hincrby(key, f"q:{cause_id}", quantity)
+                pipeline.hset(key, f"a:{cause_id}", str(donation_amount))
+            for cause_id, quantity in quantities.items():
+                pipeline.hset(key, f"q:{cause_id}", quantity)
+            for cause_id in removed:
+                pipeline.hdel(key, f"q:{cause_id}", f"a:{cause_id}")
+            pipeline.expire(key, self.ttl())
+
+        if quantities:
+            results = self.client.transaction(write, key)
+        else:
+            pipeline = self.client.pipeline()
+            write(pipeline)
+            results = pipeline.execute()
+        return results[2:2 + 2 * len(adds):2]
+
+    def render(self, cart_id):
+        loaded = self._load(cart_id)
+        if loaded is None:
+            return None
+        fields, items = loaded
+        cart_id = self._parse_id(cart_id)
+        items_data = CartItemSerializer(items, many=True).data
+        return {
+            "cart_id": cart_id,
+            "cart": {
+                "id": cart_id,
+                "user_id": None,
+                "status": "active",
+                "created_at": fields.get('created_at'),
+                "updated_at": fields.get('updated_at'),
+                "items": items_data,
+            },
+            "items": items_data,
+        }
+
+    def add_item(self, cart_id, cause_id, donation_amount, quantity=1):
+        cart_id = self._open(cart_id)
+        stored_quantity, = self._write(cart_id, adds=[(cause_id, donation_amount, quantity)])
+        return cart_id, CartItem(
+            id=self.item_id(cart_id, cause_id), cart_id=cart_id, cause_id=cause_id,
+            donation_amount=donation_amount, quantity=stored_quantity
+        )
+
+    def apply(self, cart_id, operations):
+        cart_id = self._open(cart_id)
+        loaded = self._load(cart_id)
+        causes = {str(item.id): str(item.cause_id) for item in (loaded[1] if loaded else ())}
+        adds = {}
+        quantities = {}
+        for operation in operations:
+            if operation['op'] == 'add':
+                quantity = operation.get('quantity', 1)
+                if operation['cause_id'] in adds:
+                    quantity += adds[operation['cause_id']][1]
+                adds[operation['cause_id']] = (operation['donation_amount'], quantity)
+            else:
+                quantities[str(operation['item_id'])] = operation['quantity'] if operation['op'] == 'update' else 0
+        missing = [item_id for item_id in quantities if item_id not in causes]
+        if missing:
+            raise CartItem.DoesNotExist(f"Items not in cart: {', '.join(missing)}")
+
+        self._write(
+            cart_id,
+            adds=[(cause_id, amount, quantity) for cause_id, (amount, quantity) in adds.items()],
+            quantities={causes[item_id]: quantity for item_id, quantity in quantities.items() if quantity > 0},
+            removed=[causes[item_id] for item_id, quantity in quantities.items() if quantity <= 0],
+        )
+        return self.render(cart_id)
+
+    def set_quantity(self, cart_id, item_id, quantity):
+        item = self._find(cart_id, item_id)
+        if quantity is None:
+            return
+        if quantity <= 0:
+            self._write(item.cart_id, removed=[item.cause_id])
+            return
+        try:
+            self._write(item.cart_id, quantities={item.cause_id: quantity})
+        except CartItem.DoesNotExist:
+            raise Http404(ITEM_NOT_FOUND)  # Removed since _find()
+
+    def remove_item(self, cart_id, item_id, delete_empty_cart=False):
+        item = self._find(cart_id, item_id)
+        self._write(item.cart_id, removed=[item.cause_id])
+        if delete_empty_cart:
+            loaded = self._load(item.cart_id)
+            if loaded is not None and not loaded[1]:
+                self.delete(item.cart_id)
+
+    def delete(self, cart_id):
+        cart_id = self._parse_id(cart_id)
+        return bool(cart_id and self.client.delete(self.key(cart_id)))
+
+    def checkout_cart(self, cart_id):
+        """
+        Write the cart to Postgres, keeping its id and item ids, and return it.
+        The Redis copy stays until checked_out(), so a failed payment can be
+        retried; a retry rewrites the rows from it.
+        """
+        loaded = self._load(cart_id)
+        if loaded is None:
+            return None
+        cart_id = self._parse_id(cart_id)
+        with transaction.atomic(using=router.db_for_write(Cart)):
+            cart, created = Cart.objects.get_or_create(id=cart_id, defaults={'user_id': None, 'status': 'active'})
+            if cart.user_id is not None or cart.status != 'active':
+                return None
+            if not created:
+                cart.items.all().delete()
+            CartItem.objects.bulk_create(loaded[1])
+        return cart
+
+    def checked_out(self, cart_id):
+        self.delete(cart_id)
+
+    def claim(self, cart_id, user_id):
+        loaded = self._load(cart_id)
+        if loaded is None or not loaded[1]:
+            return 0
+        add_cart_items(
+            acquire_user_cart(user_id),
+            [(item.cause_id, item.donation_amount, item.quantity) for item in loaded[1]]
+        )
+        self.delete(cart_id)
+        return len(loaded[1])
+
+
+ANONYMOUS_CART_STORES = {
+    'database': DatabaseCartStore,
+    'redis': RedisCartStore,
+}
+
+_stores = {}
+
+
+def anonymous_carts(backend=None):
+    """Return the store for `backend`, defaulting to CART_ANONYMOUS_STORE."""
+    backend = backend or getattr(settings, 'CART_ANONYMOUS_STORE', 'database')
+    if backend not in _stores:
+        try:
+            _stores[backend] = ANONYMOUS_CART_STORES[backend]()
+        except KeyError:
+            raise ValueError(f"Unknown anonymous cart store: {backend}")
+    return _stores[backend]
+
+
+def claim_anonymous_cart(cart_id, user_id):
+    """Merge anonymous cart `cart_id` into the user's cart, e.g. at login. Returns the number of items moved."""
+    return anonymous_carts().claim(cart_id, user_id)
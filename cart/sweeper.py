@@ -0,0 +1,88 @@
+"""
+Sweeper for carts nobody will use again
+
+sweep_carts() deletes, with their items:
+- abandoned carts untouched for CART_ABANDONED_RETENTION_DAYS. Nothing
+  abandons carts any more (users keep one active cart, see
+  acquire_user_cart); this drains the ones left from before that
+- completed carts older than CART_COMPLETED_RETENTION_DAYS; donations and
+  payments keep everything about a checkout, nothing references its cart
+- anonymous active carts untouched for CART_ANONYMOUS_RETENTION_DAYS
+
+Expired carts are read in keyset-paginated chunks of CART_SWEEP_CHUNK_SIZE
+on (updated_at, id) over the cart_status_updated_idx index, and each chunk is
+deleted in its own short transaction, so a sweep never holds locks on more
+than one chunk however large the backlog. Rows are re-checked when their
+chunk is deleted, so a cart touched after it was read is kept. Item changes
+touch their cart (cart.utils.touch_cart), so they count as activity too.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+
+def expired_carts(now=None):
+    """Return {kind: queryset of expired carts of that kind}."""
+    now = now or timezone.now()
+
+    def before(name, default):
+        return now - timedelta(days=getattr(settings, name, default))
+
+    return {
+        'abandoned': Cart.objects.filter(
+            status='abandoned', updated_at__lt=before('CART_ABANDONED_RETENTION_DAYS', 7)
+        ),
+        'completed': Cart.objects.filter(
+            status='completed', updated_at__lt=before('CART_COMPLETED_RETENTION_DAYS', 30)
+        ),
+        'anonymous': Cart.objects.filter(
+            status='active', user_id__isnull=True, updated_at__lt=before('CART_ANONYMOUS_RETENTION_DAYS', 30)
+        ),
+    }
+
+
+def iter_cart_chunks(queryset, chunk_size):
+    """Yield lists of up to chunk_size ids of `queryset`, oldest first, by keyset on (updated_at, id)."""
+    queryset = queryset.order_by('updated_at', 'id').values_list('updated_at', 'id')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(updated_at__gt=last[0]) | Q(updated_at=last[0], id__gt=last[1]))
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield [cart_id for _, cart_id in chunk]
+        last = chunk[-1]
+
+
+def delete_cart_chunk(queryset, cart_ids):
+    """Delete the carts of `cart_ids` still matching `queryset`, and their items. Returns (carts, items) deleted."""
+    with transaction.atomic(using=router.db_for_write(Cart)):
+        _, deleted = queryset.filter(id__in=cart_ids).delete()
+    return deleted.get(Cart._meta.label, 0), deleted.get(CartItem._meta.label, 0)
+
+
+def sweep_carts(chunk_size=None, dry_run=False, now=None):
+    """
+    Delete expired carts and their items.
+    Returns {kind: {'carts': n, 'items': n}} deleted (or that would be deleted with dry_run).
+    """
+    chunk_size = chunk_size or getattr(settings, 'CART_SWEEP_CHUNK_SIZE', 500)
+    reclaimed = {}
+    for kind, queryset in expired_carts(now).items():
+        counts = reclaimed[kind] = {'carts': 0, 'items': 0}
+        for cart_ids in iter_cart_chunks(queryset, chunk_size):
+            if dry_run:
+                counts['carts'] += len(cart_ids)
+                counts['items'] += CartItem.objects.filter(cart_id__in=cart_ids).count()
+                continue
+            carts, items = delete_cart_chunk(queryset, cart_ids)
+            counts['carts'] += carts
+            counts['items'] += items
+    return reclaimed
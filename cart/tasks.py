@@ -0,0 +1,21 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from .sweeper import sweep_carts
+
+# Held while a sweep runs so beat never starts overlapping sweeps
+SWEEP_LOCK_KEY = 'cart:sweep-lock'
+
+
+@shared_task
+def sweep_expired_carts(dry_run=False):
+    """Delete expired abandoned, completed and anonymous carts (see cart.sweeper)."""
+    if not cache.add(SWEEP_LOCK_KEY, True, timeout=getattr(settings, 'CART_SWEEP_LOCK_TIMEOUT', 3600)):
+        return None
+    try:
+        reclaimed = sweep_carts(dry_run=dry_run)
+        print(f"{'Would reclaim' if dry_run else 'Reclaimed'} carts: {reclaimed}")
+        return reclaimed
+    finally:
+        cache.delete(SWEEP_LOCK_KEY)
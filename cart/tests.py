@@ -1,13 +1,17 @@
 import uuid
 from decimal import Decimal
-from unittest.mock import patch
-from django.test import TestCase
+from unittest.mock import MagicMock, patch
+from django.test import TestCase, TransactionTestCase, override_settings
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.urls import reverse
 
 from .models import Cart, CartItem
 from .serializers import CartItemSerializer
+from donations.models import Donation
+from payments.models import PaymentTransaction
 
 User = get_user_model()
 
@@ -287,6 +291,97 @@ class CheckoutTestCase(APITestCase):
         self.assertFalse(paystack_response['status'])
 
 
+class BatchedCheckoutTestCase(APITestCase):
+    """Test cases for checkout resolving recipients in one batch"""
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user_id=None, status='active')
+        self.cause_ids = [uuid.uuid4() for _ in range(3)]
+        for cause_id in self.cause_ids:
+            CartItem.objects.create(cart=self.cart, cause_id=cause_id, donation_amount=Decimal('10.00'), quantity=2)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_checkout_resolves_recipients_once(self, mock_get_recipients, mock_initialize_payment):
+        """Test a multi-item checkout makes one recipient lookup and bulk creates donations"""
+        recipient_id = uuid.uuid4()
+        mock_get_recipients.return_value = {cause_id: recipient_id for cause_id in self.cause_ids}
+        mock_initialize_payment.return_value = {
+            'status': True,
+            'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-batch'}
+        }
+
+        response = self.client.post(reverse('checkout'), {'cart_id': str(self.cart.id), 'email': 'anon@example.com'})
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_recipients.assert_called_once()
+        self.assertEqual(Donation.objects.filter(cause_id__in=self.cause_ids, recipient_id=recipient_id).count(), 3)
+        self.assertEqual(response.data['total_amount'], Decimal('60.00'))
+        self.assertTrue(PaymentTransaction.objects.filter(transaction_id='ref-batch').exists())
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.status, 'completed')
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_checkout_unknown_cause_creates_nothing(self, mock_get_recipients, mock_initialize_payment):
+        """Test checkout fails before creating donations when a cause cannot be resolved"""
+        mock_get_recipients.side_effect = ValueError('Failed to get cause information')
+
+        response = self.client.post(reverse('checkout'), {'cart_id': str(self.cart.id), 'email': 'anon@example.com'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Donation.objects.filter(cause_id__in=self.cause_ids).exists())
+        mock_initialize_payment.assert_not_called()
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_checkout_payment_settles_every_donation(self, mock_get_recipients, mock_initialize_payment):
+        """Test completing the checkout payment completes all its donations and queues one event each"""
+        from donations.models import DonationOutbox
+        from payments.utils import settle_payment
+        mock_get_recipients.return_value = {cause_id: uuid.uuid4() for cause_id in self.cause_ids}
+        mock_initialize_payment.return_value = {
+            'status': True,
+            'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-settle'}
+        }
+        self.client.post(reverse('checkout'), {'cart_id': str(self.cart.id), 'email': 'anon@example.com'})
+        payment = PaymentTransaction.objects.get(transaction_id='ref-settle')
+        self.assertIsNotNone(payment.checkout_id)
+        self.assertEqual(payment.donations.count(), 3)
+
+        settle_payment('ref-settle', 'success')
+
+        donations = Donation.objects.filter(cause_id__in=self.cause_ids)
+        self.assertEqual(set(donations.values_list('status', flat=True)), {'completed'})
+        self.assertEqual(
+            sorted(DonationOutbox.objects.values_list('partition_key', flat=True)),
+            sorted(str(cause_id) for cause_id in self.cause_ids)
+        )
+
+        # A late duplicate settlement queues nothing more
+        settle_payment('ref-settle', 'success')
+        self.assertEqual(DonationOutbox.objects.count(), 3)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_failed_checkout_payment_fails_every_donation(self, mock_get_recipients, mock_initialize_payment):
+        """Test a failed checkout payment fails all its donations and queues no events"""
+        from donations.models import DonationOutbox
+        from payments.utils import settle_payment
+        mock_get_recipients.return_value = {cause_id: uuid.uuid4() for cause_id in self.cause_ids}
+        mock_initialize_payment.return_value = {
+            'status': True,
+            'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-fail'}
+        }
+        self.client.post(reverse('checkout'), {'cart_id': str(self.cart.id), 'email': 'anon@example.com'})
+
+        settle_payment('ref-fail', 'failed')
+
+        donations = Donation.objects.filter(cause_id__in=self.cause_ids)
+        self.assertEqual(set(donations.values_list('status', flat=True)), {'failed'})
+        self.assertFalse(DonationOutbox.objects.exists())
+
+
 class CartIntegrationTestCase(APITestCase):
     """Integration test cases for cart functionality"""
 
@@ -332,4 +427,767 @@ class CartIntegrationTestCase(APITestCase):
 
         # Test payment initialization
         paystack_response = mock_initialize_payment('test@example.com', 100.00)
-        self.assertTrue(paystack_response['status'])
\ No newline at end of file
+        self.assertTrue(paystack_response['status'])
+
+class ServiceResolverTestCase(TestCase):
+    """Test cases for the in-process and HTTP service resolvers"""
+
+    def setUp(self):
+        from categories.models import Category
+        from causes.models import Causes
+
+        self.user = User.objects.create_user(
+            email='donor@example.com',
+            first_name='Test',
+            last_name='Donor',
+            password='testpass123'
+        )
+        self.cause = Causes.objects.create(
+            name='Resolver Cause',
+            category=Category.objects.create(name='Resolver Category'),
+            organizer_id=self.user.id,
+            target_amount=Decimal('1000.00'),
+        )
+
+    def test_inprocess_user_lookup(self):
+        """Test in-process resolver answers user lookups from the ORM"""
+        from cart.utils import validate_user_id_with_service, get_user_email_from_service
+
+        with override_settings(SERVICE_RESOLVER_BACKEND='inprocess'):
+            self.assertEqual(validate_user_id_with_service(self.user.id), self.user.id)
+            self.assertEqual(get_user_email_from_service(self.user.id), 'donor@example.com')
+            with self.assertRaises(Exception):
+                validate_user_id_with_service(uuid.uuid4())
+
+    def test_inprocess_cause_lookup(self):
+        """Test in-process resolver answers cause lookups from the ORM"""
+        from cart.utils import validate_cause_with_service, get_recipient_id_from_service
+
+        with override_settings(SERVICE_RESOLVER_BACKEND='inprocess'):
+            self.assertEqual(validate_cause_with_service(self.cause.id), self.cause.id)
+            self.assertEqual(get_recipient_id_from_service(self.cause.id), str(self.user.id))
+            with self.assertRaises(ValueError):
+                get_recipient_id_from_service(uuid.uuid4())
+
+    @patch('causehive_monolith.service_resolver.http_client.get')
+    def test_inprocess_resolver_makes_no_http_calls(self, mock_get):
+        """Test in-process resolver never loops back over HTTP"""
+        from cart.utils import validate_user_id_with_service
+
+        with override_settings(SERVICE_RESOLVER_BACKEND='inprocess'):
+            validate_user_id_with_service(self.user.id)
+        mock_get.assert_not_called()
+
+    @patch('causehive_monolith.service_resolver.http_client.get')
+    def test_http_resolver(self, mock_get):
+        """Test HTTP resolver calls the configured user service"""
+        from cart.utils import get_user_email_from_service
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {'id': str(self.user.id), 'email': 'remote@example.com'}
+
+        with override_settings(SERVICE_RESOLVER_BACKEND='http', USER_SERVICE_URL='http://users.internal/api/user'):
+            self.assertEqual(get_user_email_from_service(self.user.id), 'remote@example.com')
+        self.assertEqual(mock_get.call_args[0][0], f'http://users.internal/api/user/users/{self.user.id}/')
+
+    def test_inprocess_malformed_ids_are_not_found(self):
+        """Test malformed ids resolve to nothing instead of raising a database ValidationError"""
+        from causehive_monolith.service_resolver import get_service_resolver
+
+        resolver = get_service_resolver('inprocess', cached=False)
+        self.assertIsNone(resolver.get_user('not-a-uuid'))
+        self.assertIsNone(resolver.get_cause('not-a-uuid'))
+        self.assertIsNone(resolver.get_user_profile('not-a-uuid'))
+        self.assertEqual(list(resolver.get_causes(['not-a-uuid', self.cause.id])), [str(self.cause.id)])
+
+    @patch('causehive_monolith.service_resolver.http_client.get')
+    def test_http_resolver_non_json_response(self, mock_get):
+        """Test a 200 answer that is not JSON is reported as the service being unavailable"""
+        from cart.utils import get_user_email_from_service
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.side_effect = ValueError('Expecting value')
+
+        with override_settings(SERVICE_RESOLVER_BACKEND='http', LOOKUP_CACHE_ENABLED=False):
+            with self.assertRaisesMessage(ValueError, 'User service is not reachable.'):
+                get_user_email_from_service(self.user.id)
+
+    @patch('causehive_monolith.service_resolver.http_client.get')
+    def test_http_bulk_lookup_is_chunked(self, mock_get):
+        """Test bulk cause lookups stay within the bulk endpoint's id limit"""
+        from urllib.parse import parse_qs, urlparse
+        from cart.utils import get_recipient_ids_from_service
+
+        def bulk_details(url, headers=None):
+            ids = parse_qs(urlparse(url).query)['ids'][0].split(',')
+            response = MagicMock(status_code=200 if len(ids) <= 100 else 400)
+            response.json.return_value = [{'id': cause_id, 'organizer_id': str(self.user.id)} for cause_id in ids]
+            return response
+
+        mock_get.side_effect = bulk_details
+        cause_ids = [uuid.uuid4() for _ in range(250)]
+        with override_settings(SERVICE_RESOLVER_BACKEND='http', LOOKUP_CACHE_ENABLED=False):
+            recipients = get_recipient_ids_from_service(cause_ids)
+
+        self.assertEqual(len(recipients), 250)
+        self.assertEqual(mock_get.call_count, 3)
+
+    def test_inprocess_bulk_cause_lookup(self):
+        """Test recipients for many causes are resolved in one lookup"""
+        from cart.utils import get_recipient_ids_from_service
+
+        with override_settings(SERVICE_RESOLVER_BACKEND='inprocess'):
+            recipients = get_recipient_ids_from_service([self.cause.id, self.cause.id])
+        self.assertEqual(recipients, {self.cause.id: str(self.user.id)})
+
+
+class IdempotentCheckoutTestCase(APITestCase):
+    """Test cases for Idempotency-Key handling on checkout and donate"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.cart = Cart.objects.create(user_id=None, status='active')
+        self.cause_ids = [uuid.uuid4() for _ in range(2)]
+        for cause_id in self.cause_ids:
+            CartItem.objects.create(cart=self.cart, cause_id=cause_id, donation_amount=Decimal('10.00'), quantity=1)
+        self.body = {'cart_id': str(self.cart.id), 'email': 'anon@example.com'}
+
+    def checkout(self, key, body=None):
+        return self.client.post(reverse('checkout'), body or self.body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_retried_checkout_replays_response(self, mock_get_recipients, mock_initialize_payment):
+        """Test a retry with the same key gets the first response without a second Paystack transaction"""
+        mock_get_recipients.return_value = {cause_id: uuid.uuid4() for cause_id in self.cause_ids}
+        mock_initialize_payment.return_value = {
+            'status': True,
+            'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-idem'}
+        }
+
+        first = self.checkout('key-1')
+        second = self.checkout('key-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json(), first.json())
+        mock_initialize_payment.assert_called_once()
+        self.assertEqual(PaymentTransaction.objects.count(), 1)
+        self.assertEqual(Donation.objects.count(), 2)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_key_reused_with_different_body(self, mock_get_recipients, mock_initialize_payment):
+        mock_get_recipients.return_value = {cause_id: uuid.uuid4() for cause_id in self.cause_ids}
+        mock_initialize_payment.return_value = {
+            'status': True,
+            'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-idem'}
+        }
+        self.checkout('key-2')
+        response = self.checkout('key-2', {**self.body, 'email': 'other@example.com'})
+        self.assertEqual(response.status_code, 422)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_failed_checkout_releases_key(self, mock_get_recipients, mock_initialize_payment):
+        """Test an error response is not stored, so a retry with the same key runs again"""
+        mock_get_recipients.return_value = {cause_id: uuid.uuid4() for cause_id in self.cause_ids}
+        mock_initialize_payment.side_effect = [
+            {'status': False, 'message': 'Paystack unavailable'},
+            {'status': True, 'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-retry'}},
+        ]
+
+        self.assertEqual(self.checkout('key-3').status_code, 400)
+        self.assertEqual(self.checkout('key-3').status_code, 200)
+        self.assertEqual(mock_initialize_payment.call_count, 2)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_guests_do_not_share_keys(self, mock_get_recipients, mock_initialize_payment):
+        """Test another guest's cart sending the same key is checked out, not served the first response"""
+        other_cart = Cart.objects.create(user_id=None, status='active')
+        CartItem.objects.create(cart=other_cart, cause_id=self.cause_ids[0], donation_amount=Decimal('10.00'), quantity=1)
+        mock_get_recipients.return_value = {cause_id: uuid.uuid4() for cause_id in self.cause_ids}
+        mock_initialize_payment.side_effect = [
+            {'status': True, 'data': {'authorization_url': 'https://checkout.paystack.com/a', 'reference': 'ref-a'}},
+            {'status': True, 'data': {'authorization_url': 'https://checkout.paystack.com/b', 'reference': 'ref-b'}},
+        ]
+
+        first = self.checkout('shared-key')
+        second = self.checkout('shared-key', {**self.body, 'cart_id': str(other_cart.id)})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', second)
+        self.assertNotEqual(second.json()['reference'], first.json()['reference'])
+        self.assertEqual(PaymentTransaction.objects.count(), 2)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_id_from_service')
+    @patch('cart.views.validate_cause_with_service')
+    def test_retried_donate_creates_one_donation(self, mock_validate_cause, mock_get_recipient, mock_initialize_payment):
+        mock_get_recipient.return_value = uuid.uuid4()
+        mock_initialize_payment.return_value = {
+            'status': True,
+            'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-donate'}
+        }
+        body = {'cause_id': str(uuid.uuid4()), 'donation_amount': '25.00', 'email': 'anon@example.com'}
+
+        for _ in range(3):
+            response = self.client.post(reverse('donate'), body, format='json', HTTP_IDEMPOTENCY_KEY='donate-1')
+            self.assertEqual(response.status_code, 200)
+        mock_initialize_payment.assert_called_once()
+        self.assertEqual(Donation.objects.filter(cause_id=body['cause_id']).count(), 1)
+
+
+class ConcurrentIdempotentCheckoutTestCase(TransactionTestCase):
+    """Test that concurrent duplicates of one checkout wait for the first instead of racing it"""
+
+    def test_concurrent_duplicates_start_one_payment(self):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from django.core.cache import cache
+        from django.db import connections
+        from rest_framework.test import APIClient
+
+        cache.clear()
+        cart = Cart.objects.create(user_id=None, status='active')
+        cause_id = uuid.uuid4()
+        CartItem.objects.create(cart=cart, cause_id=cause_id, donation_amount=Decimal('10.00'), quantity=1)
+        started = threading.Event()
+
+        def slow_initialize(email, amount):
+            started.set()
+            time.sleep(0.3)
+            return {'status': True, 'data': {'authorization_url': 'https://checkout.paystack.com/abc', 'reference': 'ref-race'}}
+
+        def post(_):
+            try:
+                return APIClient().post(
+                    reverse('checkout'), {'cart_id': str(cart.id), 'email': 'anon@example.com'},
+                    format='json', HTTP_IDEMPOTENCY_KEY='race-key'
+                )
+            finally:
+                connections.close_all()
+
+        with patch('cart.views.get_recipient_ids_from_service', return_value={cause_id: uuid.uuid4()}), \
+                patch('cart.views.Paystack.initialize_payment', side_effect=slow_initialize) as mock_initialize:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                first = executor.submit(post, 0)
+                started.wait(timeout=5)
+                responses = list(executor.map(post, range(3))) + [first.result()]
+
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        self.assertEqual(len({response.json()['reference'] for response in responses}), 1)
+        mock_initialize.assert_called_once()
+        self.assertEqual(PaymentTransaction.objects.count(), 1)
+
+
+class AtomicCartUpsertTestCase(APITestCase):
+    """Test cases for adding to a cart with one upsert statement"""
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user_id=None, status='active')
+        self.cause_id = uuid.uuid4()
+        throttle = patch('rest_framework.throttling.UserRateThrottle.allow_request', return_value=True)
+        throttle.start()
+        self.addCleanup(throttle.stop)
+
+    def test_add_creates_then_increments_item(self):
+        """Test a second add of the same cause tops up the existing item"""
+        from .utils import add_cart_item
+
+        first = add_cart_item(self.cart, self.cause_id, Decimal('10.00'), 2)
+        second = add_cart_item(self.cart, self.cause_id, Decimal('15.00'), 3)
+
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(second.quantity, 5)
+        self.assertEqual(second.donation_amount, Decimal('15.00'))
+        self.assertEqual(CartItem.objects.get(cart=self.cart, cause_id=self.cause_id).quantity, 5)
+
+    def test_add_to_cart_view_upserts(self):
+        """Test the add_to_cart view reports the item as stored after the upsert"""
+        body = {'cart_id': str(self.cart.id), 'cause_id': str(self.cause_id), 'donation_amount': '10.00', 'quantity': 1}
+        self.client.post(reverse('add_to_cart'), body, format='json')
+        response = self.client.post(reverse('add_to_cart'), body, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['item']['quantity'], 2)
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 1)
+
+    def test_acquire_user_cart_reuses_active_cart(self):
+        """Test acquiring a user's cart creates it once and then returns it"""
+        from .utils import acquire_user_cart
+
+        user_id = uuid.uuid4()
+        cart = acquire_user_cart(user_id)
+        self.assertEqual(acquire_user_cart(user_id).id, cart.id)
+        self.assertEqual(Cart.objects.filter(user_id=user_id, status='active').count(), 1)
+
+    def test_anonymous_cart_creation_leaves_other_carts_active(self):
+        """Test starting an anonymous cart does not abandon other visitors' carts"""
+        from .utils import create_user_cart
+
+        create_user_cart(None)
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.status, 'active')
+
+
+class ConcurrentCartUpsertTestCase(TransactionTestCase):
+    """Stress tests for concurrent adds to one cart"""
+
+    workers = 8
+    adds = 40
+
+    def setUp(self):
+        from django.db import connection
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Shared-cache in-memory SQLite fails concurrent writers instead of queueing them")
+        # Every request comes from the same test client address
+        throttle = patch('rest_framework.throttling.UserRateThrottle.allow_request', return_value=True)
+        throttle.start()
+        self.addCleanup(throttle.stop)
+
+    def run_parallel(self, func):
+        from concurrent.futures import ThreadPoolExecutor
+        from django.db import connections
+
+        def run(i):
+            try:
+                return func(i)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(run, range(self.adds)))
+
+    def test_parallel_adds_lose_no_increment(self):
+        """Test every concurrent add of the same cause is counted exactly once"""
+        from rest_framework.test import APIClient
+
+        cart = Cart.objects.create(user_id=None, status='active')
+        cause_id = uuid.uuid4()
+        body = {'cart_id': str(cart.id), 'cause_id': str(cause_id), 'donation_amount': '5.00', 'quantity': 1}
+
+        responses = self.run_parallel(lambda _: APIClient().post(reverse('add_to_cart'), body, format='json'))
+
+        self.assertEqual([response.status_code for response in responses], [201] * self.adds)
+        item = CartItem.objects.get(cart=cart, cause_id=cause_id)
+        self.assertEqual(item.quantity, self.adds)
+
+    def test_parallel_acquisition_shares_one_active_cart(self):
+        """Test concurrent first adds for a user end up in a single active cart"""
+        from .utils import acquire_user_cart, add_cart_item
+
+        user_id = uuid.uuid4()
+        cause_id = uuid.uuid4()
+
+        carts = self.run_parallel(lambda _: add_cart_item(acquire_user_cart(user_id), cause_id, Decimal('5.00')).cart_id)
+
+        self.assertEqual(len(set(carts)), 1)
+        self.assertEqual(Cart.objects.filter(user_id=user_id, status='active').count(), 1)
+        self.assertEqual(CartItem.objects.get(cart_id=carts[0], cause_id=cause_id).quantity, self.adds)
+
+
+class BatchCartTestCase(APITestCase):
+    """Test cases for applying several cart operations in one request"""
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user_id=None, status='active')
+        self.kept = CartItem.objects.create(cart=self.cart, cause_id=uuid.uuid4(), donation_amount=Decimal('10.00'))
+        self.dropped = CartItem.objects.create(cart=self.cart, cause_id=uuid.uuid4(), donation_amount=Decimal('20.00'))
+        throttle = patch('rest_framework.throttling.UserRateThrottle.allow_request', return_value=True)
+        throttle.start()
+        self.addCleanup(throttle.stop)
+
+    def post_batch(self, operations):
+        return self.client.post(
+            reverse('batch_cart'), {'cart_id': str(self.cart.id), 'operations': operations}, format='json'
+        )
+
+    def test_batch_applies_adds_updates_and_removes(self):
+        """Test one batch adds, updates and removes items and returns the resulting cart"""
+        new_cause = uuid.uuid4()
+        response = self.post_batch([
+            {'op': 'add', 'cause_id': str(new_cause), 'donation_amount': '5.00', 'quantity': 1},
+            {'op': 'add', 'cause_id': str(new_cause), 'donation_amount': '5.00', 'quantity': 2},
+            {'op': 'update', 'item_id': str(self.kept.id), 'quantity': 4},
+            {'op': 'remove', 'item_id': str(self.dropped.id)},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cart_id'], str(self.cart.id))
+        self.assertEqual(len(response.data['items']), 2)
+        self.assertEqual(CartItem.objects.get(id=self.kept.id).quantity, 4)
+        self.assertFalse(CartItem.objects.filter(id=self.dropped.id).exists())
+        self.assertEqual(CartItem.objects.get(cart=self.cart, cause_id=new_cause).quantity, 3)
+
+    def test_update_to_zero_removes_item(self):
+        """Test updating an item to quantity 0 removes it, like update_cart_item"""
+        response = self.post_batch([{'op': 'update', 'item_id': str(self.kept.id), 'quantity': 0}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(CartItem.objects.filter(id=self.kept.id).exists())
+
+    def test_unknown_item_rolls_back_whole_batch(self):
+        """Test a batch naming an item outside the cart changes nothing"""
+        other = CartItem.objects.create(
+            cart=Cart.objects.create(user_id=None, status='active'), cause_id=uuid.uuid4(), donation_amount=Decimal('1.00')
+        )
+        response = self.post_batch([
+            {'op': 'add', 'cause_id': str(uuid.uuid4()), 'donation_amount': '5.00'},
+            {'op': 'remove', 'item_id': str(other.id)},
+        ])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 2)
+        self.assertTrue(CartItem.objects.filter(id=other.id).exists())
+
+    def test_operation_missing_fields(self):
+        """Test operations are validated per kind"""
+        response = self.post_batch([{'op': 'update', 'item_id': str(self.kept.id)}])
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CART_BATCH_MAX_OPERATIONS=2)
+    def test_batch_size_limit(self):
+        """Test batches larger than CART_BATCH_MAX_OPERATIONS are rejected"""
+        response = self.post_batch([{'op': 'remove', 'item_id': str(self.kept.id)}] * 3)
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_items(self):
+        """Test syncing 20 items costs the same few queries as syncing one"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        operations = [
+            {'op': 'add', 'cause_id': str(uuid.uuid4()), 'donation_amount': '5.00', 'quantity': 1} for _ in range(20)
+        ] + [{'op': 'update', 'item_id': str(self.kept.id), 'quantity': 2}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_batch(operations)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 22)
+        self.assertLessEqual(len(queries), 8)
+
+
+class CachedCartReadTestCase(APITestCase):
+    """Test cases for serving get_cart from the versioned cart cache"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.cart = Cart.objects.create(user_id=None, status='active')
+        self.item = CartItem.objects.create(cart=self.cart, cause_id=uuid.uuid4(), donation_amount=Decimal('10.00'))
+        throttle = patch('rest_framework.throttling.UserRateThrottle.allow_request', return_value=True)
+        throttle.start()
+        self.addCleanup(throttle.stop)
+
+    def get_cart(self):
+        return self.client.get(reverse('get_cart'), {'cart_id': str(self.cart.id)})
+
+    def test_repeated_reads_skip_database(self):
+        """Test an unchanged cart is served from the cache without queries"""
+        first = self.get_cart()
+        with self.assertNumQueries(0):
+            second = self.get_cart()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(second.data['items']), 1)
+
+    def test_miss_prefetches_items(self):
+        """Test a cache miss loads the cart and its items in two queries"""
+        CartItem.objects.create(cart=self.cart, cause_id=uuid.uuid4(), donation_amount=Decimal('5.00'))
+        with self.assertNumQueries(2):
+            response = self.get_cart()
+        self.assertEqual(len(response.data['items']), 2)
+
+    def test_upsert_invalidates_cached_cart(self):
+        """Test adding through the upsert is visible on the next read"""
+        self.get_cart()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('add_to_cart'), {
+                'cart_id': str(self.cart.id), 'cause_id': str(self.item.cause_id), 'donation_amount': '10.00'
+            }, format='json')
+
+        self.assertEqual(self.get_cart().data['items'][0]['quantity'], 2)
+
+    def test_item_save_and_delete_invalidate_cached_cart(self):
+        """Test item changes made through the ORM bump the cart version"""
+        self.get_cart()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.quantity = 5
+            self.item.save()
+        self.assertEqual(self.get_cart().data['items'][0]['quantity'], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.delete()
+        self.assertEqual(self.get_cart().data['items'], [])
+
+    def test_checked_out_cart_is_no_longer_served_to_user(self):
+        """Test a user's remembered cart is dropped once it is no longer active"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user = User.objects.create_user(email='cart@example.com', first_name='Cart', last_name='User', password='pass12345')
+        cart = Cart.objects.create(user_id=user.id, status='active')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+        with patch('cart.views.validate_user_id_with_service'):
+            self.assertEqual(self.client.get(reverse('get_cart')).data['cart_id'], str(cart.id))
+            with self.captureOnCommitCallbacks(execute=True):
+                cart.status = 'completed'
+                cart.save()
+            response = self.client.get(reverse('get_cart'))
+
+        self.assertIsNone(response.data['cart'])
+
+
+@override_settings(CART_ANONYMOUS_STORE='redis', CART_ANONYMOUS_TTL=3600)
+class RedisAnonymousCartTestCase(APITestCase):
+    """Test cases for anonymous carts kept in Redis until checkout or login"""
+
+    def setUp(self):
+        import fakeredis
+        from causehive_monolith import streams
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        streams.set_redis(self.redis)
+        self.addCleanup(streams.set_redis, None)
+        throttle = patch('rest_framework.throttling.UserRateThrottle.allow_request', return_value=True)
+        throttle.start()
+        self.addCleanup(throttle.stop)
+        self.cause_id = uuid.uuid4()
+
+    def add(self, cart_id=None, cause_id=None, quantity=1):
+        body = {'cause_id': str(cause_id or self.cause_id), 'donation_amount': '10.00', 'quantity': quantity}
+        if cart_id:
+            body['cart_id'] = cart_id
+        return self.client.post(reverse('add_to_cart'), body, format='json')
+
+    def test_anonymous_adds_write_no_rows(self):
+        """Test anonymous adds go to a Redis hash with a TTL and render like database carts"""
+        cart_id = self.add().data['cart_id']
+        response = self.add(cart_id, quantity=2)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['cart_id'], cart_id)
+        self.assertEqual(response.data['item']['quantity'], 3)
+        self.assertFalse(Cart.objects.exists())
+        self.assertFalse(CartItem.objects.exists())
+        self.assertGreater(self.redis.ttl(f"cart:anon:{cart_id}"), 0)
+
+        cart = self.client.get(reverse('get_cart'), {'cart_id': cart_id}).data
+        self.assertEqual(cart['cart']['status'], 'active')
+        self.assertEqual(cart['items'], [response.data['item']])
+
+    def test_update_remove_and_batch(self):
+        """Test item endpoints and batches work against Redis carts"""
+        added = self.add().data
+        cart_id, item_id = added['cart_id'], added['item']['id']
+
+        response = self.client.patch(
+            reverse('update_cart_item', args=[item_id]), {'cart_id': cart_id, 'quantity': 4}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        other = uuid.uuid4()
+        batch = self.client.post(reverse('batch_cart'), {'cart_id': cart_id, 'operations': [
+            {'op': 'add', 'cause_id': str(other), 'donation_amount': '3.00', 'quantity': 2},
+        ]}, format='json')
+        self.assertEqual(sorted(item['quantity'] for item in batch.data['items']), [2, 4])
+
+        response = self.client.delete(reverse('remove_from_cart', args=[item_id]) + f'?cart_id={cart_id}')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(self.client.get(reverse('get_cart'), {'cart_id': cart_id}).data['items']), 1)
+
+        response = self.client.delete(reverse('remove_from_cart', args=[item_id]) + f'?cart_id={cart_id}')
+        self.assertEqual(response.status_code, 400)
+
+    def test_quantity_update_loses_to_concurrent_remove(self):
+        """Test a quantity set after the item was removed leaves no orphaned field behind"""
+        from .stores import RedisCartStore
+        added = self.add().data
+        cart_id, item_id = added['cart_id'], added['item']['id']
+        store = RedisCartStore(self.redis)
+        found = store._find
+
+        def find_then_remove(*args):
+            item = found(*args)
+            RedisCartStore(self.redis).remove_item(cart_id, item_id)  # lands between the read and the write
+            return item
+
+        with patch.object(store, '_find', side_effect=find_then_remove):
+            with self.assertRaises(Http404):
+                store.set_quantity(cart_id, item_id, 5)
+
+        self.assertNotIn(f"q:{self.cause_id}", self.redis.hgetall(f"cart:anon:{cart_id}"))
+        response = self.client.get(reverse('get_cart'), {'cart_id': cart_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['items'], [])
+
+    def test_orphaned_quantity_field_is_skipped(self):
+        """Test a cart with a partial item write stays readable"""
+        cart_id = self.add().data['cart_id']
+        self.redis.hset(f"cart:anon:{cart_id}", f"q:{uuid.uuid4()}", 3)
+
+        response = self.client.get(reverse('get_cart'), {'cart_id': cart_id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 1)
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_ids_from_service')
+    def test_checkout_promotes_cart(self, mock_get_recipients, mock_initialize_payment):
+        """Test checkout writes the cart to Postgres once payment starts and drops the Redis copy"""
+        added = self.add().data
+        cart_id = added['cart_id']
+        mock_get_recipients.return_value = {self.cause_id: uuid.uuid4()}
+        mock_initialize_payment.return_value = {'status': False, 'message': 'Paystack is down'}
+
+        failed = self.client.post(reverse('checkout'), {'cart_id': cart_id, 'email': 'a@example.com'}, format='json')
+        self.assertEqual(failed.status_code, 400)
+        self.assertTrue(self.redis.exists(f"cart:anon:{cart_id}"))
+
+        mock_initialize_payment.return_value = {
+            'status': True, 'data': {'authorization_url': 'https://checkout.paystack.com/x', 'reference': 'ref-redis'}
+        }
+        response = self.client.post(reverse('checkout'), {'cart_id': cart_id, 'email': 'a@example.com'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        cart = Cart.objects.get(id=cart_id)
+        self.assertEqual(cart.status, 'completed')
+        self.assertEqual([str(item.id) for item in cart.items.all()], [added['item']['id']])
+        self.assertFalse(self.redis.exists(f"cart:anon:{cart_id}"))
+        self.assertEqual(Donation.objects.get().amount, Decimal('10.00'))
+
+    @patch('cart.views.Paystack.initialize_payment')
+    @patch('cart.views.get_recipient_id_from_service')
+    @patch('cart.views.validate_cause_with_service')
+    def test_donate_leaves_no_cart(self, mock_validate_cause, mock_get_recipient, mock_initialize_payment):
+        """Test an anonymous donation removes its item and the emptied Redis cart"""
+        mock_get_recipient.return_value = uuid.uuid4()
+        mock_initialize_payment.return_value = {
+            'status': True, 'data': {'authorization_url': 'https://checkout.paystack.com/x', 'reference': 'ref-donate'}
+        }
+        response = self.client.post(reverse('donate'), {
+            'cause_id': str(self.cause_id), 'donation_amount': '7.50', 'quantity': 2, 'email': 'a@example.com'
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_amount'], Decimal('15.00'))
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(self.redis.keys('cart:anon:*'), [])
+
+    def test_login_merges_anonymous_cart(self):
+        """Test logging in with a cart_id moves the anonymous cart into the user's cart"""
+        user = User.objects.create_user(email='merge@example.com', first_name='M', last_name='U', password='pass12345')
+        existing = Cart.objects.create(user_id=user.id, status='active')
+        CartItem.objects.create(cart=existing, cause_id=self.cause_id, donation_amount=Decimal('10.00'), quantity=1)
+        cart_id = self.add(quantity=2).data['cart_id']
+
+        response = self.client.post('/api/user/auth/login/', {
+            'email': 'merge@example.com', 'password': 'pass12345', 'cart_id': cart_id
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CartItem.objects.get(cart=existing, cause_id=self.cause_id).quantity, 3)
+        self.assertFalse(self.redis.exists(f"cart:anon:{cart_id}"))
+
+
+class CartSweeperTestCase(TestCase):
+    """Test cases for deleting expired carts in keyset-paginated chunks"""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self.old = timezone.now() - timedelta(days=60)
+
+    def make_cart(self, status, user_id=None, old=True, items=1):
+        cart = Cart.objects.create(user_id=user_id, status=status)
+        for _ in range(items):
+            CartItem.objects.create(cart=cart, cause_id=uuid.uuid4(), donation_amount=Decimal('1.00'))
+        if old:
+            Cart.objects.filter(id=cart.id).update(updated_at=self.old)
+        return cart
+
+    def test_sweep_deletes_expired_carts_and_items(self):
+        """Test expired abandoned, completed and anonymous carts go, live carts stay"""
+        from .sweeper import sweep_carts
+
+        expired = [self.make_cart('abandoned', uuid.uuid4()), self.make_cart('completed', uuid.uuid4(), items=2),
+                   self.make_cart('active')]
+        kept = [self.make_cart('active', uuid.uuid4()), self.make_cart('abandoned', uuid.uuid4(), old=False),
+                self.make_cart('active', old=False)]
+
+        reclaimed = sweep_carts()
+
+        self.assertEqual(reclaimed, {
+            'abandoned': {'carts': 1, 'items': 1},
+            'completed': {'carts': 1, 'items': 2},
+            'anonymous': {'carts': 1, 'items': 1},
+        })
+        self.assertFalse(Cart.objects.filter(id__in=[cart.id for cart in expired]).exists())
+        self.assertEqual(Cart.objects.filter(id__in=[cart.id for cart in kept]).count(), 3)
+        self.assertEqual(CartItem.objects.count(), 3)
+
+    def test_sweep_pages_through_chunks(self):
+        """Test a backlog larger than one chunk is swept completely"""
+        from .sweeper import sweep_carts
+
+        for _ in range(5):
+            self.make_cart('abandoned', uuid.uuid4())
+
+        self.assertEqual(sweep_carts(chunk_size=2)['abandoned'], {'carts': 5, 'items': 5})
+        self.assertFalse(Cart.objects.exists())
+
+    def test_dry_run_deletes_nothing(self):
+        """Test a dry run reports what would be reclaimed without deleting it"""
+        from .sweeper import sweep_carts
+
+        for _ in range(3):
+            self.make_cart('completed', uuid.uuid4())
+
+        self.assertEqual(sweep_carts(chunk_size=2, dry_run=True)['completed'], {'carts': 3, 'items': 3})
+        self.assertEqual(Cart.objects.count(), 3)
+
+    def test_chunk_keeps_carts_touched_since_read(self):
+        """Test a cart changed after its chunk was read is not deleted"""
+        from .sweeper import expired_carts, delete_cart_chunk
+
+        stale = self.make_cart('active')
+        touched = self.make_cart('active')
+        queryset = expired_carts()['anonymous']
+        cart_ids = [stale.id, touched.id]
+        touched.save()
+
+        self.assertEqual(delete_cart_chunk(queryset, cart_ids), (1, 1))
+        self.assertTrue(Cart.objects.filter(id=touched.id).exists())
+
+    def test_item_activity_keeps_anonymous_cart(self):
+        """Test adding, updating or removing items counts as activity on an old anonymous cart"""
+        from .stores import DatabaseCartStore
+        from .sweeper import sweep_carts
+        from .utils import add_cart_item, apply_cart_operations, set_item_quantity
+
+        added, batched, updated, removed = (self.make_cart('active', items=2) for _ in range(4))
+        add_cart_item(added, uuid.uuid4(), Decimal('2.00'))
+        apply_cart_operations(batched, [{'op': 'update', 'item_id': batched.items.first().id, 'quantity': 3}])
+        set_item_quantity(updated.items.first(), 4)
+        DatabaseCartStore().remove_item(removed.id, removed.items.first().id)
+
+        self.assertEqual(sweep_carts()['anonymous'], {'carts': 0, 'items': 0})
+        self.assertEqual(Cart.objects.count(), 4)
+
+    def test_task_skips_while_another_sweep_runs(self):
+        """Test the periodic task does not overlap a running sweep"""
+        from django.core.cache import cache
+        from .tasks import SWEEP_LOCK_KEY, sweep_expired_carts
+
+        self.make_cart('abandoned', uuid.uuid4())
+        cache.set(SWEEP_LOCK_KEY, True)
+        self.addCleanup(cache.delete, SWEEP_LOCK_KEY)
+        self.assertIsNone(sweep_expired_carts())
+        self.assertEqual(Cart.objects.count(), 1)
+
+        cache.delete(SWEEP_LOCK_KEY)
+        self.assertEqual(sweep_expired_carts()['abandoned']['carts'], 1)
@@ -1,4 +1,5 @@
-from .views import (add_to_cart, update_cart_item, checkout, get_cart, remove_from_cart, delete_cart, donate)
+from .views import (add_to_cart, update_cart_item, checkout, get_cart, remove_from_cart, delete_cart, donate,
+                    batch_cart)
 from django.urls import path
 
 urlpatterns = [
@@ -7,6 +8,7 @@ urlpatterns = [
     path('update/<uuid:item_id>/', update_cart_item, name='update_cart_item'),
     path('remove/<uuid:item_id>/', remove_from_cart, name='remove_from_cart'),
     path('delete/', delete_cart, name='delete_cart'),
+    path('batch/', batch_cart, name='batch_cart'),
     path('checkout/', checkout, name='checkout'),
     path('donate/', donate, name='donate'),
 ]
\ No newline at end of file
@@ -1,60 +1,42 @@
+import uuid
 from functools import wraps
 
-import requests
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Case, PositiveIntegerField, Value, When
+from django.utils import timezone
 from rest_framework import serializers
-from django.conf import settings
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import AccessToken
 
-from cart.models import Cart
+from cart.models import Cart, CartItem
+from cart.cart_cache import bump_cart_version
+from causehive_monolith.service_resolver import get_service_resolver, ServiceUnavailable
 
 
 def validate_user_id_with_service(value, request=None):
-    user_service_url = getattr(settings, 'USER_SERVICE_URL', 'http://localhost:8000/user/auth')
-    url = f"{user_service_url}/users/{value}/"
-    headers = {}
-    if request and hasattr(request, 'headers'):
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
-            headers['Authorization'] = auth_header
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise serializers.ValidationError('User not found in user service.')
-        user_data = response.json()
-        if 'id' in user_data:
-            return value
-        else:
-            raise serializers.ValidationError('User is not valid.')
-
-    except requests.RequestException:
+        user_data = get_service_resolver().get_user(value, request)
+    except ServiceUnavailable:
         raise serializers.ValidationError('User service is not reachable.')
 
-    except Exception as e:
-        raise serializers.ValidationError(f'An error occurred while validating user: {str(e)}')
+    if user_data is None:
+        raise serializers.ValidationError('User not found in user service.')
+    if 'id' not in user_data:
+        raise serializers.ValidationError('User is not valid.')
+    return value
 
 def validate_cause_with_service(value, request=None):
-    cause_service_url = getattr(settings, 'CAUSE_SERVICE_URL', 'http://localhost:8001/causes')
-    url = f"{cause_service_url}/details/{value}/"
-    headers = {}
-    if request and hasattr(request, 'headers'):
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
-            headers['Authorization'] = auth_header
     try:
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise serializers.ValidationError('Cause service is not reachable.')
-        cause_data = response.json()
-        if 'id' in cause_data:
-            return value
-        else:
-            raise serializers.ValidationError('Cause is not valid.')
-    except requests.RequestException:
+        cause_data = get_service_resolver().get_cause(value, request)
+    except ServiceUnavailable:
         raise serializers.ValidationError('Cause service is not reachable.')
-    except Exception as e:
-        raise serializers.ValidationError(f'An error occurred while validating cause: {str(e)}')
+
+    if cause_data is None:
+        raise serializers.ValidationError('Cause not found in cause service.')
+    if 'id' not in cause_data:
+        raise serializers.ValidationError('Cause is not valid.')
+    return value
 
 
 def get_user_email_from_service(user_id, request=None):
@@ -62,56 +44,53 @@ def get_user_email_from_service(user_id, request=None):
     Get user email from user service.
     Returns email if found, raises exception if not.
     """
-    user_service_url = getattr(settings, 'USER_SERVICE_URL', 'http://localhost:8000/user')
-    url = f"{user_service_url}/users/{user_id}/"
-    headers = {}
-    if request and hasattr(request, 'headers'):
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
-            headers['Authorization'] = auth_header
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise ValueError('User not found in user service.')
+        user_data = get_service_resolver().get_user(user_id, request)
+    except ServiceUnavailable:
+        raise ValueError('User service is not reachable.')
 
-        user_data = response.json()
-        email = user_data.get('email')
+    if user_data is None:
+        raise ValueError('User not found in user service.')
 
-        if not email:
-            raise ValueError('User email not found in user service.')
+    email = user_data.get('email')
+    if not email:
+        raise ValueError('User email not found in user service.')
+    return email
 
-        return email
+def get_recipient_id_from_service(cause_id, request=None):
+    try:
+        cause_data = get_service_resolver().get_cause(cause_id, request)
+    except ServiceUnavailable:
+        raise ValueError('Cause service is not reachable.')
 
-    except requests.RequestException:
-        raise ValueError('User service is not reachable.')
-    except Exception as e:
-        raise ValueError(f'Failed to get user email: {str(e)}')
+    if cause_data is None:
+        raise ValueError(f'Failed to get {cause_id} information')
 
-def get_recipient_id_from_service(cause_id, request=None):
-    cause_service_url = getattr(settings, 'CAUSE_SERVICE_URL', 'http://localhost:8001/causes')
-    url = f"{cause_service_url}/details/{cause_id}/"
-    headers = {}
-    if request and hasattr(request, 'headers'):
-        auth_header = request.headers.get('Authorization')
-        if auth_header:
-            headers['Authorization'] = auth_header
+    recipient_id = cause_data.get('organizer_id')  # organizer_id is the recipient
+    if not recipient_id:
+        raise ValueError(f'Recipient not found for cause {cause_id}')
+    return recipient_id
 
+def get_recipient_ids_from_service(cause_ids, request=None):
+    """
+    Resolve the recipient of every cause in one lookup.
+    Returns {cause_id: recipient_id}, raises ValueError if any cause is missing.
+    """
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise ValueError(f'Failed to get {cause_id} information')
+        causes = get_service_resolver().get_causes(cause_ids, request)
+    except ServiceUnavailable:
+        raise ValueError('Cause service is not reachable.')
 
-        cause_data = response.json()
+    recipients = {}
+    for cause_id in cause_ids:
+        cause_data = causes.get(str(cause_id))
+        if cause_data is None:
+            raise ValueError(f'Failed to get {cause_id} information')
         recipient_id = cause_data.get('organizer_id')  # organizer_id is the recipient
-
         if not recipient_id:
             raise ValueError(f'Recipient not found for cause {cause_id}')
-        return recipient_id
-
-    except requests.RequestException:
-        raise ValueError('Cause service is not reachable.')
-    except Exception as e:
-        return ValueError(f'Failed to get recipient information for cause {cause_id}: {str(e)}')
+        recipients[cause_id] = recipient_id
+    return recipients
 
 def get_or_create_user_cart(user_id):
     try:
@@ -134,12 +113,138 @@ def create_user_cart(user_id):
     Create a new cart for the user.
     Returns the created cart.
     """
-    # Mark any existing active cart as abandoned
-    Cart.objects.filter(user_id=user_id, status='active').update(status='abandoned')
+    # Mark any existing active cart as abandoned; anonymous carts (user_id None) are independent
+    if user_id is not None:
+        active = Cart.objects.filter(user_id=user_id, status='active')
+        bump_cart_version(*active.values_list('id', flat=True), using=router.db_for_write(Cart))
+        active.update(status='abandoned')
 
     cart = Cart.objects.create(user_id=user_id, status='active')
     return cart
 
+def acquire_user_cart(user_id, attempts=3):
+    """
+    Return the user's active cart, creating it if there is none.
+    Concurrent callers get the same cart: unique_active_cart_per_user lets
+    only one insert win and the others read the cart it created.
+    """
+    using = router.db_for_write(Cart)
+    for _ in range(attempts):
+        cart = Cart.objects.filter(user_id=user_id, status='active').order_by('-created_at').first()
+        if cart is not None:
+            return cart
+        try:
+            with transaction.atomic(using=using):
+                return Cart.objects.create(user_id=user_id, status='active')
+        except IntegrityError:
+            continue  # Another request created the active cart first
+    raise IntegrityError(f"Could not acquire an active cart for user {user_id}")
+
+def touch_cart(cart_id, using=None):
+    """
+    Mark the cart as updated now. Item changes do not save the Cart row, so
+    they call this; cart.sweeper expires anonymous carts by updated_at.
+    """
+    using = using or router.db_for_write(Cart)
+    Cart.objects.db_manager(using).filter(pk=cart_id).update(updated_at=timezone.now())
+
+def add_cart_items(cart, items):
+    """
+    Add (cause_id, donation_amount, quantity) items to the cart, topping up
+    items already there, in one INSERT ... ON CONFLICT (cart_id, cause_id)
+    DO UPDATE statement, so concurrent adds neither lose an increment nor
+    trip the unique constraint. The latest donation_amount wins. Each cause
+    may appear once. Returns the items as stored.
+    """
+    if not items:
+        return []
+    using = router.db_for_write(CartItem)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = CartItem._meta
+    fields = [opts.get_field(name) for name in ('id', 'cart', 'cause_id', 'donation_amount', 'quantity')]
+    params = []
+    for cause_id, donation_amount, quantity in items:
+        values = (uuid.uuid4(), cart.pk, cause_id, donation_amount, quantity)
+        params.extend(field.get_db_prep_save(value, connection) for field, value in zip(fields, values))
+
+    table = qn(opts.db_table)
+    quantity_column = qn(opts.get_field('quantity').column)
+    amount_column = qn(opts.get_field('donation_amount').column)
+    row = f"({', '.join(['%s'] * len(fields))})"
+    sql = (
+        f"INSERT INTO {table} ({', '.join(qn(field.column) for field in fields)}) "
+        f"VALUES {', '.join([row] * len(items))} "
+        f"ON CONFLICT ({qn(opts.get_field('cart').column)}, {qn(opts.get_field('cause_id').column)}) DO UPDATE SET "
+        f"{quantity_column} = {table}.{quantity_column} + EXCLUDED.{quantity_column}, "
+        f"{amount_column} = EXCLUDED.{amount_column} "
+        f"RETURNING {', '.join(qn(field.column) for field in opts.concrete_fields)}"
+    )
+    stored = list(CartItem.objects.db_manager(using).raw(sql, params))
+    touch_cart(cart.pk, using=using)
+    bump_cart_version(cart.pk, using=using)
+    return stored
+
+def add_cart_item(cart, cause_id, donation_amount, quantity=1):
+    """Add `quantity` of a cause to the cart with add_cart_items(). Returns the item as stored."""
+    return add_cart_items(cart, [(cause_id, donation_amount, quantity)])[0]
+
+def set_item_quantity(cart_item, quantity):
+    """Set the item's quantity, removing it at 0 or below; None leaves it unchanged."""
+    if quantity is None:
+        return
+    if quantity <= 0:
+        cart_item.delete()
+    else:
+        cart_item.quantity = quantity
+        cart_item.save()
+    touch_cart(cart_item.cart_id)
+
+def apply_cart_operations(cart, operations):
+    """
+    Apply validated batch operations to the cart in one transaction:
+    - adds are merged per cause and written with one upsert
+    - updates set absolute quantities with one UPDATE; a quantity of 0 removes the item
+    - removes are done with one DELETE
+    Updates and removes address items of this cart by id, the last operation
+    on an item winning, and run after the adds. Raises CartItem.DoesNotExist,
+    leaving the cart untouched, if any of those items is not in the cart.
+    """
+    adds = {}
+    quantities = {}
+    for operation in operations:
+        if operation['op'] == 'add':
+            quantity = operation.get('quantity', 1)
+            if operation['cause_id'] in adds:
+                quantity += adds[operation['cause_id']][1]
+            adds[operation['cause_id']] = (operation['donation_amount'], quantity)
+        elif operation['op'] == 'update':
+            quantities[operation['item_id']] = operation['quantity']
+        else:
+            quantities[operation['item_id']] = 0
+
+    with transaction.atomic(using=router.db_for_write(CartItem)):
+        add_cart_items(cart, [(cause_id, amount, quantity) for cause_id, (amount, quantity) in adds.items()])
+        if not quantities:
+            return
+        if not adds:
+            touch_cart(cart.pk)  # add_cart_items already did
+        found = set(CartItem.objects.filter(cart=cart, id__in=quantities).values_list('id', flat=True))
+        missing = [str(item_id) for item_id in quantities if item_id not in found]
+        if missing:
+            raise CartItem.DoesNotExist(f"Items not in cart: {', '.join(missing)}")
+
+        updates = {item_id: quantity for item_id, quantity in quantities.items() if quantity > 0}
+        if updates:
+            CartItem.objects.filter(cart=cart, id__in=updates).update(quantity=Case(
+                *[When(id=item_id, then=Value(quantity)) for item_id, quantity in updates.items()],
+                output_field=PositiveIntegerField()
+            ))
+            bump_cart_version(cart.pk, using=router.db_for_write(CartItem))
+        removed = [item_id for item_id, quantity in quantities.items() if quantity <= 0]
+        if removed:
+            CartItem.objects.filter(cart=cart, id__in=removed).delete()
+
 def validate_request(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
@@ -1,5 +1,8 @@
+import uuid
+
 from django.contrib.admindocs.views import user_has_model_view_permission
 from django.core.serializers import serialize
+from django.db import router, transaction
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
@@ -8,11 +11,17 @@ from rest_framework import status
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
 from .models import Cart, CartItem
-from .serializers import CartSerializer, CartItemSerializer
+from .cart_cache import get_cart_payload, render_cart
+from .stores import anonymous_carts
+from .serializers import CartItemSerializer, CartBatchSerializer
 from .utils import (validate_user_id_with_service, validate_cause_with_service,
                     validate_request, get_user_email_from_service,
-                    get_recipient_id_from_service, get_or_create_user_cart, create_user_cart)
+                    get_recipient_id_from_service, get_recipient_ids_from_service,
+                    get_or_create_user_cart,
+                    acquire_user_cart, add_cart_item, apply_cart_operations, set_item_quantity,
+                    touch_cart)
 from .decorators import extract_user_from_token
+from donations.idempotency import idempotent
 from donations.models import Donation
 from payments.models import PaymentTransaction
 from payments.paystack import Paystack
@@ -30,43 +39,19 @@ def get_cart(request):
     # Validate user ID with the user service if the user is authenticated
     if is_authenticated(request):
         validate_user_id_with_service(request.user_id, request)
-
-        try:
-            cart, created = get_or_create_user_cart(request.user_id)
-            serializer = CartSerializer(cart)
-            return Response({
-                "cart_id": str(cart.id),
-                "cart": serializer.data,
-                "items": serializer.data.get("items", [])
-            }, status=status.HTTP_200_OK)
-        except Cart.DoesNotExist:
-            return Response({
-                "message": "No active cart found",
-                "cart": None,
-                "items": []
-            }, status=status.HTTP_200_OK)
+        payload = get_cart_payload(user_id=request.user_id)
     elif cart_id:
-        try:
-            cart = Cart.objects.get(id=cart_id, user_id=None)
-            serializer = CartSerializer(cart)
-            return Response({
-                "cart_id": str(cart_id),
-                "cart": serializer.data,
-                "items": serializer.data.get("items", [])
-            }, status=status.HTTP_200_OK)
-        except Cart.DoesNotExist:
-            return Response({
-                "message": "No active cart found",
-                "cart": None,
-                "items": []
-            }, status=status.HTTP_200_OK)
-
+        payload = anonymous_carts().render(cart_id)
     else:
+        payload = None
+
+    if payload is None:
         return Response({
             "message": "No active cart found",
             "cart": None,
             "items": []
         }, status=status.HTTP_200_OK)
+    return Response(payload, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -77,45 +62,21 @@ def add_to_cart(request):
     cart_id = request.data.get('cart_id')
     serializer = CartItemSerializer(data=request.data)
     if serializer.is_valid():
+        item = (
+            serializer.validated_data['cause_id'],
+            serializer.validated_data['donation_amount'],
+            serializer.validated_data.get('quantity', 1)
+        )
         if is_authenticated(request):
             validate_user_id_with_service(request.user_id, request)
-            user_id = request.user_id
-            try:
-                cart, created = get_or_create_user_cart(user_id)
-            except Cart.DoesNotExist:
-                  # Create a new cart if it doesn't exist
-                 cart = create_user_cart(user_id)
+            cart = acquire_user_cart(request.user_id)
+            cart_id, cart_item = str(cart.id), add_cart_item(cart, *item)
         else:
-            user_id = None
-            if cart_id:
-                try:
-                    cart = Cart.objects.get(id=cart_id, user_id=None)
-                except Cart.DoesNotExist:
-                    cart = create_user_cart(user_id)
-            else:
-                cart = create_user_cart(user_id)
-
-        existing_item = CartItem.objects.filter(
-            cart=cart,
-            cause_id=serializer.validated_data['cause_id']
-        ).first()
-
-        if existing_item:
-            existing_item.quantity += serializer.validated_data.get('quantity', 1)
-            existing_item.donation_amount = serializer.validated_data['donation_amount']
-            existing_item.save()
-            item_data = CartItemSerializer(existing_item).data
-        else:
-            cart_item = CartItem.objects.create(
-                cart=cart,
-                cause_id=serializer.validated_data['cause_id'],
-                quantity=serializer.validated_data.get('quantity', 1),
-                donation_amount=serializer.validated_data['donation_amount']
-            )
-            item_data = CartItemSerializer(cart_item).data
+            cart_id, cart_item = anonymous_carts().add_item(cart_id, *item)
+        item_data = CartItemSerializer(cart_item).data
 
         return Response({
-            "cart_id": str(cart.id),
+            "cart_id": cart_id,
             "item": item_data
         }, status=status.HTTP_201_CREATED)
 
@@ -163,21 +124,18 @@ def add_to_cart(request):
 @validate_request
 def update_cart_item(request, item_id):
     cart_id = request.data.get('cart_id') or request.query_params.get('cart_id')
+    quantity = request.data.get('quantity')
     if is_authenticated(request):
         validate_user_id_with_service(request.user_id, request)
         cart_item = get_object_or_404(CartItem, id=item_id, cart__user_id=request.user_id)
+        set_item_quantity(cart_item, quantity)
     elif cart_id:
-        cart_item = get_object_or_404(CartItem, id=item_id, cart__id=cart_id, cart__user_id=None)
+        anonymous_carts().set_quantity(cart_id, item_id, quantity)
     else:
         return Response({"error": "cart_id is required for anonymous users"}, status=status.HTTP_400_BAD_REQUEST)
 
-    quantity = request.data.get('quantity', cart_item.quantity)
-    if quantity <= 0:
-        cart_item.delete()
+    if quantity is not None and quantity <= 0:
         return Response({"message": "Item removed from cart"}, status=status.HTTP_204_NO_CONTENT)
-
-    cart_item.quantity = quantity
-    cart_item.save()
     return Response({"message": "Cart item updated"}, status=status.HTTP_200_OK)
 
     # if is_authenticated(request):
@@ -205,11 +163,12 @@ def remove_from_cart(request, item_id):
     if is_authenticated(request):
         validate_user_id_with_service(request.user_id, request)
         cart_item = get_object_or_404(CartItem, id=item_id, cart__user_id=request.user_id)
+        cart_item.delete()
+        touch_cart(cart_item.cart_id)
     elif cart_id:
-        cart_item = get_object_or_404(CartItem, id=item_id, cart__id=cart_id, cart__user_id=None)
+        anonymous_carts().remove_item(cart_id, item_id)
     else:
         return Response({"error": "cart_id is required for anonymous users"}, status=status.HTTP_400_BAD_REQUEST)
-    cart_item.delete()
     return Response({"message": "Item removed from cart"}, status=status.HTTP_204_NO_CONTENT)
 
     # if is_authenticated(request):
@@ -231,16 +190,14 @@ def delete_cart(request):
             cart, created = get_or_create_user_cart(request.user_id)
         except Cart.DoesNotExist:
             return Response({"message": "No active cart found"}, status=status.HTTP_404_NOT_FOUND)
+        cart.items.all().delete()
+        cart.delete()
     elif cart_id:
-        try:
-            cart = Cart.objects.get(id=cart_id, user_id=None)
-        except Cart.DoesNotExist:
+        if not anonymous_carts().delete(cart_id):
             return Response({"message": "No active cart found"}, status=status.HTTP_404_NOT_FOUND)
     else:
         return Response({"error": "cart_id is required for anonymous users"}, status=status.HTTP_400_BAD_REQUEST)
 
-    cart.items.all().delete()
-    cart.delete()
     return Response({"message": "Cart deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
 
     # if is_authenticated(request):
@@ -265,47 +222,68 @@ def delete_cart(request):
 @permission_classes([AllowAny])
 @extract_user_from_token
 @validate_request
+def batch_cart(request):
+    """
+    Apply a list of add/update/remove operations to the cart in one request
+    and return the resulting cart, e.g.
+    {"cart_id": ..., "operations": [
+        {"op": "add", "cause_id": ..., "donation_amount": "10.00", "quantity": 1},
+        {"op": "update", "item_id": ..., "quantity": 3},
+        {"op": "remove", "item_id": ...}]}
+    """
+    serializer = CartBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    operations = serializer.validated_data['operations']
+    try:
+        if is_authenticated(request):
+            validate_user_id_with_service(request.user_id, request)
+            cart = acquire_user_cart(request.user_id)
+            apply_cart_operations(cart, operations)
+            payload = render_cart(cart)
+        else:
+            payload = anonymous_carts().apply(serializer.validated_data.get('cart_id'), operations)
+    except CartItem.DoesNotExist as e:
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(payload, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@extract_user_from_token
+@validate_request
+@idempotent('checkout')
 def checkout(request):
     if is_authenticated(request):
         user_id = request.user_id
+        try:
+            cart, created = get_or_create_user_cart(user_id)
+        except Cart.DoesNotExist:
+            return Response({"message": "No active cart not found"}, status=status.HTTP_404_NOT_FOUND)
     else:
         user_id = None
+        cart = anonymous_carts().checkout_cart(request.data.get('cart_id'))
+        if cart is None:
+            return Response({"message": "No active cart not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    try:
-        cart = Cart.objects.get(user_id=request.user.id, status='active')
-    except Cart.DoesNotExist:
-        return Response({"message": "No active cart not found"}, status=status.HTTP_404_NOT_FOUND)
-    except Cart.MultipleObjectsReturned:
-        cart = Cart.objects.filter(user_id=request.user.id, status='active')
-
-    if not cart.items.exists():
+    items = list(cart.items.all())
+    if not items:
         return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
 
-    total_amount = sum(item.donation_amount * item.quantity for item in cart.items.all())
-
-    donations = []
-    for item in cart.items.all():
-        # Get recipient ID from cause service
-        try:
-            recipient_id = get_recipient_id_from_service(item.cause_id, request)
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        donation = Donation.objects.create(
-            user_id=request.user_id,
-            cause_id=item.cause_id,
-            amount=item.donation_amount * item.quantity,
-            currency='GHS',
-            status='pending',
-            recipient_id=recipient_id
-        )
-        donations.append(donation)
+    total_amount = sum(item.donation_amount * item.quantity for item in items)
 
+    # Resolve every recipient in a single lookup instead of one per item
+    try:
+        recipients = get_recipient_ids_from_service([item.cause_id for item in items], request)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     # Get user email from user_service if registered else request it in the body
     if user_id:
         try:
-            user_email = get_user_email_from_service(request.user_id, request)
+            user_email = get_user_email_from_service(user_id, request)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     else:
@@ -318,17 +296,35 @@ def checkout(request):
 
     if paystack_response['status']:
         data = paystack_response['data']
-        payment_transaction = PaymentTransaction.objects.create(
-            donation=donations[0],
-            user_id=request.user_id,
-            amount=total_amount,
-            currency='GHS',
-            transaction_id=data['reference'],
-            status='pending',
-            payment_method='Paystack',
-        )
-        cart.status = 'completed'
-        cart.save()
+        # One payment settles every donation of the checkout through checkout_id
+        checkout_id = uuid.uuid4()
+        with transaction.atomic(using=router.db_for_write(Donation)):
+            donations = Donation.objects.bulk_create([
+                Donation(
+                    user_id=user_id,
+                    cause_id=item.cause_id,
+                    amount=item.donation_amount * item.quantity,
+                    currency='GHS',
+                    status='pending',
+                    recipient_id=recipients[item.cause_id],
+                    checkout_id=checkout_id
+                )
+                for item in items
+            ])
+            payment_transaction = PaymentTransaction.objects.create(
+                donation=donations[0],
+                checkout_id=checkout_id,
+                user_id=user_id,
+                amount=total_amount,
+                currency='GHS',
+                transaction_id=data['reference'],
+                status='pending',
+                payment_method='Paystack',
+            )
+            cart.status = 'completed'
+            cart.save(update_fields=['status', 'updated_at'])
+        if user_id is None:
+            anonymous_carts().checked_out(cart.id)
         return Response({
             'authorization_url': data['authorization_url'],
             'reference': data['reference'],
@@ -343,6 +339,7 @@ def checkout(request):
 @permission_classes([AllowAny])
 @extract_user_from_token
 @validate_request
+@idempotent('donate')
 def donate(request):
     # First handle the cart operations (similar to add_to_cart)
     cart_id = request.data.get('cart_id')
@@ -357,42 +354,20 @@ def donate(request):
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Handle cart creation/retrieval
+    # Handle cart creation/retrieval and add/update item in cart
+    item = (
+        serializer.validated_data['cause_id'],
+        serializer.validated_data['donation_amount'],
+        serializer.validated_data.get('quantity', 1)
+    )
     if is_authenticated(request):
         validate_user_id_with_service(request.user_id, request)
         user_id = request.user_id
-        try:
-            cart, created = get_or_create_user_cart(user_id)
-        except Cart.DoesNotExist:
-            cart = create_user_cart(user_id)
+        cart = acquire_user_cart(user_id)
+        cart_item = add_cart_item(cart, *item)
     else:
         user_id = None
-        if cart_id:
-            try:
-                cart = Cart.objects.get(id=cart_id, user_id=None)
-            except Cart.DoesNotExist:
-                cart = create_user_cart(user_id)
-        else:
-            cart = create_user_cart(user_id)
-
-    # Add/update item in cart
-    existing_item = CartItem.objects.filter(
-        cart=cart,
-        cause_id=serializer.validated_data['cause_id']
-    ).first()
-
-    if existing_item:
-        existing_item.quantity += serializer.validated_data.get('quantity', 1)
-        existing_item.donation_amount = serializer.validated_data['donation_amount']
-        existing_item.save()
-        cart_item = existing_item
-    else:
-        cart_item = CartItem.objects.create(
-            cart=cart,
-            cause_id=serializer.validated_data['cause_id'],
-            quantity=serializer.validated_data.get('quantity', 1),
-            donation_amount=serializer.validated_data['donation_amount']
-        )
+        cart_id, cart_item = anonymous_carts().add_item(cart_id, *item)
 
     # Now handle the checkout process
     total_amount = cart_item.donation_amount * cart_item.quantity
@@ -440,9 +415,12 @@ def donate(request):
         )
 
         # Mark cart item as processed (or remove it)
-        cart_item.delete()
-        if not cart.items.exists():
-            cart.delete()
+        if user_id:
+            cart_item.delete()
+            if not cart.items.exists():
+                cart.delete()
+        else:
+            anonymous_carts().remove_item(cart_id, cart_item.id, delete_empty_cart=True)
 
         return Response({
             'authorization_url': data['authorization_url'],
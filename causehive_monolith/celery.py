@@ -6,6 +6,7 @@ for background task processing.
 """
 import os
 from celery import Celery
+from celery.signals import task_prerun, task_postrun
 
 # Set the default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'causehive_monolith.settings')
@@ -18,3 +19,16 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+
+
+@task_prerun.connect
+def open_lookup_scope(task=None, **kwargs):
+    """Memoize user/cause lookups for the duration of each task."""
+    from .lookup_scope import enter_lookup_scope
+    task.request.lookup_scope_token = enter_lookup_scope()
+
+
+@task_postrun.connect
+def close_lookup_scope(task=None, **kwargs):
+    from .lookup_scope import exit_lookup_scope
+    exit_lookup_scope(getattr(task.request, 'lookup_scope_token', None))
@@ -1,12 +1,19 @@
 """
 Health check views for Railway deployment monitoring
 """
+import os
+
 from django.http import JsonResponse
 from django.db import connections
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 import logging
 
+from users_n_auth.permissions import IsAdminService
+from .lookup_cache import lookup_cache
+
 logger = logging.getLogger(__name__)
 
 @csrf_exempt
@@ -53,3 +60,12 @@ def readiness_check(request):
     except Exception as e:
         logger.error(f"Readiness check failed: {e}")
         return JsonResponse({"status": "not_ready", "error": str(e)}, status=503)
+
+@api_view(["GET"])
+@permission_classes([IsAdminService])
+def cache_stats(request):
+    """
+    Hit/miss counters of the user/cause lookup cache for this worker process.
+    Admin service only (X-ADMIN-SERVICE-API-KEY)
+    """
+    return Response({"pid": os.getpid(), "lookup_cache": lookup_cache.stats()})
@@ -0,0 +1,101 @@
+"""
+Shared HTTP client for CauseHive Monolith
+
+All outbound calls (Paystack, the HTTP service resolver, admin report
+fetches) go through one process-wide requests.Session so connections are
+kept alive and reused instead of paying a TCP+TLS handshake per call.
+
+- Per-host connection pools sized by HTTP_CLIENT_POOL_CONNECTIONS (hosts)
+  and HTTP_CLIENT_POOL_MAXSIZE (connections per host)
+- Default (connect, read) timeout on every call unless the caller passes one
+- Bounded retries with jittered exponential backoff; only idempotent verbs
+  are retried on read errors and 502/503/504 responses
+
+The module mirrors the requests API (get/post/patch/...), so call sites only
+swap `requests.get(...)` for `http_client.get(...)`. requests exceptions are
+raised unchanged.
+"""
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUS_CODES = (502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def default_timeout():
+    return (
+        getattr(settings, 'HTTP_CLIENT_CONNECT_TIMEOUT', 3.05),
+        getattr(settings, 'HTTP_CLIENT_READ_TIMEOUT', 10),
+    )
+
+
+def build_session():
+    """Build a session with pooled, retrying adapters for http and https."""
+    retry = Retry(
+        total=getattr(settings, 'HTTP_CLIENT_MAX_RETRIES', 2),
+        backoff_factor=getattr(settings, 'HTTP_CLIENT_BACKOFF_FACTOR', 0.3),
+        backoff_jitter=getattr(settings, 'HTTP_CLIENT_BACKOFF_JITTER', 0.2),
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=getattr(settings, 'HTTP_CLIENT_POOL_CONNECTIONS', 10),
+        pool_maxsize=getattr(settings, 'HTTP_CLIENT_POOL_MAXSIZE', 20),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def reset_session():
+    """Close the shared session (e.g. after settings change or in a forked worker)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def request(method, url, **kwargs):
+    kwargs.setdefault('timeout', default_timeout())
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, params=None, **kwargs):
+    return request('GET', url, params=params, **kwargs)
+
+
+def post(url, data=None, json=None, **kwargs):
+    return request('POST', url, data=data, json=json, **kwargs)
+
+
+def put(url, data=None, **kwargs):
+    return request('PUT', url, data=data, **kwargs)
+
+
+def patch(url, data=None, **kwargs):
+    return request('PATCH', url, data=data, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request('DELETE', url, **kwargs)
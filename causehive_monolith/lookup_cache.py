@@ -0,0 +1,147 @@
+"""
+Read-through cache for user and cause lookups
+
+Sits in front of the service resolver so repeated validation of the same
+user or cause (every cart call, every donation) does not hit the ORM or the
+remote service each time.
+
+Two layers:
+- a small in-process LRU with a short TTL (LOOKUP_CACHE_LOCAL_TTL) so hot
+  keys are served without a network hop
+- the shared Django cache (Redis in production) with LOOKUP_CACHE_TTL
+
+Entries are invalidated from post_save/post_delete signals on User,
+UserProfile and Causes (see users_n_auth.signals and causes.signals). The
+local layer of other processes is only bounded by its short TTL.
+Misses (record not found) are never cached.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'lookup'
+
+
+def make_key(kind, object_id):
+    # Canonical UUID form, so a lookup by "ABC..." or a UUID object hits the key invalidate() drops
+    try:
+        object_id = uuid.UUID(str(object_id))
+    except ValueError:
+        pass
+    return f"{KEY_PREFIX}:{kind}:{object_id}"
+
+
+class LocalLRU:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LookupCache:
+    def __init__(self):
+        self.local = LocalLRU(getattr(settings, 'LOOKUP_CACHE_LOCAL_MAXSIZE', 1024))
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._counter_lock:
+            self._counters[name] += 1
+
+    def get_or_load(self, kind, object_id, loader):
+        """Return the cached document for (kind, object_id), calling `loader` on a miss."""
+        key = make_key(kind, object_id)
+
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+
+        value = cache.get(key)
+        if value is not None:
+            self._count('shared_hits')
+            self.local.set(key, value, getattr(settings, 'LOOKUP_CACHE_LOCAL_TTL', 5))
+            return value
+
+        self._count('misses')
+        value = loader()
+        if value is not None:
+            cache.set(key, value, getattr(settings, 'LOOKUP_CACHE_TTL', 300))
+            self.local.set(key, value, getattr(settings, 'LOOKUP_CACHE_LOCAL_TTL', 5))
+        return value
+
+    def invalidate(self, kind, object_id):
+        key = make_key(kind, object_id)
+        self.local.delete(key)
+        cache.delete(key)
+        self._count('invalidations')
+
+    def stats(self):
+        with self._counter_lock:
+            counters = dict(self._counters)
+        lookups = counters['local_hits'] + counters['shared_hits'] + counters['misses']
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 4) if lookups else 0.0
+        return counters
+
+    def reset(self):
+        self.local.clear()
+        with self._counter_lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+lookup_cache = LookupCache()
+
+
+class CachedServiceResolver:
+    """Wrap a service resolver so single-object lookups go through lookup_cache."""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+
+    def get_user(self, user_id, request=None):
+        return lookup_cache.get_or_load('user', user_id, lambda: self.resolver.get_user(user_id, request))
+
+    def get_cause(self, cause_id, request=None):
+        return lookup_cache.get_or_load('cause', cause_id, lambda: self.resolver.get_cause(cause_id, request))
+
+    def get_user_profile(self, user_id, request=None):
+        return lookup_cache.get_or_load(
+            'profile', user_id, lambda: self.resolver.get_user_profile(user_id, request)
+        )
+
+    def get_causes(self, cause_ids, request=None):
+        return self.resolver.get_causes(cause_ids, request)
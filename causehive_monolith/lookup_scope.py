@@ -0,0 +1,128 @@
+"""
+Request-scoped lookup memoization
+
+Inside a lookup scope every identical resolver lookup (same method, same
+id) is performed once; later and concurrent callers get the same result or
+the same exception. LookupScopeMiddleware opens a scope per HTTP request and
+causehive_monolith.celery opens one per Celery task, so a validation chain
+that asks for the same cause twice only pays for it once.
+
+gather() runs independent lookups concurrently on a shared bounded thread
+pool while keeping them in the caller's scope. With the in-process backend
+the calls run serially instead: ORM lookups are cheap and worker threads
+would each hold their own database connection.
+"""
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+_current_scope = contextvars.ContextVar('lookup_scope', default=None)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class LookupScope:
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if owner:
+            try:
+                future.set_result(loader())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def enter_lookup_scope():
+    """Open a scope unless one is already active; returns a token for exit_lookup_scope()."""
+    if _current_scope.get() is not None:
+        return None
+    return _current_scope.set(LookupScope())
+
+
+def exit_lookup_scope(token):
+    if token is not None:
+        _current_scope.reset(token)
+
+
+@contextmanager
+def lookup_scope():
+    token = enter_lookup_scope()
+    try:
+        yield _current_scope.get()
+    finally:
+        exit_lookup_scope(token)
+
+
+class ScopedServiceResolver:
+    """Memoize single-object lookups for the lifetime of the active scope."""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+
+    def _lookup(self, method, object_id, request):
+        loader = lambda: getattr(self.resolver, method)(object_id, request)
+        scope = _current_scope.get()
+        if scope is None:
+            return loader()
+        return scope.get_or_load((method, str(object_id)), loader)
+
+    def get_user(self, user_id, request=None):
+        return self._lookup('get_user', user_id, request)
+
+    def get_cause(self, cause_id, request=None):
+        return self._lookup('get_cause', cause_id, request)
+
+    def get_user_profile(self, user_id, request=None):
+        return self._lookup('get_user_profile', user_id, request)
+
+    def get_causes(self, cause_ids, request=None):
+        return self.resolver.get_causes(cause_ids, request)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'LOOKUP_FANOUT_WORKERS', 8),
+                    thread_name_prefix='lookup-fanout',
+                )
+    return _executor
+
+
+def _run_in_thread(call):
+    try:
+        return call()
+    finally:
+        connections.close_all()
+
+
+def gather(*calls):
+    """
+    Run zero-argument callables and return their results in order.
+    The first exception (in call order) is re-raised after all calls finish.
+    """
+    if getattr(settings, 'SERVICE_RESOLVER_BACKEND', 'inprocess') == 'inprocess' or len(calls) < 2:
+        return [call() for call in calls]
+
+    executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, _run_in_thread, call) for call in calls]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
@@ -0,0 +1,15 @@
+"""
+Middleware for CauseHive Monolith
+"""
+from .lookup_scope import lookup_scope
+
+
+class LookupScopeMiddleware:
+    """Memoize user/cause lookups for the duration of each request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with lookup_scope():
+            return self.get_response(request)
@@ -0,0 +1,173 @@
+"""
+Service resolver for CauseHive Monolith
+
+The cart, donation, withdrawal and cause apps were written as separate
+services and look users and causes up over HTTP. Inside the monolith those
+lookups can be answered straight from the ORM instead of looping back
+through the web server.
+
+Backends (selected with the SERVICE_RESOLVER_BACKEND setting):
+- inprocess: read users_n_auth and causes models directly
+- http: call USER_SERVICE_URL / CAUSE_SERVICE_URL (split deployments)
+
+Every backend returns plain dicts shaped like the user/cause detail
+endpoints, or None when the record does not exist (malformed ids included).
+get_causes() returns a dict keyed by cause id string, resolved in one
+query/request. A backing service that cannot be reached or answers with
+something other than JSON raises ServiceUnavailable.
+"""
+import uuid
+
+import requests
+from django.conf import settings
+
+from . import http_client
+
+
+class ServiceUnavailable(Exception):
+    """Raised when the backing service cannot be reached."""
+
+
+def _auth_headers(request):
+    headers = {}
+    if request and hasattr(request, 'headers'):
+        auth_header = request.headers.get('Authorization')
+        if auth_header:
+            headers['Authorization'] = auth_header
+    return headers
+
+
+def _parse_uuid(value):
+    """Return `value` as a UUID, or None if it is not one."""
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class InProcessServiceResolver:
+    """Answer lookups from the ORM of the apps running in this process."""
+
+    user_fields = ('id', 'email', 'first_name', 'last_name', 'is_active')
+    cause_fields = ('id', 'name', 'organizer_id', 'target_amount', 'current_amount', 'status')
+
+    def get_user(self, user_id, request=None):
+        from users_n_auth.models import User
+
+        user_id = _parse_uuid(user_id)
+        if user_id is None:
+            return None
+        user = User.objects.filter(id=user_id).values(*self.user_fields).first()
+        if user is None:
+            return None
+        user['id'] = str(user['id'])
+        return user
+
+    def _cause_document(self, cause):
+        cause['id'] = str(cause['id'])
+        cause['organizer_id'] = str(cause['organizer_id'])
+        cause['target_amount'] = str(cause['target_amount'])
+        cause['current_amount'] = str(cause['current_amount'])
+        return cause
+
+    def get_cause(self, cause_id, request=None):
+        from causes.models import Causes
+
+        cause_id = _parse_uuid(cause_id)
+        if cause_id is None:
+            return None
+        cause = Causes.objects.filter(id=cause_id).values(*self.cause_fields).first()
+        if cause is None:
+            return None
+        return self._cause_document(cause)
+
+    def get_causes(self, cause_ids, request=None):
+        from causes.models import Causes
+
+        cause_ids = {cause_id for cause_id in map(_parse_uuid, cause_ids) if cause_id is not None}
+        causes = Causes.objects.filter(id__in=cause_ids).values(*self.cause_fields)
+        return {cause['id']: cause for cause in map(self._cause_document, causes)}
+
+    def get_user_profile(self, user_id, request=None):
+        from users_n_auth.models import UserProfile
+
+        user_id = _parse_uuid(user_id)
+        if user_id is None:
+            return None
+        profile = UserProfile.objects.filter(user_id=user_id).values(
+            'id', 'user_id', 'withdrawal_address', 'withdrawal_wallet'
+        ).first()
+        if profile is None:
+            return None
+        profile['id'] = str(profile['id'])
+        profile['user'] = str(profile.pop('user_id'))
+        return profile
+
+
+class HttpServiceResolver:
+    """Answer lookups by calling the user and cause services over HTTP."""
+
+    bulk_max_ids = 100  # causes.views.CauseBulkDetailView.max_ids
+
+    def _get(self, url, request=None):
+        try:
+            response = http_client.get(url, headers=_auth_headers(request))
+        except requests.RequestException as e:
+            raise ServiceUnavailable(str(e))
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError as e:
+            raise ServiceUnavailable(f"Invalid response from {url}: {e}")
+
+    def get_user(self, user_id, request=None):
+        return self._get(f"{settings.USER_SERVICE_URL}/users/{user_id}/", request)
+
+    def get_cause(self, cause_id, request=None):
+        return self._get(f"{settings.CAUSE_SERVICE_URL}/details/{cause_id}/", request)
+
+    def get_causes(self, cause_ids, request=None):
+        ids = sorted({str(cause_id) for cause_id in cause_ids})
+        causes = {}
+        for start in range(0, len(ids), self.bulk_max_ids):
+            chunk = ','.join(ids[start:start + self.bulk_max_ids])
+            for cause in self._get(f"{settings.CAUSE_SERVICE_URL}/details/bulk/?ids={chunk}", request) or []:
+                causes[cause['id']] = cause
+        return causes
+
+    def get_user_profile(self, user_id, request=None):
+        # The profile endpoint resolves the user from the forwarded token
+        return self._get(f"{settings.USER_SERVICE_URL}/profile/", request)
+
+
+RESOLVER_BACKENDS = {
+    'inprocess': InProcessServiceResolver,
+    'http': HttpServiceResolver,
+}
+
+_resolvers = {}
+
+
+def get_service_resolver(backend=None, cached=None):
+    """
+    Return the resolver for `backend`, defaulting to SERVICE_RESOLVER_BACKEND.
+    Lookups are memoized within the active lookup scope and go through the
+    shared lookup cache unless LOOKUP_CACHE_ENABLED is off.
+    """
+    backend = backend or getattr(settings, 'SERVICE_RESOLVER_BACKEND', 'inprocess')
+    if cached is None:
+        cached = getattr(settings, 'LOOKUP_CACHE_ENABLED', True)
+    if (backend, cached) not in _resolvers:
+        try:
+            resolver = RESOLVER_BACKENDS[backend]()
+        except KeyError:
+            raise ValueError(f"Unknown service resolver backend: {backend}")
+        if cached:
+            from .lookup_cache import CachedServiceResolver
+            resolver = CachedServiceResolver(resolver)
+        from .lookup_scope import ScopedServiceResolver
+        _resolvers[(backend, cached)] = ScopedServiceResolver(resolver)
+    return _resolvers[(backend, cached)]
@@ -15,6 +15,7 @@ from pathlib import Path
 from datetime import timedelta
 import environ
 import dj_database_url
+from corsheaders.defaults import default_headers
 from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,8 +47,92 @@ FRONTEND_URL = env('FRONTEND_URL', default='http://localhost:5173')
 BACKEND_URL = env('BACKEND_URL', default='http://localhost:8000')
 
 # Service URLs for microservice communication
+USER_SERVICE_URL = env('USER_SERVICE_URL', default='http://localhost:8000/api/user')
 CAUSE_SERVICE_URL = env('CAUSE_SERVICE_URL', default='http://localhost:8001')
 
+# How cart/donations/withdrawals resolve users and causes:
+# 'inprocess' reads the ORM directly, 'http' calls the service URLs above
+SERVICE_RESOLVER_BACKEND = env('SERVICE_RESOLVER_BACKEND', default='inprocess')
+
+# Shared outbound HTTP client (causehive_monolith/http_client.py)
+HTTP_CLIENT_CONNECT_TIMEOUT = env.float('HTTP_CLIENT_CONNECT_TIMEOUT', default=3.05)
+HTTP_CLIENT_READ_TIMEOUT = env.float('HTTP_CLIENT_READ_TIMEOUT', default=10)
+HTTP_CLIENT_MAX_RETRIES = env.int('HTTP_CLIENT_MAX_RETRIES', default=2)
+HTTP_CLIENT_BACKOFF_FACTOR = env.float('HTTP_CLIENT_BACKOFF_FACTOR', default=0.3)
+HTTP_CLIENT_BACKOFF_JITTER = env.float('HTTP_CLIENT_BACKOFF_JITTER', default=0.2)
+HTTP_CLIENT_POOL_CONNECTIONS = env.int('HTTP_CLIENT_POOL_CONNECTIONS', default=10)
+HTTP_CLIENT_POOL_MAXSIZE = env.int('HTTP_CLIENT_POOL_MAXSIZE', default=20)
+
+# Cache: set CACHE_URL=rediscache://host:6379/2 in production
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Read-through cache for user/cause lookups (causehive_monolith/lookup_cache.py)
+LOOKUP_CACHE_ENABLED = env.bool('LOOKUP_CACHE_ENABLED', default=True)
+LOOKUP_CACHE_TTL = env.int('LOOKUP_CACHE_TTL', default=300)
+LOOKUP_CACHE_LOCAL_TTL = env.int('LOOKUP_CACHE_LOCAL_TTL', default=5)
+LOOKUP_CACHE_LOCAL_MAXSIZE = env.int('LOOKUP_CACHE_LOCAL_MAXSIZE', default=1024)
+
+# Thread pool used to run independent lookups concurrently (http resolver only)
+LOOKUP_FANOUT_WORKERS = env.int('LOOKUP_FANOUT_WORKERS', default=8)
+
+# Dashboard reports (dashboard/reports.py): days of daily buckets kept per metric
+DASHBOARD_DAILY_BUCKET_DAYS = env.int('DASHBOARD_DAILY_BUCKET_DAYS', default=30)
+# Incremental runs re-aggregate from the watermark moved back by this many days
+# so status changes on recent rows are picked up; older changes wait for the
+# daily full recompute
+DASHBOARD_INCREMENTAL_LOOKBACK_DAYS = env.int('DASHBOARD_INCREMENTAL_LOOKBACK_DAYS', default=2)
+# Dashboard views always serve the newest report; older than MAX_AGE triggers one
+# background regeneration, older than STALE_AFTER is flagged stale (seconds)
+DASHBOARD_REPORT_MAX_AGE = env.int('DASHBOARD_REPORT_MAX_AGE', default=3600)
+DASHBOARD_REPORT_STALE_AFTER = env.int('DASHBOARD_REPORT_STALE_AFTER', default=86400)
+DASHBOARD_REGENERATE_LOCK_TIMEOUT = env.int('DASHBOARD_REGENERATE_LOCK_TIMEOUT', default=900)
+# CachedReportData retention (dashboard/retention.py): generations kept per report
+# type, and optional daily summaries of pruned metrics reports
+DASHBOARD_REPORT_KEEP_GENERATIONS = env.int('DASHBOARD_REPORT_KEEP_GENERATIONS', default=24)
+DASHBOARD_REPORT_COMPACT_DAILY = env.bool('DASHBOARD_REPORT_COMPACT_DAILY', default=False)
+DASHBOARD_REPORT_KEEP_DAILY = env.int('DASHBOARD_REPORT_KEEP_DAILY', default=90)
+# Dashboard admin lists are paginated queries (dashboard.views.AdminListView)
+DASHBOARD_REPORT_PAGE_SIZE = env.int('DASHBOARD_REPORT_PAGE_SIZE', default=50)
+DASHBOARD_REPORT_MAX_PAGE_SIZE = env.int('DASHBOARD_REPORT_MAX_PAGE_SIZE', default=500)
+
+# Event streams (causehive_monolith/streams.py): donations.tasks publishes
+# donation events, causes consume_donation_events applies them
+EVENT_STREAM_REDIS_URL = env('EVENT_STREAM_REDIS_URL', default='redis://localhost:6379/0')
+EVENT_STREAM_MAX_CONNECTIONS = env.int('EVENT_STREAM_MAX_CONNECTIONS', default=20)
+EVENT_STREAM_PARTITIONS = env.int('EVENT_STREAM_PARTITIONS', default=8)
+EVENT_STREAM_MAXLEN = env.int('EVENT_STREAM_MAXLEN', default=100000)
+EVENT_STREAM_BATCH_SIZE = env.int('EVENT_STREAM_BATCH_SIZE', default=100)
+EVENT_STREAM_BLOCK_MS = env.int('EVENT_STREAM_BLOCK_MS', default=5000)
+EVENT_STREAM_RECLAIM_IDLE_MS = env.int('EVENT_STREAM_RECLAIM_IDLE_MS', default=60000)
+DONATION_EVENTS_WORKERS = env.int('DONATION_EVENTS_WORKERS', default=4)
+# Transactional outbox for donation events (donations.tasks.relay_donation_outbox)
+DONATION_OUTBOX_BATCH_SIZE = env.int('DONATION_OUTBOX_BATCH_SIZE', default=100)
+DONATION_OUTBOX_RELAY_INTERVAL = env.float('DONATION_OUTBOX_RELAY_INTERVAL', default=2.0)
+DONATION_OUTBOX_RETENTION_DAYS = env.int('DONATION_OUTBOX_RETENTION_DAYS', default=7)
+# How long applied event ids are remembered to skip replays; keep >= outbox retention
+DONATION_EVENTS_DEDUPE_DAYS = env.int('DONATION_EVENTS_DEDUPE_DAYS', default=7)
+# Idempotency-Key handling for checkout, donate and withdrawal creation (donations.idempotency)
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', default=86400)
+IDEMPOTENCY_WAIT = env.float('IDEMPOTENCY_WAIT', default=10)
+IDEMPOTENCY_INFLIGHT_TIMEOUT = env.int('IDEMPOTENCY_INFLIGHT_TIMEOUT', default=60)
+# Largest list of operations accepted by /api/cart/batch/
+CART_BATCH_MAX_OPERATIONS = env.int('CART_BATCH_MAX_OPERATIONS', default=100)
+# Rendered carts served by get_cart (cart/cart_cache.py), seconds
+CART_CACHE_TTL = env.int('CART_CACHE_TTL', default=300)
+# Where anonymous carts live (cart/stores.py): 'database' rows, or 'redis' hashes on
+# EVENT_STREAM_REDIS_URL that expire CART_ANONYMOUS_TTL seconds after last use
+CART_ANONYMOUS_STORE = env('CART_ANONYMOUS_STORE', default='database')
+CART_ANONYMOUS_TTL = env.int('CART_ANONYMOUS_TTL', default=604800)
+# Cart sweeper (cart.tasks.sweep_expired_carts): days after their last change
+# that abandoned, completed and anonymous active carts are deleted
+CART_ABANDONED_RETENTION_DAYS = env.int('CART_ABANDONED_RETENTION_DAYS', default=7)
+CART_COMPLETED_RETENTION_DAYS = env.int('CART_COMPLETED_RETENTION_DAYS', default=30)
+CART_ANONYMOUS_RETENTION_DAYS = env.int('CART_ANONYMOUS_RETENTION_DAYS', default=30)
+CART_SWEEP_CHUNK_SIZE = env.int('CART_SWEEP_CHUNK_SIZE', default=500)
+CART_SWEEP_LOCK_TIMEOUT = env.int('CART_SWEEP_LOCK_TIMEOUT', default=3600)
+
 # Payment service configuration
 PAYSTACK_BASE_URL = env('PAYSTACK_BASE_URL', default='https://api.paystack.co')
 PAYSTACK_SECRET_KEY = env('PAYSTACK_SECRET_KEY', default='sk_test_your_secret_key_here')
@@ -156,6 +241,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'causehive_monolith.middleware.LookupScopeMiddleware',
 ]
 
 ROOT_URLCONF = 'causehive_monolith.urls'
@@ -289,6 +375,16 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
+# Reconciliation of payments left pending by a missed webhook
+# (payments.tasks.reconcile_stale_payments, every PAYMENT_RECONCILE_INTERVAL seconds)
+PAYMENT_RECONCILE_INTERVAL = env.int('PAYMENT_RECONCILE_INTERVAL', default=600)
+PAYMENT_RECONCILE_AFTER = env.int('PAYMENT_RECONCILE_AFTER', default=900)
+PAYMENT_RECONCILE_ABANDON_AFTER = env.int('PAYMENT_RECONCILE_ABANDON_AFTER', default=86400)
+PAYMENT_RECONCILE_CHUNK_SIZE = env.int('PAYMENT_RECONCILE_CHUNK_SIZE', default=200)
+PAYMENT_RECONCILE_CONCURRENCY = env.int('PAYMENT_RECONCILE_CONCURRENCY', default=4)
+PAYMENT_RECONCILE_RATE_LIMIT = env.float('PAYMENT_RECONCILE_RATE_LIMIT', default=10)  # Paystack calls per second
+PAYMENT_RECONCILE_LOCK_TIMEOUT = env.int('PAYMENT_RECONCILE_LOCK_TIMEOUT', default=3600)
+
 # Celery Configuration for background tasks
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default='redis://localhost:6379/1')
@@ -299,6 +395,43 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'dashboard.tasks.generate_fresh_report',
         'schedule': 3600  # every hour
     },
+    'recompute-reports-every-day': {
+        'task': 'dashboard.tasks.generate_fresh_report',
+        'schedule': 86400,  # every day
+        'kwargs': {'full': True}
+    },
+    'prune-cached-reports-every-hour': {
+        'task': 'dashboard.tasks.prune_cached_reports',
+        'schedule': 3600  # every hour
+    },
+    'relay-donation-outbox': {
+        'task': 'donations.tasks.relay_donation_outbox',
+        'schedule': DONATION_OUTBOX_RELAY_INTERVAL  # every few seconds
+    },
+    'prune-donation-outbox-every-day': {
+        'task': 'donations.tasks.prune_donation_outbox',
+        'schedule': 86400  # every day
+    },
+    'prune-idempotency-keys-every-hour': {
+        'task': 'donations.tasks.prune_expired_idempotency_keys',
+        'schedule': 3600  # every hour
+    },
+    'prune-processed-donation-events-every-day': {
+        'task': 'causes.tasks.prune_processed_donation_events',
+        'schedule': 86400  # every day
+    },
+    'process-pending-paystack-events-every-minute': {
+        'task': 'payments.tasks.process_pending_paystack_events',
+        'schedule': 60  # every minute
+    },
+    'reconcile-stale-payments': {
+        'task': 'payments.tasks.reconcile_stale_payments',
+        'schedule': PAYMENT_RECONCILE_INTERVAL  # every 10 minutes by default
+    },
+    'sweep-expired-carts-every-day': {
+        'task': 'cart.tasks.sweep_expired_carts',
+        'schedule': 86400  # every day
+    },
     'poll-new-pending-causes-every-3-mins': {
         'task': 'dashboard.tasks.poll_new_pending_causes',
         'schedule': 180  # every 3 minutes
@@ -309,6 +442,18 @@ CELERY_BEAT_SCHEDULE = {
 PAYSTACK_PUBLIC_KEY = env('PAYSTACK_PUBLIC_KEY', default='')
 PAYSTACK_SECRET_KEY = env('PAYSTACK_SECRET_KEY', default='')
 PAYSTACK_BASE_URL = "https://api.paystack.co"
+# Webhook inbox events still unprocessed after this many seconds are re-driven by beat
+PAYSTACK_WEBHOOK_RETRY_AFTER = env.int('PAYSTACK_WEBHOOK_RETRY_AFTER', default=60)
+PAYSTACK_WEBHOOK_MAX_ATTEMPTS = env.int('PAYSTACK_WEBHOOK_MAX_ATTEMPTS', default=10)
+# Payment verification: how long a "still pending" answer from Paystack is
+# reused, and how long concurrent polls wait for the one in-flight verify call
+PAYSTACK_VERIFY_PENDING_TTL = env.int('PAYSTACK_VERIFY_PENDING_TTL', default=5)
+PAYSTACK_VERIFY_LOCK_TIMEOUT = env.int('PAYSTACK_VERIFY_LOCK_TIMEOUT', default=30)
+PAYSTACK_VERIFY_WAIT = env.float('PAYSTACK_VERIFY_WAIT', default=10)
+# Server-sent payment status streams: keepalive comment interval and how long
+# a stream stays open before the client has to reconnect
+PAYMENT_STATUS_STREAM_KEEPALIVE = env.int('PAYMENT_STATUS_STREAM_KEEPALIVE', default=15)
+PAYMENT_STATUS_STREAM_TIMEOUT = env.int('PAYMENT_STATUS_STREAM_TIMEOUT', default=300)
 
 # CORS settings for frontend
 CORS_ALLOWED_ORIGINS = [
@@ -334,6 +479,8 @@ CSRF_TRUSTED_ORIGINS = env.list('CSRF_TRUSTED_ORIGINS', default=[
 
 # CORS settings for Railway deployment
 CORS_ALLOW_CREDENTIALS = True
+# Sent by clients on checkout, donate and withdrawal creation (donations.idempotency)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
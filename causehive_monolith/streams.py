@@ -0,0 +1,201 @@
+"""
+Durable event streams on Redis Streams
+
+Events are appended with XADD to one of EVENT_STREAM_PARTITIONS streams,
+chosen by hashing a partition key (e.g. the cause id), so every event for
+one key lands on the same stream and is handled in order by one worker.
+
+Consumers read through a consumer group:
+- XREADGROUP ... COUNT n reads batches; entries stay pending until the
+  handler succeeds and they are XACKed, so nothing is lost while a consumer
+  is down or restarting
+- entries left pending by a consumer that died are taken over with
+  XAUTOCLAIM once idle for EVENT_STREAM_RECLAIM_IDLE_MS
+- delivery is at-least-once; handlers must tolerate an occasional replay
+- events rejected by the consumer's validator are moved to a dead-letter
+  stream (<stream>:dead) and acked, so one bad event cannot hold back a batch
+
+All publishing goes through one pooled connection (get_redis()).
+"""
+import json
+import threading
+import zlib
+
+import redis
+from django.conf import settings
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """Return the process-wide Redis client backed by a connection pool."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                pool = redis.ConnectionPool.from_url(
+                    settings.EVENT_STREAM_REDIS_URL,
+                    max_connections=getattr(settings, 'EVENT_STREAM_MAX_CONNECTIONS', 20),
+                    decode_responses=True,
+                )
+                _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+def set_redis(client):
+    """Replace the shared client (e.g. with fakeredis in tests); None resets it."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def partition_count():
+    return getattr(settings, 'EVENT_STREAM_PARTITIONS', 8)
+
+
+def stream_name(base, partition):
+    return f"{base}:{partition}"
+
+
+def partition_for(key, partitions=None):
+    return zlib.crc32(str(key).encode()) % (partitions or partition_count())
+
+
+def partition_streams(base, worker=0, workers=1):
+    """Streams of `base` owned by `worker` out of `workers`."""
+    return [stream_name(base, p) for p in range(partition_count()) if p % workers == worker]
+
+
+def dead_letter_stream(stream):
+    return f"{stream}:dead"
+
+
+def _xadd(client, base, key, event):
+    return client.xadd(
+        stream_name(base, partition_for(key)),
+        {'payload': json.dumps(event)},
+        maxlen=getattr(settings, 'EVENT_STREAM_MAXLEN', 100000),
+        approximate=True,
+    )
+
+
+def publish(base, key, event, client=None):
+    """Append `event` (a JSON-serializable dict) to the partition of `base` that owns `key`."""
+    return _xadd(client or get_redis(), base, key, event)
+
+
+def publish_batch(base, items, client=None):
+    """Append every (key, event) in `items` in one round trip. Returns the entry ids."""
+    pipeline = (client or get_redis()).pipeline(transaction=False)
+    for key, event in items:
+        _xadd(pipeline, base, key, event)
+    return pipeline.execute()
+
+
+class StreamConsumer:
+    """
+    Read batches from `streams` as `consumer` in consumer group `group` and
+    pass the decoded events of each batch to `handler(events)`. A batch is
+    acknowledged only after the handler returns. If given, `validate(event)`
+    runs on each event first; events it raises on are dead-lettered instead
+    of being passed to the handler.
+    """
+
+    def __init__(self, streams, group, consumer, handler, batch_size=None, block_ms=None,
+                 reclaim_idle_ms=None, client=None, validate=None):
+        self.streams = list(streams)
+        self.group = group
+        self.consumer = consumer
+        self.handler = handler
+        self.validate = validate
+        self.batch_size = batch_size or getattr(settings, 'EVENT_STREAM_BATCH_SIZE', 100)
+        self.block_ms = getattr(settings, 'EVENT_STREAM_BLOCK_MS', 5000) if block_ms is None else block_ms
+        self.reclaim_idle_ms = (
+            getattr(settings, 'EVENT_STREAM_RECLAIM_IDLE_MS', 60000) if reclaim_idle_ms is None else reclaim_idle_ms
+        )
+        self.client = client or get_redis()
+
+    def ensure_groups(self):
+        for stream in self.streams:
+            try:
+                self.client.xgroup_create(stream, self.group, id='0', mkstream=True)
+            except redis.ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+
+    def handle(self, stream, entries):
+        """Run the handler on one batch and ack it. Returns the number of entries acked."""
+        if not entries:
+            return 0
+        events = []
+        for entry_id, fields in entries:
+            try:
+                event = json.loads(fields['payload'])
+            except (KeyError, TypeError, ValueError):
+                # Malformed entries can never succeed; ack them so they are not retried forever
+                print(f"Dropping malformed entry on {stream}: {fields}")
+                continue
+            if self.validate is not None:
+                try:
+                    self.validate(event)
+                except Exception as e:
+                    # Would fail the whole batch on every retry; park it for inspection instead
+                    self.dead_letter(stream, entry_id, fields, e)
+                    continue
+            events.append(event)
+        if events:
+            try:
+                self.handler(events)
+            except Exception as e:
+                # Left pending; reclaimed after reclaim_idle_ms
+                print(f"Failed to handle {len(events)} events from {stream}: {e}")
+                return 0
+        return self.client.xack(stream, self.group, *[entry_id for entry_id, _ in entries])
+
+    def dead_letter(self, stream, entry_id, fields, error):
+        """Copy a rejected entry to the dead-letter stream of `stream`."""
+        print(f"Dead-lettering entry {entry_id} on {stream}: {error}")
+        self.client.xadd(
+            dead_letter_stream(stream),
+            {**fields, 'source_id': entry_id, 'error': str(error)},
+            maxlen=getattr(settings, 'EVENT_STREAM_MAXLEN', 100000),
+            approximate=True,
+        )
+
+    def reclaim(self):
+        """Take over entries other consumers left pending for too long and handle them."""
+        handled = 0
+        for stream in self.streams:
+            start = '0-0'
+            while True:
+                start, entries, *_ = self.client.xautoclaim(
+                    stream, self.group, self.consumer, self.reclaim_idle_ms, start_id=start, count=self.batch_size
+                )
+                handled += self.handle(stream, entries)
+                if start == '0-0' or not entries:
+                    break
+        return handled
+
+    def poll(self, block_ms=None):
+        """
+        Read and handle one batch per stream, waiting up to block_ms for new
+        entries (0 returns immediately). Returns the number of entries acked.
+        """
+        block_ms = self.block_ms if block_ms is None else block_ms
+        response = self.client.xreadgroup(
+            self.group, self.consumer, {stream: '>' for stream in self.streams},
+            count=self.batch_size, block=block_ms or None,
+        )
+        return sum(self.handle(stream, entries) for stream, entries in response or [])
+
+    def run(self, stop_event=None, reclaim_every=None):
+        """Consume until `stop_event` is set, reclaiming stale pending entries every `reclaim_every` polls."""
+        reclaim_every = reclaim_every or 12
+        self.ensure_groups()
+        polls = 0
+        while stop_event is None or not stop_event.is_set():
+            if polls % reclaim_every == 0:
+                self.reclaim()
+            self.poll()
+            polls += 1
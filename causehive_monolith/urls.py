@@ -11,7 +11,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from .health_views import health_check, readiness_check
+from .health_views import health_check, readiness_check, cache_stats
 from rest_framework.routers import DefaultRouter
 
 # Import viewsets for API router - handle gracefully if not available
@@ -49,10 +49,15 @@ urlpatterns = [
     # Health check endpoints for Railway
     path('api/health/', health_check, name='health_check'),
     path('api/ready/', readiness_check, name='readiness_check'),
+    path('api/health/cache/', cache_stats, name='cache_stats'),
     
     # Django admin
     path('admin/', admin.site.urls),
     
+    # Payment endpoints go before the router, whose payments/<pk>/ route
+    # would otherwise swallow webhook/ and initiate/
+    path('api/payments/', include('payments.urls')),
+
     # API endpoints
     path('api/', include(router.urls)),
     
@@ -65,7 +70,6 @@ urlpatterns = [
     
     # Donation processing service endpoints
     path('api/donations/', include('donations.urls')),
-    path('api/payments/', include('payments.urls')),
     path('api/cart/', include('cart.urls')),
     path('api/withdrawals/', include('withdrawal_transfer.urls')),
     
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CausesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'causes'
+
+    def ready(self):
+        import causes.signals
@@ -1,35 +1,73 @@
+import os
+import socket
+import threading
+
 from django.conf import settings
 from django.core.management.base import BaseCommand
-import redis
-import json
-from causes.models import Causes
-from django.conf import settings
-from decimal import Decimal
+from django.db import connections
+
+from causehive_monolith.streams import StreamConsumer, partition_count, partition_streams
+from causes.utils import apply_donation_events, validate_donation_event
+from donations.tasks import DONATION_EVENTS_STREAM
+
+CONSUMER_GROUP = 'cause-progress'
+
 
 class Command(BaseCommand):
     help = 'Consume donation events and updates current_amount in causes'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Worker threads; each owns a share of the stream partitions (default: DONATION_EVENTS_WORKERS)',
+        )
+        parser.add_argument('--batch-size', type=int, default=None, help='Entries read per XREADGROUP call')
+        parser.add_argument('--consumer', default=None, help='Consumer name prefix (default: host-pid)')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Reclaim stale entries and drain what is queued without blocking, then exit',
+        )
+
     def handle(self, *args, **options):
-        r = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
-        pubsub = r.pubsub()
-        pubsub.subscribe('donation_events')
-        print("Listening for donation events...")
-
-        for message in pubsub.listen():
-            if message['type'] == 'message':
-                event = json.loads(message['data'])
-                if event.get('event') == 'donation.completed':
-                    data = event['data']
-                    cause_id = data['cause_id']
-                    amount = data['amount']
-                    try:
-                        causes = Causes.objects.get(id=cause_id)
-                        causes.current_amount += Decimal(str(amount))
-
-                        if causes.current_amount >= causes.target_amount:
-                            causes.status = 'completed'
-
-                        causes.save()
-                        print(f"Updated cause {cause_id} by {amount}")
-                    except Causes.DoesNotExist:
-                        print(f"Cause {cause_id} not found")
\ No newline at end of file
+        workers = min(options['workers'] or settings.DONATION_EVENTS_WORKERS, partition_count())
+        prefix = options['consumer'] or f"{socket.gethostname()}-{os.getpid()}"
+        consumers = [
+            StreamConsumer(
+                partition_streams(DONATION_EVENTS_STREAM, worker, workers),
+                CONSUMER_GROUP,
+                f"{prefix}-{worker}",
+                apply_donation_events,
+                batch_size=options['batch_size'],
+                validate=validate_donation_event,
+            )
+            for worker in range(workers)
+        ]
+
+        if options['once']:
+            for consumer in consumers:
+                consumer.ensure_groups()
+                consumer.reclaim()
+                while consumer.poll(block_ms=0):
+                    pass
+            return
+
+        print(f"Listening for donation events with {workers} workers...")
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self.run_worker, args=(consumer, stop), name=consumer.consumer, daemon=True)
+            for consumer in consumers
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+
+    def run_worker(self, consumer, stop):
+        try:
+            consumer.run(stop_event=stop)
+        finally:
+            connections.close_all()
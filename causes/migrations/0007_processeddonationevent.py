@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('causes', '0006_causes_rejection_reason'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedDonationEvent',
+            fields=[
+                ('event_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('processed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -42,4 +42,12 @@ class Causes(models.Model):
         return self.name
 
     class Meta:
-        verbose_name_plural = "Causes"
\ No newline at end of file
+        verbose_name_plural = "Causes"
+
+class ProcessedDonationEvent(models.Model):
+    """Donation events already applied to cause totals, so replayed events are skipped."""
+    event_id = models.UUIDField(primary_key=True)
+    processed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Donation event {self.event_id}"
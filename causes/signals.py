@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from causehive_monolith.lookup_cache import lookup_cache
+from .models import Causes
+
+@receiver(post_save, sender=Causes)
+@receiver(post_delete, sender=Causes)
+def invalidate_cause_lookup(sender, instance, using=None, **kwargs):
+    lookup_cache.invalidate('cause', instance.pk)
+    # Drop again once the change is visible to other connections
+    transaction.on_commit(lambda: lookup_cache.invalidate('cause', instance.pk), using=using)
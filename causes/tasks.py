@@ -0,0 +1,15 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ProcessedDonationEvent
+
+
+@shared_task
+def prune_processed_donation_events():
+    """Forget donation event ids applied more than DONATION_EVENTS_DEDUPE_DAYS ago."""
+    horizon = timezone.now() - timedelta(days=getattr(settings, 'DONATION_EVENTS_DEDUPE_DAYS', 7))
+    deleted, _ = ProcessedDonationEvent.objects.filter(processed_at__lt=horizon).delete()
+    return deleted
@@ -1,7 +1,7 @@
 import uuid
 from unittest.mock import patch, MagicMock
 from decimal import Decimal
-from django.test import TestCase, override_settings
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
@@ -289,10 +289,11 @@ class IsAdminServicePermissionTestCase(TestCase):
         self.assertFalse(self.permission.has_permission(self.request, self.view))
 
 
+@override_settings(SERVICE_RESOLVER_BACKEND='http')
 class ValidateOrganizerIdTestCase(TestCase):
     """Test cases for validate_organizer_id_with_service"""
 
-    @patch('causes.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_valid_organizer_id(self, mock_get):
         """Test validation with valid organizer ID"""
         mock_response = MagicMock()
@@ -304,7 +305,7 @@ class ValidateOrganizerIdTestCase(TestCase):
         result = validate_organizer_id_with_service(organizer_id)
         self.assertEqual(result, organizer_id)
 
-    @patch('causes.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_invalid_organizer_id(self, mock_get):
         """Test validation with invalid organizer ID"""
         mock_response = MagicMock()
@@ -315,7 +316,7 @@ class ValidateOrganizerIdTestCase(TestCase):
         with self.assertRaises(Exception):
             validate_organizer_id_with_service(organizer_id)
 
-    @patch('causes.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_inactive_user(self, mock_get):
         """Test validation with inactive user"""
         mock_response = MagicMock()
@@ -327,7 +328,7 @@ class ValidateOrganizerIdTestCase(TestCase):
         with self.assertRaises(Exception):
             validate_organizer_id_with_service(organizer_id)
 
-    @patch('causes.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_service_unreachable(self, mock_get):
         """Test validation when service is unreachable"""
         mock_get.side_effect = Exception('Connection error')
@@ -639,4 +640,236 @@ class IntegrationTestCase(APITestCase):
 
         # Verify cause was created with new category
         cause = Causes.objects.get(name='Cause with New Category')
-        self.assertEqual(cause.category, new_category)
\ No newline at end of file
+        self.assertEqual(cause.category, new_category)
+
+
+class CauseBulkDetailViewTestCase(APITestCase):
+    """Test cases for the bulk cause details endpoint"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Bulk Category')
+        self.causes = [
+            Causes.objects.create(
+                name=f'Bulk Cause {index}',
+                category=self.category,
+                organizer_id=uuid.uuid4(),
+                target_amount=Decimal('100.00'),
+            )
+            for index in range(3)
+        ]
+
+    def test_bulk_details(self):
+        """Test fetching several causes in one request"""
+        ids = ','.join(str(cause.id) for cause in self.causes[:2])
+        response = self.client.get(reverse('cause_bulk_detail'), {'ids': ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({item['id'] for item in response.data}, {str(cause.id) for cause in self.causes[:2]})
+
+    def test_bulk_details_skips_unknown_ids(self):
+        """Test unknown ids are simply absent from the result"""
+        ids = f'{self.causes[0].id},{uuid.uuid4()}'
+        response = self.client.get(reverse('cause_bulk_detail'), {'ids': ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_bulk_details_requires_valid_ids(self):
+        """Test missing or malformed ids are rejected"""
+        self.assertEqual(self.client.get(reverse('cause_bulk_detail')).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('cause_bulk_detail'), {'ids': 'not-a-uuid'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DonationProgressTestCase(TestCase):
+    """Test cases for atomic cause progress updates"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Progress Category')
+        self.cause = Causes.objects.create(
+            name='Progress Cause',
+            category=self.category,
+            organizer_id=uuid.uuid4(),
+            target_amount=Decimal('100.00'),
+            current_amount=Decimal('0.00'),
+            status='ongoing'
+        )
+
+    def test_progress_is_added(self):
+        """Test the amount is added without touching the status below target"""
+        from .utils import apply_donation_progress
+        self.assertTrue(apply_donation_progress(self.cause.id, 40.5))
+
+        self.cause.refresh_from_db()
+        self.assertEqual(self.cause.current_amount, Decimal('40.50'))
+        self.assertEqual(self.cause.status, 'ongoing')
+
+    def test_status_flips_when_target_reached(self):
+        """Test the status flips to completed in the same update that reaches the target"""
+        from .utils import apply_donation_progress
+        apply_donation_progress(self.cause.id, '60.00')
+        with self.assertNumQueries(1):
+            apply_donation_progress(self.cause.id, '40.00')
+
+        self.cause.refresh_from_db()
+        self.assertEqual(self.cause.current_amount, Decimal('100.00'))
+        self.assertEqual(self.cause.status, 'completed')
+
+    def test_missing_cause(self):
+        """Test a missing cause is reported"""
+        from .utils import apply_donation_progress
+        self.assertFalse(apply_donation_progress(uuid.uuid4(), 10))
+
+    def test_cached_cause_is_invalidated(self):
+        """Test the lookup cache does not keep serving the old amount"""
+        from causehive_monolith.service_resolver import get_service_resolver
+        from .utils import apply_donation_progress
+        resolver = get_service_resolver('inprocess', cached=True)
+        resolver.get_cause(self.cause.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            apply_donation_progress(self.cause.id, 25)
+            # A read before commit may cache the old totals; the commit drops them again
+            resolver.get_cause(self.cause.id)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(resolver.get_cause(self.cause.id)['current_amount'], '25.00')
+
+    def test_events_are_coalesced_per_cause(self):
+        """Test events for the same cause are summed into one update"""
+        from .utils import coalesce_donation_events
+        other_id = str(uuid.uuid4())
+        events = [
+            {'event': 'donation.completed', 'data': {'cause_id': str(self.cause.id), 'amount': 10.1}},
+            {'event': 'donation.completed', 'data': {'cause_id': other_id, 'amount': 5}},
+            {'event': 'donation.completed', 'data': {'cause_id': str(self.cause.id), 'amount': 0.2}},
+            {'event': 'donation.refunded', 'data': {'cause_id': str(self.cause.id), 'amount': 99}},
+        ]
+
+        self.assertEqual(coalesce_donation_events(events), {
+            str(self.cause.id): Decimal('10.3'),
+            other_id: Decimal('5'),
+        })
+
+
+class ConcurrentDonationProgressTestCase(TransactionTestCase):
+    """Test that parallel donation events on one cause are never lost"""
+
+    def test_parallel_events_on_one_cause(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from django.db import connections
+        from .utils import apply_donation_progress
+
+        category = Category.objects.create(name='Concurrent Category')
+        cause = Causes.objects.create(
+            name='Concurrent Cause',
+            category=category,
+            organizer_id=uuid.uuid4(),
+            target_amount=Decimal('500.00'),
+            status='ongoing'
+        )
+
+        def donate(_):
+            try:
+                apply_donation_progress(cause.id, '10.00')
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(donate, range(50)))
+
+        cause.refresh_from_db()
+        self.assertEqual(cause.current_amount, Decimal('500.00'))
+        self.assertEqual(cause.status, 'completed')
+
+
+class ConsumeDonationEventsCommandTestCase(TestCase):
+    """Test cases for the donation event stream consumer"""
+
+    def setUp(self):
+        import fakeredis
+        from causehive_monolith import streams
+        streams.set_redis(fakeredis.FakeRedis(decode_responses=True))
+        self.addCleanup(streams.set_redis, None)
+
+        self.category = Category.objects.create(name='Stream Category')
+        self.causes = [
+            Causes.objects.create(
+                name=f'Stream Cause {i}',
+                category=self.category,
+                organizer_id=uuid.uuid4(),
+                target_amount=Decimal('100.00'),
+                status='ongoing'
+            )
+            for i in range(3)
+        ]
+
+    def consume(self):
+        from django.core.management import call_command
+        call_command('consume_donation_events', '--once', '--workers', '2', '--batch-size', '5')
+
+    def test_events_published_before_consumer_starts_are_applied(self):
+        """Test events queued while no consumer runs are applied once it starts"""
+        from donations.tasks import publish_donation_completed
+        for cause in self.causes:
+            for _ in range(4):
+                publish_donation_completed(cause.id, Decimal('12.50'))
+
+        self.consume()
+
+        for cause in self.causes:
+            cause.refresh_from_db()
+            self.assertEqual(cause.current_amount, Decimal('50.00'))
+
+    def test_events_are_applied_once(self):
+        """Test acked events are not applied again on the next run"""
+        from donations.tasks import publish_donation_completed
+        publish_donation_completed(self.causes[0].id, Decimal('100.00'))
+
+        self.consume()
+        self.consume()
+
+        self.causes[0].refresh_from_db()
+        self.assertEqual(self.causes[0].current_amount, Decimal('100.00'))
+        self.assertEqual(self.causes[0].status, 'completed')
+
+    def test_replayed_outbox_events_are_applied_once(self):
+        """Test an outbox event published twice only moves the cause once"""
+        from causes.models import ProcessedDonationEvent
+        from causehive_monolith import streams
+        from donations.tasks import DONATION_EVENTS_STREAM
+        event = {
+            'id': str(uuid.uuid4()),
+            'event': 'donation.completed',
+            'data': {'cause_id': str(self.causes[0].id), 'amount': '30.00'}
+        }
+        streams.publish(DONATION_EVENTS_STREAM, self.causes[0].id, event)
+        streams.publish(DONATION_EVENTS_STREAM, self.causes[0].id, event)
+        self.consume()
+        streams.publish(DONATION_EVENTS_STREAM, self.causes[0].id, event)
+        self.consume()
+
+        self.causes[0].refresh_from_db()
+        self.assertEqual(self.causes[0].current_amount, Decimal('30.00'))
+        self.assertEqual(ProcessedDonationEvent.objects.count(), 1)
+
+    def test_invalid_event_does_not_block_its_batch(self):
+        """Test an event that can never apply is dead-lettered and the rest of its batch applies"""
+        from causehive_monolith import streams
+        from donations.tasks import DONATION_EVENTS_STREAM, publish_donation_completed
+        publish_donation_completed(self.causes[0].id, Decimal('20.00'))
+        streams.publish(DONATION_EVENTS_STREAM, self.causes[0].id, {
+            'event': 'donation.completed',
+            'data': {'cause_id': str(self.causes[0].id), 'amount': 'not-a-number'}
+        })
+        publish_donation_completed(self.causes[0].id, Decimal('5.00'))
+
+        self.consume()
+        self.consume()
+
+        self.causes[0].refresh_from_db()
+        self.assertEqual(self.causes[0].current_amount, Decimal('25.00'))
+        partition = streams.stream_name(DONATION_EVENTS_STREAM, streams.partition_for(self.causes[0].id))
+        client = streams.get_redis()
+        self.assertEqual(client.xpending(partition, 'cause-progress')['pending'], 0)
+        self.assertEqual(client.xlen(streams.dead_letter_stream(partition)), 1)
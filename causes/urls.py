@@ -1,11 +1,12 @@
 from django.urls import path
 from .views import CauseCreateView, CauseDeleteView, CauseListView, CauseDetailView, AdminCauseListView, \
-    AdminCauseUpdateView
+    AdminCauseUpdateView, CauseBulkDetailView
 
 urlpatterns = [
     path('create/', CauseCreateView.as_view(), name='cause_create'),
     path('list/', CauseListView.as_view(), name='cause_list'),
     path('delete/<uuid:id>/', CauseDeleteView.as_view(), name='cause_delete'),
+    path('details/bulk/', CauseBulkDetailView.as_view(), name='cause_bulk_detail'),
     path('details/<uuid:id>/', CauseDetailView.as_view(), name='cause_detail'),
     path('admin/causes/', AdminCauseListView.as_view(), name='cause_admin_list'),
     path('admin/causes/<uuid:id>/update/', AdminCauseUpdateView.as_view(), name='cause_admin_update'),
@@ -1,17 +1,109 @@
-import requests
+import uuid
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import router, transaction
+from django.db.models import Case, F, Value, When
 from rest_framework import serializers
-from django.conf import settings
+
+from causehive_monolith.lookup_cache import lookup_cache
+from causehive_monolith.service_resolver import get_service_resolver, ServiceUnavailable
+from .models import Causes, ProcessedDonationEvent
 
 def validate_organizer_id_with_service(value):
-    user_service_url = getattr(settings, 'USER_SERVICE_URL', 'http://localhost:8000/user/')
-    url = f"{user_service_url}/users/{value}/"
     try:
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise serializers.ValidationError('Organizer not found in user service.')
-        user_data = response.json()
-        if not user_data.get('is_active', True):
-            raise serializers.ValidationError('User is not active.')
-    except requests.RequestException:
+        user_data = get_service_resolver().get_user(value)
+    except ServiceUnavailable:
         raise serializers.ValidationError('User service is not reachable.')
-    return value
\ No newline at end of file
+    if user_data is None:
+        raise serializers.ValidationError('Organizer not found in user service.')
+    if not user_data.get('is_active', True):
+        raise serializers.ValidationError('User is not active.')
+    return value
+
+def apply_donation_progress(cause_id, amount):
+    """
+    Add `amount` to a cause's current_amount in a single UPDATE, flipping its
+    status to completed in the same statement once the target is reached.
+    Returns False if the cause does not exist.
+    """
+    new_amount = F('current_amount') + Decimal(str(amount))
+    updated = Causes.objects.filter(id=cause_id).update(
+        current_amount=new_amount,
+        status=Case(
+            When(target_amount__lte=new_amount, then=Value('completed')),
+            default=F('status'),
+        ),
+    )
+    # update() bypasses the post_save invalidation in causes.signals. Drop the
+    # entry once committed, so a concurrent read cannot cache pre-commit totals
+    transaction.on_commit(
+        lambda: lookup_cache.invalidate('cause', cause_id), using=router.db_for_write(Causes)
+    )
+    return bool(updated)
+
+def validate_donation_event(event):
+    """
+    Raise ValueError for an event apply_donation_events could never apply, so
+    the consumer dead-letters it instead of failing its whole batch.
+    """
+    if not isinstance(event, dict):
+        raise ValueError('event is not an object')
+    if event.get('id') is not None:
+        uuid.UUID(str(event['id']))
+    if event.get('event') != 'donation.completed':
+        return
+    data = event.get('data')
+    if not isinstance(data, dict):
+        raise ValueError('donation.completed event has no data')
+    try:
+        uuid.UUID(str(data['cause_id']))
+        amount = Decimal(str(data['amount']))
+    except (KeyError, ValueError, InvalidOperation):
+        raise ValueError('donation.completed event has an invalid cause_id or amount')
+    if not amount.is_finite():
+        raise ValueError('donation.completed event has an invalid amount')
+
+
+def coalesce_donation_events(events):
+    """Sum the amounts of donation.completed events per cause: {cause_id: Decimal}."""
+    totals = defaultdict(Decimal)
+    for event in events:
+        if event.get('event') == 'donation.completed':
+            data = event['data']
+            totals[data['cause_id']] += Decimal(str(data['amount']))
+    return dict(totals)
+
+
+def apply_donation_events(events):
+    """
+    Apply a batch of donation events with one UPDATE per cause. Events carrying
+    an id (published from the donations outbox) are recorded in
+    ProcessedDonationEvent in the same transaction, so a replayed event is
+    applied only once.
+    """
+    fresh, seen = [], set()
+    for event in events:
+        event_id = event.get('id')
+        if event_id is None:
+            fresh.append(event)
+        elif event_id not in seen:
+            seen.add(event_id)
+            fresh.append(event)
+
+    with transaction.atomic(using=router.db_for_write(Causes)):
+        if seen:
+            processed = {
+                str(event_id) for event_id in
+                ProcessedDonationEvent.objects.filter(event_id__in=seen).values_list('event_id', flat=True)
+            }
+            fresh = [event for event in fresh if event.get('id') not in processed]
+            # A concurrent consumer recording the same id makes this raise and the batch is retried
+            ProcessedDonationEvent.objects.bulk_create(
+                [ProcessedDonationEvent(event_id=event_id) for event_id in seen - processed]
+            )
+        for cause_id, amount in coalesce_donation_events(fresh).items():
+            if apply_donation_progress(cause_id, amount):
+                print(f"Updated cause {cause_id} by {amount}")
+            else:
+                print(f"Cause {cause_id} not found")
@@ -1,3 +1,5 @@
+import uuid
+
 from django.shortcuts import render
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
@@ -34,6 +36,28 @@ class CauseDetailView(generics.RetrieveAPIView):
     serializer_class = CausesSerializer
     lookup_field = 'id'
 
+class CauseBulkDetailView(generics.ListAPIView):
+    """Return many causes in one query: /details/bulk/?ids=<uuid>,<uuid>,..."""
+    serializer_class = CausesSerializer
+    pagination_class = None
+    max_ids = 100
+
+    def list(self, request, *args, **kwargs):
+        raw_ids = [value for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        if not raw_ids:
+            return Response({"error": "ids query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > self.max_ids:
+            return Response({"error": f"At most {self.max_ids} ids can be requested at once."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            cause_ids = {uuid.UUID(value.strip()) for value in raw_ids}
+        except ValueError:
+            return Response({"error": "ids must be valid UUIDs."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Causes.objects.filter(id__in=cause_ids)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
 class CauseDeleteView(generics.DestroyAPIView):
     queryset = Causes.objects.all()
     serializer_class = CausesSerializer
@@ -1,8 +1,12 @@
 from django.contrib import admin
-from .models import CachedReportData
+from .models import CachedReportData, MetricWatermark
 
 # Register your models here.
 @admin.register(CachedReportData)
 class CachedReportDataAdmin(admin.ModelAdmin):
     list_display = ('report_type', 'generated_at')
-    search_fields = ('report_type',)
\ No newline at end of file
+    search_fields = ('report_type',)
+
+@admin.register(MetricWatermark)
+class MetricWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'watermark', 'last_full_recompute')
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_alter_cachedreportdata_report_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricWatermark',
+            fields=[
+                ('source', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('watermark', models.DateTimeField(help_text='Rows up to this time have been folded into the totals')),
+                ('totals', models.JSONField(default=dict)),
+                ('full_totals', models.JSONField(default=dict, help_text='Non-additive metrics from the last full recompute')),
+                ('last_full_recompute', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyMetricBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('data', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['source', 'day'],
+                'unique_together': {('source', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_latest_reports(apps, schema_editor):
+    CachedReportData = apps.get_model('dashboard', 'CachedReportData')
+    LatestReport = apps.get_model('dashboard', 'LatestReport')
+    db_alias = schema_editor.connection.alias
+
+    report_types = CachedReportData.objects.using(db_alias).values_list('report_type', flat=True).distinct()
+    for report_type in report_types:
+        report = CachedReportData.objects.using(db_alias).filter(
+            report_type=report_type
+        ).order_by('-generated_at').first()
+        LatestReport.objects.using(db_alias).create(
+            report_type=report_type, report=report, generated_at=report.generated_at
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_metricwatermark_dailymetricbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestReport',
+            fields=[
+                ('report_type', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('generated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='cachedreportdata',
+            index=models.Index(fields=['report_type', '-generated_at'], name='report_type_latest_idx'),
+        ),
+        migrations.AddField(
+            model_name='latestreport',
+            name='report',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dashboard.cachedreportdata'),
+        ),
+        migrations.RunPython(backfill_latest_reports, migrations.RunPython.noop),
+    ]
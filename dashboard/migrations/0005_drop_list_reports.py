@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:24
+
+from django.db import migrations
+
+LIST_REPORT_TYPES = ['user_list', 'users_list', 'donations_list', 'causes_list', 'payments_list', 'withdrawal_requests_list']
+
+
+def delete_list_reports(apps, schema_editor):
+    # The admin lists are now served from paginated queries; their stored copies are never read again
+    CachedReportData = apps.get_model('dashboard', 'CachedReportData')
+    CachedReportData.objects.using(schema_editor.connection.alias).filter(report_type__in=LIST_REPORT_TYPES).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_latestreport_report_type_latest_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_list_reports, migrations.RunPython.noop),
+    ]
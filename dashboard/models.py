@@ -3,6 +3,15 @@ import uuid
 from django.db import models
 from django.utils import timezone
 
+class CachedReportDataManager(models.Manager):
+    def latest_for(self, report_type):
+        """Return the newest report of `report_type` (one primary key lookup via LatestReport)."""
+        pointer = LatestReport.objects.select_related('report').filter(report_type=report_type).first()
+        if pointer is not None:
+            return pointer.report
+        return self.filter(report_type=report_type).order_by('-generated_at').first()
+
+
 # Create your models here.
 class CachedReportData(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -10,8 +19,50 @@ class CachedReportData(models.Model):
     data = models.JSONField()
     generated_at = models.DateTimeField(default=timezone.now)
 
+    objects = CachedReportDataManager()
+
     class Meta:
         unique_together = ('report_type', 'generated_at')
+        indexes = [
+            models.Index(fields=['report_type', '-generated_at'], name='report_type_latest_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.report_type} report at {self.generated_at}"
\ No newline at end of file
+        return f"{self.report_type} report at {self.generated_at}"
+
+class LatestReport(models.Model):
+    """Pointer to the newest CachedReportData of each report type, kept up to date by dashboard.signals."""
+    report_type = models.CharField(max_length=50, primary_key=True)
+    report = models.ForeignKey(CachedReportData, on_delete=models.CASCADE, related_name='+')
+    generated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Latest {self.report_type} report at {self.generated_at}"
+
+
+class DailyMetricBucket(models.Model):
+    """Additive counters (counts, decimal sums as strings) of one metric source for one day."""
+    source = models.CharField(max_length=50)
+    day = models.DateField()
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('source', 'day')
+        ordering = ['source', 'day']
+
+    def __str__(self):
+        return f"{self.source} metrics for {self.day}"
+
+
+class MetricWatermark(models.Model):
+    """Running totals of a metric source and how far its rows have been folded in."""
+    source = models.CharField(max_length=50, primary_key=True)
+    watermark = models.DateTimeField(help_text='Rows up to this time have been folded into the totals')
+    totals = models.JSONField(default=dict)
+    full_totals = models.JSONField(default=dict, help_text='Non-additive metrics from the last full recompute')
+    last_full_recompute = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.source} metrics up to {self.watermark}"
+
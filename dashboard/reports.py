@@ -0,0 +1,319 @@
+"""
+Reporting engine for the admin dashboard
+
+Dashboard metrics are computed with SQL aggregates (Count, Sum, conditional
+aggregation and TruncDay buckets) on each app's own database alias, instead
+of scraping the admin list endpoints of this process over HTTP. Every
+section is a small dict of totals plus DASHBOARD_DAILY_BUCKET_DAYS daily
+buckets, so the stored payload stays the same size as the tables grow.
+
+Donations, payments and withdrawals are maintained incrementally: per-day
+counters live in DailyMetricBucket and running totals in MetricWatermark,
+and each run only re-aggregates the days since the source's watermark. A
+full recompute (generate_fresh_report(full=True), scheduled daily) rebuilds
+them from scratch as a consistency check.
+
+Sections are computed independently: a section whose query fails is left
+out and reported in errors, the others still make it into the report.
+
+Only these metric payloads are stored. The admin lists are not reports:
+they are paginated queries served by dashboard.views.AdminListView.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from causes.models import Causes
+from donations.models import Donation
+from payments.models import PaymentTransaction
+from users_n_auth.models import User
+from withdrawal_transfer.models import WithdrawalRequest
+
+from .models import DailyMetricBucket, MetricWatermark
+
+
+def _money(value):
+    """Render a Sum/Avg result the way DRF renders decimals."""
+    if value is None:
+        value = Decimal('0')
+    return str(Decimal(value).quantize(Decimal('0.01')))
+
+
+def _window_start():
+    return timezone.now() - timedelta(days=getattr(settings, 'DASHBOARD_DAILY_BUCKET_DAYS', 30))
+
+
+def daily_buckets(queryset, date_field, amount_field=None, amount_filter=None):
+    """
+    Count (and optionally sum) rows per day over the bucket window.
+    Returns [{'date': 'YYYY-MM-DD', 'count': n, 'amount': '0.00'}, ...] oldest first.
+    """
+    annotations = {'count': Count('pk')}
+    if amount_field:
+        annotations['amount'] = Sum(amount_field, filter=amount_filter)
+
+    rows = (
+        queryset.filter(**{f'{date_field}__gte': _window_start()})
+        .annotate(day=TruncDay(date_field))
+        .values('day')
+        .annotate(**annotations)
+        .order_by('day')
+    )
+    buckets = []
+    for row in rows:
+        bucket = {'date': row['day'].date().isoformat(), 'count': row['count']}
+        if amount_field:
+            bucket['amount'] = _money(row['amount'])
+        buckets.append(bucket)
+    return buckets
+
+
+def user_metrics():
+    totals = User.objects.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        new_users=Count('id', filter=Q(date_joined__gte=_window_start())),
+    )
+    totals['daily'] = daily_buckets(User.objects.all(), 'date_joined')
+    return totals
+
+
+def cause_metrics():
+    by_status = {
+        status: Count('id', filter=Q(status=status)) for status, _ in Causes.STATUS_CHOICES
+    }
+    totals = Causes.objects.aggregate(
+        total_causes=Count('id'),
+        total_target_amount=Sum('target_amount'),
+        total_raised_amount=Sum('current_amount'),
+        **by_status,
+    )
+    return {
+        'total_causes': totals['total_causes'],
+        'total_target_amount': _money(totals['total_target_amount']),
+        'total_raised_amount': _money(totals['total_raised_amount']),
+        'by_status': {status: totals[status] for status in by_status},
+        'daily': daily_buckets(Causes.objects.all(), 'created_at'),
+    }
+
+
+class MetricSource:
+    """
+    A metric source maintained incrementally: per-day additive counters of
+    `model` bucketed on `date_field`. `full_only` aggregates are not additive
+    (distinct counts) and are refreshed by full recomputes only.
+    """
+
+    def __init__(self, model, date_field, counters, count_key, amount_key, full_only=None, derive=None):
+        self.model = model
+        self.date_field = date_field
+        self.counters = counters
+        self.count_key = count_key
+        self.amount_key = amount_key
+        self.full_only = full_only or {}
+        self.derive = derive
+
+    def aggregate_by_day(self, since=None):
+        queryset = self.model.objects.all()
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': since})
+        rows = (
+            queryset.annotate(day=TruncDay(self.date_field))
+            .values('day')
+            .annotate(**self.counters)
+            .order_by('day')
+        )
+        return {row['day'].date(): self.counter_values(row) for row in rows}
+
+    def counter_values(self, row):
+        return {
+            name: _money(row[name]) if isinstance(expression, Sum) else row[name]
+            for name, expression in self.counters.items()
+        }
+
+
+def _add_counters(totals, counters, sign=1):
+    """Return totals + sign * counters; decimal counters are kept as strings."""
+    result = dict(totals)
+    for name, value in counters.items():
+        if isinstance(value, str):
+            result[name] = _money(Decimal(result.get(name, '0')) + sign * Decimal(value))
+        else:
+            result[name] = result.get(name, 0) + sign * value
+    return result
+
+
+def _day_start(moment):
+    return timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _derive_withdrawals(totals):
+    total = totals['total_withdrawals']
+    totals['success_rate'] = (totals['completed_withdrawals'] / total) * 100 if total else 0
+    totals['average_amount'] = _money(Decimal(totals['total_amount']) / total) if total else _money(None)
+    return totals
+
+
+INCREMENTAL_SOURCES = {
+    'donations': MetricSource(
+        Donation, 'donated_at',
+        counters={
+            'total_donations': Count('id'),
+            'total_amount': Sum('amount'),
+            'completed_donations': Count('id', filter=Q(status='completed')),
+            'completed_amount': Sum('amount', filter=Q(status='completed')),
+            'pending_donations': Count('id', filter=Q(status='pending')),
+            'failed_donations': Count('id', filter=Q(status='failed')),
+        },
+        count_key='total_donations', amount_key='completed_amount',
+        full_only={
+            'total_users': Count('user_id', distinct=True),
+            'total_causes': Count('cause_id', distinct=True),
+        },
+    ),
+    'payments': MetricSource(
+        PaymentTransaction, 'transaction_date',
+        counters={
+            'total_transactions': Count('id'),
+            'total_amount': Sum('amount'),
+            'completed_transactions': Count('id', filter=Q(status='completed')),
+            'completed_amount': Sum('amount', filter=Q(status='completed')),
+            'pending_transactions': Count('id', filter=Q(status='pending')),
+            'failed_transactions': Count('id', filter=Q(status='failed')),
+        },
+        count_key='total_transactions', amount_key='completed_amount',
+    ),
+    'withdrawals': MetricSource(
+        WithdrawalRequest, 'requested_at',
+        counters={
+            'total_withdrawals': Count('id'),
+            'total_amount': Sum('amount'),
+            'completed_withdrawals': Count('id', filter=Q(status='completed')),
+            'failed_withdrawals': Count('id', filter=Q(status='failed')),
+            'processing_withdrawals': Count('id', filter=Q(status='processing')),
+        },
+        count_key='total_withdrawals', amount_key='total_amount',
+        derive=_derive_withdrawals,
+    ),
+}
+
+
+def refresh_source(name, full=False):
+    """
+    Fold the rows of source `name` changed since its watermark into the stored
+    daily buckets and running totals, and return the updated MetricWatermark.
+
+    Whole days are re-aggregated from the watermark (moved back by
+    DASHBOARD_INCREMENTAL_LOOKBACK_DAYS so late status changes are picked up)
+    and the difference to the stored buckets is applied to the totals.
+    A full recompute rebuilds every bucket and reports any drift it finds.
+    """
+    source = INCREMENTAL_SOURCES[name]
+    now = timezone.now()
+
+    with transaction.atomic(using=router.db_for_write(MetricWatermark)):
+        state = MetricWatermark.objects.select_for_update().filter(source=name).first()
+        full = full or state is None
+
+        buckets = DailyMetricBucket.objects.filter(source=name)
+        if full:
+            since = None
+            totals = {}
+        else:
+            lookback = timedelta(days=getattr(settings, 'DASHBOARD_INCREMENTAL_LOOKBACK_DAYS', 2))
+            since = _day_start(min(state.watermark, now - lookback))
+            buckets = buckets.filter(day__gte=since.date())
+            totals = state.totals
+
+        stored = dict(buckets.values_list('day', 'data'))
+        fresh = source.aggregate_by_day(since)
+
+        if not full:
+            for data in stored.values():
+                totals = _add_counters(totals, data, sign=-1)
+        for day, data in fresh.items():
+            totals = _add_counters(totals, data)
+        totals = {**{key: _money(None) if isinstance(expression, Sum) else 0
+                     for key, expression in source.counters.items()}, **totals}
+
+        buckets.exclude(day__in=fresh.keys()).delete()
+        DailyMetricBucket.objects.bulk_create(
+            [DailyMetricBucket(source=name, day=day, data=data) for day, data in fresh.items()],
+            update_conflicts=True,
+            unique_fields=['source', 'day'],
+            update_fields=['data', 'updated_at'],
+        )
+
+        if state is None:
+            state = MetricWatermark(source=name)
+        elif full and state.totals != totals:
+            drift = sorted(key for key in totals if state.totals.get(key) != totals[key])
+            print(f"Dashboard metrics drift corrected for {name}: {drift}")
+
+        state.watermark = now
+        state.totals = totals
+        if full:
+            state.full_totals = source.model.objects.aggregate(**source.full_only) if source.full_only else {}
+            state.last_full_recompute = now
+        state.save()
+    return state
+
+
+def incremental_metrics(name, full=False):
+    """Refresh source `name` and render its dashboard section."""
+    source = INCREMENTAL_SOURCES[name]
+    state = refresh_source(name, full=full)
+
+    section = {**state.totals, **state.full_totals}
+    if source.derive:
+        section = source.derive(section)
+
+    window = DailyMetricBucket.objects.filter(source=name, day__gte=_window_start().date()).order_by('day')
+    section['daily'] = [
+        {'date': bucket.day.isoformat(), 'count': bucket.data[source.count_key], 'amount': bucket.data[source.amount_key]}
+        for bucket in window
+    ]
+    return section
+
+
+# Dashboard section -> function computing it
+METRIC_SECTIONS = {
+    'users': user_metrics,
+    'causes': cause_metrics,
+    'donations': incremental_metrics,
+    'payments': incremental_metrics,
+    'withdrawals': incremental_metrics,
+}
+
+def build_sections(builders):
+    """
+    Call every builder in `builders` ({name: callable}).
+    Returns (results, errors); a builder that raises is reported in errors.
+    """
+    results, errors = {}, {}
+    for name, builder in builders.items():
+        try:
+            results[name] = builder()
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
+
+
+def build_dashboard_metrics(full=False):
+    """
+    Compute every dashboard section. Returns (metrics, errors).
+    Incremental sections fold in only new activity unless `full` is set.
+    """
+    builders = {}
+    for name, builder in METRIC_SECTIONS.items():
+        if name in INCREMENTAL_SOURCES:
+            builders[name] = lambda builder=builder, name=name: builder(name, full=full)
+        else:
+            builders[name] = builder
+    return build_sections(builders)
+
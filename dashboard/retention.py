@@ -0,0 +1,85 @@
+"""
+Retention for CachedReportData
+
+prune_reports() keeps the newest DASHBOARD_REPORT_KEEP_GENERATIONS reports
+of every report type and deletes the rest. With DASHBOARD_REPORT_COMPACT_DAILY
+on, the last pruned generation of each day of a compactable (metrics) report
+is first copied into a '<report_type>_daily' summary; summaries are kept for
+DASHBOARD_REPORT_KEEP_DAILY days.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import CachedReportData, LatestReport
+
+COMPACTABLE_REPORT_TYPES = ('dashboard_metrics', 'donations_stats', 'withdrawals_stats')
+DAILY_SUFFIX = '_daily'
+
+
+def _report_types():
+    report_types = set(LatestReport.objects.values_list('report_type', flat=True))
+    if not report_types:
+        report_types = set(CachedReportData.objects.values_list('report_type', flat=True).distinct())
+    return sorted(report_type for report_type in report_types if not report_type.endswith(DAILY_SUFFIX))
+
+
+def compact_daily(report_type, expired):
+    """Copy the last report of each day in `expired` into a '<report_type>_daily' summary."""
+    summary_type = report_type + DAILY_SUFFIX
+    last_per_day = expired.annotate(day=TruncDate('generated_at')).values('day').annotate(last=Max('generated_at'))
+
+    created = 0
+    for row in last_per_day:
+        existing = CachedReportData.objects.filter(report_type=summary_type, generated_at__date=row['day'])
+        if existing.filter(generated_at__gte=row['last']).exists():
+            continue
+        existing.delete()
+        report = expired.get(generated_at=row['last'])
+        CachedReportData.objects.create(report_type=summary_type, data=report.data, generated_at=report.generated_at)
+        created += 1
+    return created
+
+
+def prune_reports(keep=None, compact=None, dry_run=False):
+    """
+    Delete all but the newest `keep` generations of every report type.
+    Returns {report_type: rows deleted} (or rows that would be deleted with dry_run).
+    """
+    if keep is None:
+        keep = getattr(settings, 'DASHBOARD_REPORT_KEEP_GENERATIONS', 24)
+    if compact is None:
+        compact = getattr(settings, 'DASHBOARD_REPORT_COMPACT_DAILY', False)
+    keep = max(keep, 1)  # never prune the report LatestReport points at
+
+    deleted = {}
+    for report_type in _report_types():
+        # Generated_at of the oldest generation to keep, found with the (report_type, -generated_at) index
+        cutoff = CachedReportData.objects.filter(report_type=report_type).order_by(
+            '-generated_at'
+        ).values_list('generated_at', flat=True)[keep - 1:keep].first()
+        if cutoff is None:
+            continue
+
+        expired = CachedReportData.objects.filter(report_type=report_type, generated_at__lt=cutoff)
+        if dry_run:
+            deleted[report_type] = expired.count()
+            continue
+
+        with transaction.atomic(using=router.db_for_write(CachedReportData)):
+            if compact and report_type in COMPACTABLE_REPORT_TYPES:
+                compact_daily(report_type, expired)
+            deleted[report_type], _ = expired.delete()
+
+    if compact and not dry_run:
+        horizon = timezone.now() - timedelta(days=getattr(settings, 'DASHBOARD_REPORT_KEEP_DAILY', 90))
+        for report_type in COMPACTABLE_REPORT_TYPES:
+            summary_type = report_type + DAILY_SUFFIX
+            deleted[summary_type], _ = CachedReportData.objects.filter(
+                report_type=summary_type, generated_at__lt=horizon
+            ).delete()
+    return deleted
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import CachedReportData, LatestReport
+
+
+@receiver(post_save, sender=CachedReportData)
+def advance_latest_report(sender, instance, using=None, **kwargs):
+    """Point LatestReport at `instance` unless a newer report of its type is already published."""
+    pointer, created = LatestReport.objects.using(using).get_or_create(
+        report_type=instance.report_type,
+        defaults={'report': instance, 'generated_at': instance.generated_at},
+    )
+    if not created:
+        # Conditional update so concurrent writers can only move the pointer forward
+        LatestReport.objects.using(using).filter(
+            report_type=instance.report_type, generated_at__lte=instance.generated_at
+        ).update(report=instance, generated_at=instance.generated_at)
@@ -1,103 +1,76 @@
 from celery import shared_task
+from django.core.cache import cache
 from .models import CachedReportData
-from .utils import fetch_admin_data
+from .reports import build_dashboard_metrics
+from .retention import prune_reports
 from django.utils import timezone
 
+# Held while a regeneration requested by the dashboard views is queued or running
+REGENERATE_LOCK_KEY = 'dashboard:regenerate-report'
+
+# Cached stats report type -> dashboard section it stores
+STATS_REPORTS = {
+    'donations_stats': 'donations',
+    'withdrawals_stats': 'withdrawals',
+}
+
+
+def release_regenerate_lock(token):
+    """Release the regeneration lock if it is still the one taken with `token`."""
+    if token is not None and cache.get(REGENERATE_LOCK_KEY) == token:
+        cache.delete(REGENERATE_LOCK_KEY)
+
+
 @shared_task
-def generate_fresh_report():
+def generate_fresh_report(full=False, lock_token=None):
+    """
+    Compute and store the dashboard reports. `lock_token` is passed by the run
+    that took the regeneration lock; scheduled runs leave the lock alone.
+    """
     try:
-        # Fetch users and donations stats
-        users = fetch_admin_data('http://localhost:8000/user/admin-see/users/')
-        donations_list = fetch_admin_data('http://localhost:8002/donations/admin/donations/')
-        if isinstance(donations_list, dict) and 'results' in donations_list:
-            donations_list = donations_list['results']
-        elif not isinstance(donations_list, list):
-            donations_list = []
-        donations_stats = fetch_admin_data('http://localhost:8002/donations/admin/donations/statistics/')
-        withdrawal_request_list = fetch_admin_data('http://localhost:8002/withdrawals/admin/requests/')
-        withdrawals_stats = fetch_admin_data('http://localhost:8002/withdrawals/admin/statistics/')
+        metrics, errors = build_dashboard_metrics(full=full)
+        if not metrics:
+            print(f"Error generating fresh report: every section failed {errors}")
+            return
 
-        # Fetch causes (handle paginated or non-paginated)
-        causes_data = fetch_admin_data('http://localhost:8001/causes/admin/causes/')
-        if isinstance(causes_data, dict) and 'results' in causes_data:
-            causes_list = causes_data['results']
-            causes_count = causes_data.get('count', len(causes_list))
-        else:
-            causes_list = causes_data
-            causes_count = len(causes_list)
+        now = timezone.now()
 
-        # Fetch payments (handle paginated or non-paginated)
-        payments_data = fetch_admin_data('http://localhost:8002/payments/admin/transactions/')
-        if isinstance(payments_data, dict) and 'results' in payments_data:
-            payments_list = payments_data['results']
-            payments_count = payments_data.get('count', len(payments_list))
-        else:
-            payments_list = payments_data
-            payments_count = len(payments_list)
-
-        # Save dashboard metrics (with full lists and counts)
+        # Save dashboard metrics; sections that could not be computed are
+        # listed in failed_sections
         CachedReportData.objects.create(
             report_type='dashboard_metrics',
             data={
-                'users': users,
-                'donation_list': donations_list,
-                'donations_stats': donations_stats,
-                'causes_list': causes_list,
-                'causes_count': causes_count,
-                'payments_list': payments_list,
-                'payments_count': payments_count,
-                'withdrawal_request_list': withdrawal_request_list,
-                'withdrawals_stats': withdrawals_stats,
-                'generated_at': timezone.now().isoformat()
+                **metrics,
+                'failed_sections': sorted(errors),
+                'errors': errors,
+                'generated_at': now.isoformat()
             },
-            generated_at=timezone.now()
-        )
-
-        # Save users list
-        CachedReportData.objects.create(
-            report_type='users_list',
-            data=users,
-            generated_at=timezone.now()
-        )
-
-        # Save donations list
-        donations_list = fetch_admin_data('http://localhost:8002/donations/admin/donations/')
-        CachedReportData.objects.create(
-            report_type='donations_list',
-            data=donations_list,
-            generated_at=timezone.now()
+            generated_at=now
         )
 
-        # Save donations stats
-        donations_stats = fetch_admin_data('http://localhost:8002/donations/admin/statistics/')
-        CachedReportData.objects.create(
-            report_type='donations_stats',
-            data=donations_stats,
-            generated_at=timezone.now()
-        )
+        for report_type, section in STATS_REPORTS.items():
+            if section in metrics:
+                CachedReportData.objects.create(
+                    report_type=report_type,
+                    data=metrics[section],
+                    generated_at=now
+                )
 
-        # Save causes list
-        CachedReportData.objects.create(
-            report_type='causes_list',
-            data=causes_list,
-            generated_at=timezone.now()
-        )
+        if errors:
+            print(f"Partial report generated, failed sections: {sorted(errors)}")
+        else:
+            print("Fresh report generated successfully")
 
-        # Save payments list
-        CachedReportData.objects.create(
-            report_type='payments_list',
-            data=payments_list,
-            generated_at=timezone.now()
-        )
+    except Exception as e:
+        print(f"Error generating fresh report: {e}")
 
-        # Save withdrawals stats
-        CachedReportData.objects.create(
-            report_type='withdrawals_stats',
-            data=withdrawals_stats,
-            generated_at=timezone.now()
-        )
+    finally:
+        release_regenerate_lock(lock_token)
 
-        print("Fresh report generated successfully")
 
-    except Exception as e:
-        print(f"Error generating fresh report: {e}")
\ No newline at end of file
+@shared_task
+def prune_cached_reports():
+    """Keep the newest DASHBOARD_REPORT_KEEP_GENERATIONS reports of each type."""
+    deleted = prune_reports()
+    print(f"Pruned cached reports: {deleted}")
+    return deleted
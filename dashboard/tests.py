@@ -1,8 +1,10 @@
 import uuid
 from unittest.mock import patch, MagicMock
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from datetime import timedelta
+from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -118,6 +120,7 @@ class DashboardViewsTestCase(APITestCase):
     """Test cases for Dashboard views"""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         from admin_auth.models import User
         self.user = User.objects.create_user(
@@ -169,8 +172,10 @@ class DashboardViewsTestCase(APITestCase):
 
         response = self.client.get('/admin/dashboard/metrics/')
 
-        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
-        self.assertIn('No report data available', response.data['detail'])
+        # The old report is served straight away while a fresh one is generated
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_users'], 100)
+        self.assertGreaterEqual(int(response['Age']), 7200)
         mock_generate.delay.assert_called_once()
 
     def test_dashboard_metrics_unauthorized(self):
@@ -181,108 +186,175 @@ class DashboardViewsTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     @patch('dashboard.views.generate_fresh_report')
-    def test_admin_users_list_with_cached_data(self, mock_generate):
-        """Test admin users list with cached data"""
-        report = CachedReportData.objects.create(
-            report_type='user_list',
-            data={'users': [{'id': 1, 'name': 'Test User'}]},
-            generated_at=timezone.now()
-        )
-
+    def test_admin_users_list_is_paginated_query(self, mock_generate):
+        """Test admin users list is a page of the users table"""
+        from users_n_auth.models import User
         response = self.client.get('/admin/dashboard/users/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['users']), 1)
+        self.assertEqual(response.data['count'], User.objects.count())
+        self.assertIn('results', response.data)
         mock_generate.delay.assert_not_called()
 
     @patch('dashboard.views.generate_fresh_report')
-    def test_admin_donations_list_with_cached_data(self, mock_generate):
-        """Test admin donations list with cached data"""
-        report = CachedReportData.objects.create(
-            report_type='donations_list',
-            data={'donations': [{'id': 1, 'amount': 100}]},
-            generated_at=timezone.now()
+    def test_admin_donations_list_is_paginated_query(self, mock_generate):
+        """Test admin donations list is served without a cached report"""
+        from decimal import Decimal
+        from donations.models import Donation
+        donation = Donation.objects.create(
+            user_id=uuid.uuid4(), cause_id=uuid.uuid4(), recipient_id=uuid.uuid4(), amount=Decimal('100.00')
         )
 
         response = self.client.get('/admin/dashboard/donations/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['donations']), 1)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], str(donation.id))
         mock_generate.delay.assert_not_called()
 
     @patch('dashboard.views.generate_fresh_report')
-    def test_admin_causes_list_with_cached_data(self, mock_generate):
-        """Test admin causes list with cached data"""
-        report = CachedReportData.objects.create(
-            report_type='causes_list',
-            data={'causes': [{'id': 1, 'name': 'Test Cause'}]},
-            generated_at=timezone.now()
+    def test_admin_causes_list_is_paginated_query(self, mock_generate):
+        """Test an empty causes list is an empty page, not a pending report"""
+        response = self.client.get('/admin/dashboard/causes/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['results'], [])
+        mock_generate.delay.assert_not_called()
+
+
+class DashboardStaleWhileRevalidateTestCase(APITestCase):
+    """Test cases for serving stale reports and deduplicating regeneration"""
+
+    def setUp(self):
+        cache.clear()
+        from users_n_auth.models import User
+        self.user = User.objects.create_user(
+            email='admin@example.com',
+            first_name='Admin',
+            last_name='User',
+            password='testpass123'
         )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('dashboard_metrics')
 
-        response = self.client.get('/admin/dashboard/causes/')
+    def create_report(self, age):
+        return CachedReportData.objects.create(
+            report_type='dashboard_metrics',
+            data={'generated_at': 'then', 'age': str(age)},
+            generated_at=timezone.now() - age
+        )
+
+    @patch('dashboard.views.generate_fresh_report')
+    def test_newest_report_is_served(self, mock_generate):
+        """Test the newest report is served with its age"""
+        self.create_report(timedelta(minutes=50))
+        newest = self.create_report(timedelta(minutes=5))
+
+        response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['causes']), 1)
+        freshness = response.data.pop('freshness')
+        self.assertEqual(response.data, newest.data)
+        self.assertEqual(response['X-Report-Stale'], 'false')
+        self.assertLess(int(response['Age']), 400)
+        self.assertEqual(freshness['age'], int(response['Age']))
+        self.assertFalse(freshness['stale'])
+        self.assertEqual(freshness['generated_at'], newest.generated_at.isoformat())
         mock_generate.delay.assert_not_called()
 
+    @patch('dashboard.views.generate_fresh_report')
+    def test_burst_of_requests_triggers_one_regeneration(self, mock_generate):
+        """Test concurrent page loads on an old report queue a single regeneration"""
+        self.create_report(timedelta(hours=2))
+
+        for _ in range(10):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        mock_generate.delay.assert_called_once()
+
+    @patch('dashboard.views.generate_fresh_report')
+    def test_lock_released_after_regeneration(self, mock_generate):
+        """Test a finished regeneration lets the next old report trigger another"""
+        from .tasks import REGENERATE_LOCK_KEY
+        self.create_report(timedelta(hours=2))
+
+        self.client.get(self.url)
+        cache.delete(REGENERATE_LOCK_KEY)  # what generate_fresh_report does when it finishes
+        self.client.get(self.url)
+
+        self.assertEqual(mock_generate.delay.call_count, 2)
+
+    @patch('dashboard.views.generate_fresh_report')
+    def test_scheduled_run_keeps_requested_lock(self, mock_generate):
+        """Test a beat run finishing does not release the lock of a queued regeneration"""
+        from .reports import METRIC_SECTIONS
+        from .tasks import REGENERATE_LOCK_KEY, generate_fresh_report
+        self.create_report(timedelta(hours=2))
+        self.client.get(self.url)
+        lock_token = mock_generate.delay.call_args.kwargs['lock_token']
+
+        with patch.dict(METRIC_SECTIONS, {}, clear=True):
+            generate_fresh_report()  # scheduled run, holds no lock
+        self.client.get(self.url)
+        self.assertEqual(mock_generate.delay.call_count, 1)
+
+        with patch.dict(METRIC_SECTIONS, {}, clear=True):
+            generate_fresh_report(lock_token=lock_token)
+        self.assertIsNone(cache.get(REGENERATE_LOCK_KEY))
+
+    @override_settings(DASHBOARD_REPORT_STALE_AFTER=3600 * 6)
+    @patch('dashboard.views.generate_fresh_report')
+    def test_report_past_hard_limit_is_flagged_stale(self, mock_generate):
+        """Test reports older than the hard limit carry an explicit stale flag"""
+        self.create_report(timedelta(hours=7))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Report-Stale'], 'true')
+        self.assertTrue(response.data['freshness']['stale'])
+
+    @patch('dashboard.views.generate_fresh_report')
+    def test_refresh_is_deduplicated(self, mock_generate):
+        """Test repeated manual refreshes queue a single regeneration"""
+        first = self.client.post(reverse('dashboard_refresh'))
+        second = self.client.post(reverse('dashboard_refresh'))
+
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn('already in progress', second.data['detail'])
+        mock_generate.delay.assert_called_once()
+
 
 class DashboardTasksTestCase(TestCase):
     """Test cases for Dashboard tasks"""
-    @patch('dashboard.utils.requests.get')
-    def test_generate_fresh_report(self, mock_get):
-        """Test generate fresh report task"""
-        # Mock the requests.get responses
-        mock_responses = [
-            # Users response
-            MagicMock(
-                status_code=200,
-                json=lambda: {'users': [{'id': 1, 'email': 'test@example.com'}]}
-            ),
-            # Donations list response (first call)
-            MagicMock(
-                status_code=200,
-                json=lambda: {'results': [{'id': 1, 'amount': 100}]}
-            ),
-            # Donations stats response (first call)
-            MagicMock(
-                status_code=200,
-                json=lambda: {'total_amount': 1000, 'count': 10}
-            ),
-            # Withdrawal requests response
-            MagicMock(
-                status_code=200,
-                json=lambda: [{'id': 1, 'amount': 500}]
-            ),
-            # Withdrawals stats response
-            MagicMock(
-                status_code=200,
-                json=lambda: {'total_withdrawn': 5000, 'count': 5}
-            ),
-            # Causes response
-            MagicMock(
-                status_code=200,
-                json=lambda: {'results': [{'id': 1, 'title': 'Test Cause'}], 'count': 1}
-            ),
-            # Payments response
-            MagicMock(
-                status_code=200,
-                json=lambda: {'results': [{'id': 1, 'amount': 200}], 'count': 1}
-            ),
-            # Donations list response (second call)
-            MagicMock(
-                status_code=200,
-                json=lambda: {'results': [{'id': 1, 'amount': 100}]}
-            ),
-            # Donations stats response (second call)
-            MagicMock(
-                status_code=200,
-                json=lambda: {'total_amount': 1000, 'count': 10}
-            ),
-        ]
 
-        mock_get.side_effect = mock_responses
+    def setUp(self):
+        from decimal import Decimal
+        from donations.models import Donation
+        from withdrawal_transfer.models import WithdrawalRequest
+
+        self.cause_id = uuid.uuid4()
+        for amount, donation_status in [('100.00', 'completed'), ('50.00', 'completed'), ('25.00', 'pending')]:
+            Donation.objects.create(
+                user_id=uuid.uuid4(),
+                cause_id=self.cause_id,
+                recipient_id=uuid.uuid4(),
+                amount=Decimal(amount),
+                status=donation_status,
+            )
+        WithdrawalRequest.objects.create(
+            user_id=uuid.uuid4(),
+            cause_id=self.cause_id,
+            amount=Decimal('80.00'),
+            status='completed',
+            payment_details={'account_number': '0123456789', 'bank_code': '044', 'account_name': 'Test'},
+        )
 
-        # Call the task
+    @patch('dashboard.utils.http_client.get')
+    def test_generate_fresh_report(self, mock_get):
+        """Test generate fresh report task"""
         from .tasks import generate_fresh_report
         result = generate_fresh_report()
 
@@ -291,12 +363,241 @@ class DashboardTasksTestCase(TestCase):
 
         # Verify that CachedReportData objects were created
         self.assertTrue(CachedReportData.objects.filter(report_type='dashboard_metrics').exists())
-        self.assertTrue(CachedReportData.objects.filter(report_type='users_list').exists())
-        self.assertTrue(CachedReportData.objects.filter(report_type='donations_list').exists())
         self.assertTrue(CachedReportData.objects.filter(report_type='donations_stats').exists())
-        self.assertTrue(CachedReportData.objects.filter(report_type='causes_list').exists())
-        self.assertTrue(CachedReportData.objects.filter(report_type='payments_list').exists())
         self.assertTrue(CachedReportData.objects.filter(report_type='withdrawals_stats').exists())
 
-        # Verify the number of API calls
-        self.assertEqual(mock_get.call_count, 9)  # Total number of API calls in the task
\ No newline at end of file
+        # Metrics are computed in the database, no admin endpoints are scraped
+        mock_get.assert_not_called()
+
+        # Lists are paginated queries, no table is copied into a report
+        self.assertEqual(
+            set(CachedReportData.objects.values_list('report_type', flat=True)),
+            {'dashboard_metrics', 'donations_stats', 'withdrawals_stats'}
+        )
+
+    def test_dashboard_metrics_are_aggregates(self):
+        """Test the dashboard report stores totals and daily buckets, not rows"""
+        from .tasks import generate_fresh_report
+        generate_fresh_report()
+
+        metrics = CachedReportData.objects.get(report_type='dashboard_metrics').data
+        self.assertEqual(metrics['failed_sections'], [])
+        self.assertEqual(metrics['donations']['total_donations'], 3)
+        self.assertEqual(metrics['donations']['total_amount'], '175.00')
+        self.assertEqual(metrics['donations']['completed_amount'], '150.00')
+        self.assertEqual(metrics['donations']['pending_donations'], 1)
+        self.assertEqual(metrics['donations']['total_causes'], 1)
+        self.assertEqual(metrics['donations']['daily'][-1]['count'], 3)
+        self.assertEqual(metrics['withdrawals']['success_rate'], 100)
+        self.assertNotIn('donation_list', metrics)
+
+    def test_failed_section_is_flagged(self):
+        """Test a failing section does not drop the rest of the report"""
+        mock_payment_metrics = MagicMock(side_effect=Exception('payments database unavailable'))
+
+        from .reports import METRIC_SECTIONS
+        from .tasks import generate_fresh_report
+        with patch.dict(METRIC_SECTIONS, {'payments': mock_payment_metrics}):
+            generate_fresh_report()
+
+        metrics = CachedReportData.objects.get(report_type='dashboard_metrics').data
+        self.assertEqual(metrics['failed_sections'], ['payments'])
+        self.assertNotIn('payments', metrics)
+        self.assertEqual(metrics['donations']['total_donations'], 3)
+
+
+class IncrementalMetricsTestCase(TestCase):
+    """Test cases for incrementally maintained dashboard metrics"""
+
+    def setUp(self):
+        from donations.models import Donation
+        self.Donation = Donation
+        self.cause_id = uuid.uuid4()
+        self.make_donation('100.00', 'completed')
+
+    def make_donation(self, amount, donation_status='pending', donated_at=None):
+        from decimal import Decimal
+        donation = self.Donation.objects.create(
+            user_id=uuid.uuid4(),
+            cause_id=self.cause_id,
+            recipient_id=uuid.uuid4(),
+            amount=Decimal(amount),
+            status=donation_status,
+        )
+        if donated_at:
+            self.Donation.objects.filter(id=donation.id).update(donated_at=donated_at)
+        return donation
+
+    def test_first_run_is_full_recompute(self):
+        """Test the first run builds buckets and totals from scratch"""
+        from .models import DailyMetricBucket, MetricWatermark
+        from .reports import refresh_source
+
+        state = refresh_source('donations')
+
+        self.assertIsNotNone(state.last_full_recompute)
+        self.assertEqual(state.totals['total_donations'], 1)
+        self.assertEqual(state.full_totals['total_causes'], 1)
+        self.assertEqual(DailyMetricBucket.objects.filter(source='donations').count(), 1)
+        self.assertEqual(MetricWatermark.objects.get(source='donations').totals['total_amount'], '100.00')
+
+    def test_incremental_run_folds_new_and_changed_rows(self):
+        """Test new donations and recent status changes are folded into the totals"""
+        from .reports import refresh_source
+
+        refresh_source('donations')
+        pending = self.make_donation('40.00')
+        self.make_donation('10.00', 'completed')
+        self.Donation.objects.filter(id=pending.id).update(status='completed')
+
+        state = refresh_source('donations')
+
+        self.assertEqual(state.totals['total_donations'], 3)
+        self.assertEqual(state.totals['total_amount'], '150.00')
+        self.assertEqual(state.totals['completed_amount'], '150.00')
+        self.assertEqual(state.totals['pending_donations'], 0)
+
+    def test_incremental_run_skips_rows_before_watermark(self):
+        """Test an incremental run only re-aggregates days after the watermark"""
+        from .reports import refresh_source
+
+        refresh_source('donations')
+        self.make_donation('70.00', donated_at=timezone.now() - timedelta(days=30))
+
+        state = refresh_source('donations')
+        self.assertEqual(state.totals['total_donations'], 1)
+
+        state = refresh_source('donations', full=True)
+        self.assertEqual(state.totals['total_donations'], 2)
+        self.assertEqual(state.totals['total_amount'], '170.00')
+
+    def test_full_recompute_corrects_drift(self):
+        """Test the full recompute restores totals that drifted"""
+        from .models import MetricWatermark
+        from .reports import refresh_source
+
+        refresh_source('donations')
+        MetricWatermark.objects.filter(source='donations').update(
+            totals={'total_donations': 99, 'total_amount': '1.00'}
+        )
+
+        state = refresh_source('donations', full=True)
+        self.assertEqual(state.totals['total_donations'], 1)
+        self.assertEqual(state.totals['total_amount'], '100.00')
+
+
+class ReportRetentionTestCase(TestCase):
+    """Test cases for the latest-report pointer and pruning"""
+
+    def create_reports(self, report_type, count, start=None, step=timedelta(hours=1)):
+        start = start or timezone.now() - step * count
+        return [
+            CachedReportData.objects.create(
+                report_type=report_type, data={'generation': i}, generated_at=start + step * i
+            )
+            for i in range(count)
+        ]
+
+    def test_latest_for_returns_newest_report(self):
+        """Test the pointer follows the newest report, even when older ones are written later"""
+        reports = self.create_reports('dashboard_metrics', 3)
+        CachedReportData.objects.create(
+            report_type='dashboard_metrics', data={'late': True},
+            generated_at=reports[0].generated_at - timedelta(hours=1)
+        )
+
+        self.assertEqual(CachedReportData.objects.latest_for('dashboard_metrics'), reports[-1])
+        self.assertIsNone(CachedReportData.objects.latest_for('payments_list'))
+
+    def test_latest_for_is_a_single_query(self):
+        """Test the latest report is fetched with one query"""
+        self.create_reports('dashboard_metrics', 5)
+        with self.assertNumQueries(1):
+            CachedReportData.objects.latest_for('dashboard_metrics')
+
+    def test_prune_keeps_newest_generations(self):
+        """Test pruning keeps N generations per report type"""
+        from .retention import prune_reports
+        metrics = self.create_reports('dashboard_metrics', 5)
+        self.create_reports('causes_list', 2)
+
+        deleted = prune_reports(keep=3)
+
+        self.assertEqual(deleted, {'dashboard_metrics': 2})
+        remaining = CachedReportData.objects.filter(report_type='dashboard_metrics')
+        self.assertEqual(set(remaining), set(metrics[2:]))
+        self.assertEqual(CachedReportData.objects.latest_for('dashboard_metrics'), metrics[-1])
+
+    def test_prune_dry_run_deletes_nothing(self):
+        """Test a dry run only reports what would be pruned"""
+        from .retention import prune_reports
+        self.create_reports('dashboard_metrics', 4)
+
+        self.assertEqual(prune_reports(keep=1, dry_run=True), {'dashboard_metrics': 3})
+        self.assertEqual(CachedReportData.objects.count(), 4)
+
+    def test_prune_compacts_metrics_into_daily_summaries(self):
+        """Test pruned metrics reports leave one summary per day"""
+        from .retention import prune_reports
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=3)
+        reports = self.create_reports('dashboard_metrics', 12, start=start, step=timedelta(hours=6))
+        self.create_reports('donations_list', 3)
+
+        prune_reports(keep=2, compact=True)
+
+        summaries = CachedReportData.objects.filter(report_type='dashboard_metrics_daily').order_by('generated_at')
+        # Days 1-2 are fully pruned, day 3 loses its first two generations
+        self.assertEqual([summary.data for summary in summaries], [{'generation': 3}, {'generation': 7}, {'generation': 9}])
+        self.assertFalse(CachedReportData.objects.filter(report_type='donations_list_daily').exists())
+
+        # A later prune replaces day 3's summary with its last generation
+        self.create_reports('dashboard_metrics', 2, start=reports[-1].generated_at + timedelta(hours=12))
+        prune_reports(keep=2, compact=True)
+        summaries = CachedReportData.objects.filter(report_type='dashboard_metrics_daily').order_by('generated_at')
+        self.assertEqual([summary.data for summary in summaries][-1], {'generation': 11})
+
+
+class AdminListViewTestCase(APITestCase):
+    """Test cases for the paginated dashboard list endpoints"""
+
+    def setUp(self):
+        from decimal import Decimal
+        from donations.models import Donation
+        from users_n_auth.models import User
+        user = User.objects.create_user(
+            email='admin@example.com', first_name='Admin', last_name='User', password='testpass123'
+        )
+        self.client.force_authenticate(user=user)
+        now = timezone.now()
+        self.donations = []
+        for i in range(25):
+            donation = Donation.objects.create(
+                user_id=uuid.uuid4(), cause_id=uuid.uuid4(), recipient_id=uuid.uuid4(), amount=Decimal(f'{i}.00')
+            )
+            Donation.objects.filter(id=donation.id).update(donated_at=now - timedelta(minutes=i))
+            self.donations.append(str(donation.id))
+
+    def test_list_view_serves_requested_page(self):
+        """Test the dashboard list endpoint returns one page, newest first"""
+        response = self.client.get(reverse('admin_donations_list'), {'page': 3, 'page_size': 10})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual([row['id'] for row in response.data['results']], self.donations[20:])
+        self.assertIsNone(response.data['next'])
+        self.assertIn('page=2', response.data['previous'])
+
+        response = self.client.get(reverse('admin_donations_list'), {'page': 0})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_cost_does_not_grow_with_table(self):
+        """Test a page is one count and one bounded select"""
+        from django.db import connections, router
+        from django.test.utils import CaptureQueriesContext
+        from donations.models import Donation
+        with CaptureQueriesContext(connections[router.db_for_read(Donation)]) as queries:
+            response = self.client.get(reverse('admin_donations_list'), {'page_size': 5})
+
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(queries), 2)
+
@@ -1,5 +1,6 @@
 import os
-import requests
+
+from causehive_monolith import http_client
 
 ADMIN_SERVICE_API_KEY = os.getenv('ADMIN_SERVICE_API_KEY')
 HEADERS = {'X-ADMIN-SERVICE-API-KEY': ADMIN_SERVICE_API_KEY}
@@ -11,7 +12,7 @@ HEADERS = {'X-ADMIN-SERVICE-API-KEY': ADMIN_SERVICE_API_KEY}
 
 
 def fetch_admin_data(url, params=None):
-    response = requests.get(url, headers=HEADERS, params=params)
+    response = http_client.get(url, headers=HEADERS, params=params)
     try:
         response.raise_for_status()
         return response.json()
@@ -19,4 +20,5 @@ def fetch_admin_data(url, params=None):
         print(f"Error fetching {url}: {e}")
         print("Response status:", response.status_code)
         print("Response content:", response.content.decode())
-        raise
\ No newline at end of file
+        raise
+
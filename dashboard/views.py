@@ -1,158 +1,129 @@
-from django.core.serializers import serialize
-from django.shortcuts import render
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
+from rest_framework import generics, status, permissions
+from rest_framework.pagination import PageNumberPagination
 from .models import CachedReportData
 from .serializers import CachedReportDataSerializer
 from django.utils import timezone
-from datetime import timedelta
-from .tasks import generate_fresh_report
+from .tasks import generate_fresh_report, release_regenerate_lock, REGENERATE_LOCK_KEY
+from causes.models import Causes
+from causes.serializers import CausesSerializer
+from donations.models import Donation
+from donations.serializers import DonationSerializer
+from payments.models import PaymentTransaction
+from payments.serializers import PaymentTransactionSerializer
+from users_n_auth.models import User
+from users_n_auth.serializers import UserSerializer
+from withdrawal_transfer.models import WithdrawalRequest
+from withdrawal_transfer.serializers import AdminWithdrawalRequestSerializer
+
+
+def request_fresh_report():
+    """
+    Queue generate_fresh_report unless a regeneration is already queued or running.
+    The lock lives in the shared cache (Redis in production) and holds a token
+    that the queued task uses to release it when it finishes; otherwise it
+    expires after DASHBOARD_REGENERATE_LOCK_TIMEOUT.
+    Returns True if a new regeneration was queued.
+    """
+    timeout = getattr(settings, 'DASHBOARD_REGENERATE_LOCK_TIMEOUT', 900)
+    token = uuid.uuid4().hex
+    if not cache.add(REGENERATE_LOCK_KEY, token, timeout):
+        return False
+    try:
+        generate_fresh_report.delay(lock_token=token)
+    except Exception:
+        release_regenerate_lock(token)
+        raise
+    return True
+
 
 # Create your views here.
-class DashboardMetricsView(APIView):
+class CachedReportView(APIView):
+    """
+    Serve the newest cached report of `report_type` straight away (stale-while-revalidate).
+    Reports older than DASHBOARD_REPORT_MAX_AGE trigger one background regeneration;
+    reports older than DASHBOARD_REPORT_STALE_AFTER are flagged stale. The report's
+    age is returned in the Age, X-Report-Generated-At and X-Report-Stale headers,
+    and in the `freshness` object of the body.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    report_type = None
+    missing_detail = "No recent data available. Generating fresh report, please try again shortly."
 
     def get(self, request):
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-
-        report = CachedReportData.objects.filter(
-            report_type='dashboard_metrics',
-            generated_at__gte=one_hour_ago).first()
-
-        if report:
-            serializer = CachedReportDataSerializer(report)
-            return Response(serializer.data['data'])
-        else:
-            # trigger a fresh report generation here if needed
-            generate_fresh_report.delay()
-            return Response({"detail": "No report data available for the last hour. Generating fresh report, please try again "}, status=status.HTTP_202_ACCEPTED)
-
-class AdminUserListView(APIView):
+        report = CachedReportData.objects.latest_for(self.report_type)
+
+        if report is None:
+            # Nothing to serve yet: trigger a fresh report generation
+            request_fresh_report()
+            return Response({"detail": self.missing_detail}, status=status.HTTP_202_ACCEPTED)
+
+        age = max(int((timezone.now() - report.generated_at).total_seconds()), 0)
+        if age > getattr(settings, 'DASHBOARD_REPORT_MAX_AGE', 3600):
+            request_fresh_report()
+        stale = age > getattr(settings, 'DASHBOARD_REPORT_STALE_AFTER', 86400)
+
+        data = CachedReportDataSerializer(report).data['data']
+        if isinstance(data, dict):
+            data = {
+                **data,
+                'freshness': {'age': age, 'stale': stale, 'generated_at': report.generated_at.isoformat()},
+            }
+        return Response(data, headers={
+            'Age': str(age),
+            'X-Report-Generated-At': report.generated_at.isoformat(),
+            'X-Report-Stale': 'true' if stale else 'false',
+        })
+
+
+class DashboardMetricsView(CachedReportView):
+    report_type = 'dashboard_metrics'
+    missing_detail = "No report data available for the last hour. Generating fresh report, please try again "
+
+
+class DashboardListPagination(PageNumberPagination):
+    page_size = getattr(settings, 'DASHBOARD_REPORT_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'DASHBOARD_REPORT_MAX_PAGE_SIZE', 500)
+
+
+class AdminListView(generics.ListAPIView):
+    """
+    Admin list served a page at a time straight from its table (?page=, ?page_size=).
+    Lists are not part of the cached reports, so report generation never copies whole tables.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DashboardListPagination
 
-    def get(self, request):
-        # Check for recent cached user list
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-
-        report = CachedReportData.objects.filter(
-            report_type='user_list',
-            generated_at__gte=one_hour_ago
-        ).first()
-
-        if report:
-            serializer = CachedReportDataSerializer(report)
-            return Response(serializer.data['data'])
-        else:
-            # Trigger fresh report generation
-            generate_fresh_report.delay()
-            return Response(
-                {"detail": "No recent data available. Generating fresh report, please try again shortly."},
-                status=status.HTTP_202_ACCEPTED
-            )
 
+class AdminUserListView(AdminListView):
+    queryset = User.objects.order_by('-date_joined', 'pk')
+    serializer_class = UserSerializer
 
-class AdminDonationsListView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        # Check for recent cached donations list
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-
-        report = CachedReportData.objects.filter(
-            report_type='donations_list',
-            generated_at__gte=one_hour_ago
-        ).first()
-
-        if report:
-            serializer = CachedReportDataSerializer(report)
-            return Response(serializer.data['data'])
-        else:
-            # Trigger fresh report generation
-            generate_fresh_report.delay()
-            return Response(
-                {"detail": "No recent data available. Generating fresh report, please try again shortly."},
-                status=status.HTTP_202_ACCEPTED
-            )
+class AdminDonationsListView(AdminListView):
+    queryset = Donation.objects.order_by('-donated_at', 'pk')
+    serializer_class = DonationSerializer
 
 
-class AdminCausesListView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+class AdminCausesListView(AdminListView):
+    queryset = Causes.objects.order_by('-created_at', 'pk')
+    serializer_class = CausesSerializer
 
-    def get(self, request):
-        # Check for recent cached causes list
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-
-        report = CachedReportData.objects.filter(
-            report_type='causes_list',
-            generated_at__gte=one_hour_ago
-        ).first()
-
-        if report:
-            serializer = CachedReportDataSerializer(report)
-            return Response(serializer.data['data'])
-        else:
-            # Trigger fresh report generation
-            generate_fresh_report.delay()
-            return Response(
-                {"detail": "No recent data available. Generating fresh report, please try again shortly."},
-                status=status.HTTP_202_ACCEPTED
-            )
 
+class AdminPaymentsListView(AdminListView):
+    queryset = PaymentTransaction.objects.order_by('-transaction_date', 'pk')
+    serializer_class = PaymentTransactionSerializer
 
 
-
-class AdminPaymentsListView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request):
-        # Check for recent cached payments list
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-
-        report = CachedReportData.objects.filter(
-            report_type='payments_list',
-            generated_at__gte=one_hour_ago
-        ).first()
-
-        if report:
-            serializer = CachedReportDataSerializer(report)
-            return Response(serializer.data['data'])
-        else:
-            # Trigger fresh report generation
-            generate_fresh_report.delay()
-            return Response(
-                {"detail": "No recent data available. Generating fresh report, please try again shortly."},
-                status=status.HTTP_202_ACCEPTED
-            )
-
-class AdminWithdrawalRequestsListView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request):
-        # Check for recent cached withdrawal requests list
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-
-        report = CachedReportData.objects.filter(
-            report_type='withdrawal_requests_list',
-            generated_at__gte=one_hour_ago
-        ).first()
-
-        if report:
-            serializer = CachedReportDataSerializer(report)
-            return Response(serializer.data['data'])
-        else:
-            # Trigger fresh report generation
-            generate_fresh_report.delay()
-            return Response(
-                {"detail": "No recent data available. Generating fresh report, please try again shortly."},
-                status=status.HTTP_202_ACCEPTED
-            )
+class AdminWithdrawalRequestsListView(AdminListView):
+    queryset = WithdrawalRequest.objects.order_by('-requested_at', 'pk')
+    serializer_class = AdminWithdrawalRequestSerializer
 
 
 class RefreshReportView(APIView):
@@ -160,8 +131,12 @@ class RefreshReportView(APIView):
 
     def post(self, request):
         """Manually trigger a fresh report generation"""
-        generate_fresh_report.delay()
+        if not request_fresh_report():
+            return Response(
+                {"detail": "Report generation is already in progress. Data will be available shortly."},
+                status=status.HTTP_202_ACCEPTED
+            )
         return Response(
             {"detail": "Report generation started. Data will be available shortly."},
             status=status.HTTP_202_ACCEPTED
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,178 @@
+"""
+Idempotency keys for endpoints that start payments or transfers
+
+A client sends an Idempotency-Key header (any unique string, e.g. a UUID)
+with checkout, donate or withdrawal creation and reuses it on retries:
+- the first request claims the key by inserting an IdempotencyKey row
+  (unique per endpoint, user and key) and runs normally; its response is
+  stored in the row and in the shared cache
+- a replay gets the stored response, marked Idempotent-Replayed, without
+  running the view again (no new Paystack transaction or transfer)
+- a duplicate arriving while the first request is still running waits up to
+  IDEMPOTENCY_WAIT seconds for its response, then answers 409
+- reusing a key with a different body answers 422
+
+Keys are scoped per endpoint and owner: the user id, or for guests their
+cart (cart_id in the body) or session, so one guest cannot replay another
+guest's response by sending the same key.
+
+Only successful (2xx) responses are stored. Error responses, which here
+mostly mean the payment provider or a lookup failed before anything was
+started, release the key so the client can retry with it. A claim left
+behind by a process that died is taken over after
+IDEMPOTENCY_INFLIGHT_TIMEOUT seconds.
+Stored keys are pruned after IDEMPOTENCY_KEY_TTL seconds.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+CACHE_PREFIX = 'idempotency'
+
+
+def _cache_key(scope, owner, key):
+    return f"{CACHE_PREFIX}:{scope}:{owner}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, cls=JSONEncoder, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _replay(stored, digest):
+    if stored['request_hash'] != digest:
+        return Response(
+            {"error": f"{HEADER} was already used with a different request body"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(stored['body'], status=stored['status'], headers={'Idempotent-Replayed': 'true'})
+
+
+def _stored(row):
+    return {'request_hash': row.request_hash, 'status': row.status_code, 'body': row.response_body}
+
+
+def _claim(scope, owner, key, digest):
+    """Insert the in-flight row for the key. Returns True if this request owns the key."""
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_INFLIGHT_TIMEOUT', 60))
+    using = router.db_for_write(IdempotencyKey)
+    # A claim whose request died without completing it
+    IdempotencyKey.objects.filter(
+        scope=scope, owner=owner, key=key, completed_at__isnull=True, created_at__lt=stale_before
+    ).delete()
+    try:
+        with transaction.atomic(using=using):
+            IdempotencyKey.objects.create(scope=scope, owner=owner, key=key, request_hash=digest)
+        return True
+    except IntegrityError:
+        return False
+
+
+def _wait_for(scope, owner, key):
+    """Wait for the request holding the key to finish. Returns its stored response, or None on timeout."""
+    cache_key = _cache_key(scope, owner, key)
+    deadline = time.monotonic() + getattr(settings, 'IDEMPOTENCY_WAIT', 10)
+    while True:
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return stored
+        row = IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key).first()
+        if row is None:
+            return None  # The first request failed and released the key
+        if row.completed_at is not None:
+            return _stored(row)
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.1)
+
+
+def anonymous_owner(request):
+    """Owner of a guest's keys: their cart, else their session, else the shared guest space."""
+    data = request.data if isinstance(request.data, dict) else {}
+    cart_id = data.get('cart_id')
+    if cart_id:
+        return f"cart:{cart_id}"[:64]
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        return f"session:{session.session_key}"
+    return 'anonymous'
+
+
+def run_idempotent(request, scope, owner, handler):
+    """Run `handler()` for `request` at most once per Idempotency-Key, replaying its response to retries."""
+    key = request.headers.get(HEADER)
+    if not key:
+        return handler()
+    if len(key) > 255:
+        return Response({"error": f"{HEADER} must be at most 255 characters"}, status=status.HTTP_400_BAD_REQUEST)
+
+    owner = str(owner) if owner else anonymous_owner(request)
+    digest = request_hash(request)
+    cache_key = _cache_key(scope, owner, key)
+
+    stored = cache.get(cache_key)
+    if stored is not None:
+        return _replay(stored, digest)
+
+    if not _claim(scope, owner, key, digest):
+        stored = _wait_for(scope, owner, key)
+        if stored is None:
+            return Response(
+                {"error": f"A request with this {HEADER} is still in progress"},
+                status=status.HTTP_409_CONFLICT
+            )
+        return _replay(stored, digest)
+
+    try:
+        response = handler()
+    except Exception:
+        IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key).delete()
+        raise
+
+    if response.status_code >= 400:
+        IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key).delete()
+        return response
+
+    body = json.loads(json.dumps(response.data, cls=JSONEncoder))
+    IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key).update(
+        status_code=response.status_code, response_body=body, completed_at=timezone.now()
+    )
+    cache.set(
+        cache_key,
+        {'request_hash': digest, 'status': response.status_code, 'body': body},
+        timeout=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400),
+    )
+    return response
+
+
+def idempotent(scope):
+    """Honour the Idempotency-Key header on a function view; apply inside extract_user_from_token."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return run_idempotent(
+                request, scope, getattr(request, 'user_id', None),
+                lambda: view_func(request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+def prune_idempotency_keys():
+    """Delete keys older than IDEMPOTENCY_KEY_TTL seconds. Returns the number deleted."""
+    horizon = timezone.now() - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400))
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=horizon).delete()
+    return deleted
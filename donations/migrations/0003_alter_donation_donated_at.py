@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0002_alter_donation_user_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='donated_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_donationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='checkout_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -9,11 +9,82 @@ class Donation(models.Model):
     cause_id = models.UUIDField(db_index=True, editable=False)  # References either an event or cause ID from the event_causes_services
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=3, default='GHS')  # Default currency is GHS
-    donated_at = models.DateTimeField(auto_now_add=True)
+    donated_at = models.DateTimeField(auto_now_add=True, db_index=True)
     status = models.CharField(max_length=20, choices=[
         ('pending', 'Pending'),
         ('completed', 'Completed'),
         ('failed', 'Failed')
     ], default='pending')
     recipient_id = models.UUIDField(db_index=True, editable=False)
-    transaction_id = models.CharField(max_length=255, unique=True, null=True, blank=True)  # Unique transaction ID from payment gateway
\ No newline at end of file
+    transaction_id = models.CharField(max_length=255, unique=True, null=True, blank=True)  # Unique transaction ID from payment gateway
+    checkout_id = models.UUIDField(db_index=True, null=True, blank=True, editable=False)  # Shared by the donations of one cart checkout and its payment
+
+class DonationOutbox(models.Model):
+    """
+    Donation events waiting to be published. Rows are written in the same
+    transaction as the status change that causes them and relayed to the event
+    stream by donations.tasks.relay_donation_outbox.
+    """
+    id = models.BigAutoField(primary_key=True)
+    event_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    event_type = models.CharField(max_length=50)
+    partition_key = models.CharField(max_length=64)  # Cause ID, so a cause's events stay in order
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(sent_at__isnull=True), name='donation_outbox_unsent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({'sent' if self.sent_at else 'pending'})"
+
+    def as_event(self):
+        return {"id": str(self.event_id), "event": self.event_type, "data": self.payload}
+
+    @classmethod
+    def completed_event(cls, donation):
+        """Unsaved donation.completed row for `donation`, e.g. for bulk_create."""
+        return cls(
+            event_type='donation.completed',
+            partition_key=str(donation.cause_id),
+            payload={
+                "donation_id": str(donation.id),
+                "cause_id": str(donation.cause_id),
+                "amount": str(donation.amount)
+            },
+        )
+
+    @classmethod
+    def donation_completed(cls, donation, using=None):
+        """Queue a donation.completed event; call inside the transaction that completes the donation."""
+        event = cls.completed_event(donation)
+        event.save(using=using)
+        return event
+
+class IdempotencyKey(models.Model):
+    """
+    Outcome of a request made with an Idempotency-Key header (see
+    donations.idempotency). A row without completed_at is in flight.
+    """
+    id = models.BigAutoField(primary_key=True)
+    scope = models.CharField(max_length=50)  # Endpoint, e.g. "checkout"
+    owner = models.CharField(max_length=64)  # User ID, or the guest's cart/session (see idempotency.anonymous_owner)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'owner', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} ({'completed' if self.completed_at else 'in flight'})"
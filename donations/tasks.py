@@ -1,15 +1,92 @@
+from datetime import timedelta
+
 from celery import shared_task
-import json
-import redis
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
 
-@shared_task
-def publish_donation_completed_event(cause_id, amount):
-    r = redis.Redis(host='localhost', port=6379, db=0)
+from causehive_monolith import streams
+from .idempotency import prune_idempotency_keys
+from .models import DonationOutbox
+
+DONATION_EVENTS_STREAM = 'donation_events'
+
+
+def publish_donation_completed(cause_id, amount):
+    """Append a donation.completed event to the partition of the donation stream that owns the cause."""
     event = {
         "event": "donation.completed",
         "data": {
             "cause_id": str(cause_id),
-            "amount": float(amount)
+            "amount": str(amount)
         }
     }
-    r.publish('donation_events', json.dumps(event))
\ No newline at end of file
+    return streams.publish(DONATION_EVENTS_STREAM, cause_id, event)
+
+
+@shared_task
+def publish_donation_completed_event(cause_id, amount):
+    """
+    Legacy: nothing enqueues this task since donation.completed events go
+    through the DonationOutbox. It stays registered only so messages queued by
+    an earlier release are still published. Remove after 2026-12-01.
+    """
+    publish_donation_completed(cause_id, amount)
+
+
+def relay_outbox_batch(batch_size):
+    """
+    Publish the oldest unsent outbox rows in one pipelined round trip and mark them sent.
+    Rows are locked with SKIP LOCKED so several relays can run side by side. If
+    publishing fails the rows stay unsent and are retried; events published
+    twice carry the same id and are skipped by the consumer.
+    Returns the number of rows sent.
+    """
+    using = router.db_for_write(DonationOutbox)
+    with transaction.atomic(using=using):
+        rows = list(
+            DonationOutbox.objects.using(using).select_for_update(skip_locked=True)
+            .filter(sent_at__isnull=True).order_by('id')[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [row.id for row in rows]
+        try:
+            streams.publish_batch(DONATION_EVENTS_STREAM, [(row.partition_key, row.as_event()) for row in rows])
+        except Exception as e:
+            DonationOutbox.objects.using(using).filter(id__in=ids).update(
+                attempts=F('attempts') + 1, last_error=str(e)
+            )
+            print(f"Failed to relay {len(rows)} outbox rows: {e}")
+            return 0
+        DonationOutbox.objects.using(using).filter(id__in=ids).update(
+            sent_at=timezone.now(), attempts=F('attempts') + 1
+        )
+    return len(rows)
+
+
+@shared_task
+def relay_donation_outbox(batch_size=None, max_batches=50):
+    """Drain the donation outbox in batches (scheduled every few seconds by Celery beat)."""
+    batch_size = batch_size or getattr(settings, 'DONATION_OUTBOX_BATCH_SIZE', 100)
+    sent = 0
+    for _ in range(max_batches):
+        count = relay_outbox_batch(batch_size)
+        sent += count
+        if count < batch_size:
+            break
+    return sent
+
+
+@shared_task
+def prune_donation_outbox():
+    """Delete outbox rows sent more than DONATION_OUTBOX_RETENTION_DAYS ago."""
+    horizon = timezone.now() - timedelta(days=getattr(settings, 'DONATION_OUTBOX_RETENTION_DAYS', 7))
+    deleted, _ = DonationOutbox.objects.filter(sent_at__lt=horizon).delete()
+    return deleted
+
+
+@shared_task
+def prune_expired_idempotency_keys():
+    return prune_idempotency_keys()
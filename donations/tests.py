@@ -9,7 +9,7 @@ from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 
-from .models import Donation
+from .models import Donation, DonationOutbox
 from .serializers import DonationSerializer
 from .utils import validate_user_id_with_service, validate_cause_with_service
 
@@ -127,21 +127,22 @@ class DonationSerializerTestCase(TestCase):
         self.assertTrue(serializer.is_valid())
 
 
+@override_settings(SERVICE_RESOLVER_BACKEND='http')
 class DonationUtilsTestCase(TestCase):
     """Test cases for donation utility functions"""
 
-    @patch('donations.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_user_id_with_service_success(self, mock_get):
         """Test successful user validation"""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'is_user': True}
+        mock_response.json.return_value = {'id': str(uuid.uuid4())}
         mock_get.return_value = mock_response
 
         result = validate_user_id_with_service(uuid.uuid4())
         self.assertTrue(result)
 
-    @patch('donations.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_user_id_with_service_not_found(self, mock_get):
         """Test user validation when user not found"""
         mock_response = MagicMock()
@@ -151,18 +152,18 @@ class DonationUtilsTestCase(TestCase):
         with self.assertRaises(Exception):
             validate_user_id_with_service(uuid.uuid4())
 
-    @patch('donations.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_cause_with_service_success(self, mock_get):
         """Test successful cause validation"""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'is_cause': True}
+        mock_response.json.return_value = {'id': str(uuid.uuid4())}
         mock_get.return_value = mock_response
 
         result = validate_cause_with_service(uuid.uuid4())
         self.assertTrue(result)
 
-    @patch('donations.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_cause_with_service_invalid_cause(self, mock_get):
         """Test cause validation with invalid cause"""
         mock_response = MagicMock()
@@ -407,4 +408,70 @@ class DonationIntegrationTestCase(APITestCase):
                 mock_aggregate.return_value = {'amount__sum': Decimal('150.00')}
                 stats_response = self.client.get('/api/donations/statistics/')
                 self.assertEqual(stats_response.status_code, status.HTTP_200_OK)
-                self.assertEqual(stats_response.data['total_donations'], 1)
\ No newline at end of file
+                self.assertEqual(stats_response.data['total_donations'], 1)
+
+
+class DonationOutboxRelayTestCase(TestCase):
+    """Test cases for relaying the donation outbox to the event stream"""
+
+    def setUp(self):
+        import fakeredis
+        from causehive_monolith import streams
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        streams.set_redis(self.redis)
+        self.addCleanup(streams.set_redis, None)
+
+        self.donations = [
+            Donation.objects.create(
+                user_id=uuid.uuid4(),
+                cause_id=uuid.uuid4(),
+                amount=Decimal('25.00'),
+                recipient_id=uuid.uuid4(),
+                status='completed'
+            )
+            for _ in range(5)
+        ]
+        for donation in self.donations:
+            DonationOutbox.donation_completed(donation)
+
+    def published_events(self):
+        import json
+        from causehive_monolith.streams import partition_streams
+        from .tasks import DONATION_EVENTS_STREAM
+        return [
+            json.loads(fields['payload'])
+            for stream in partition_streams(DONATION_EVENTS_STREAM)
+            for _, fields in self.redis.xrange(stream)
+        ]
+
+    def test_relay_publishes_and_marks_rows_sent(self):
+        """Test every unsent row is published once and marked sent"""
+        from .tasks import relay_donation_outbox
+        self.assertEqual(relay_donation_outbox(batch_size=2), 5)
+        self.assertEqual(relay_donation_outbox(batch_size=2), 0)
+
+        self.assertFalse(DonationOutbox.objects.filter(sent_at__isnull=True).exists())
+        events = self.published_events()
+        self.assertEqual(len(events), 5)
+        self.assertEqual(
+            {event['id'] for event in events},
+            {str(event_id) for event_id in DonationOutbox.objects.values_list('event_id', flat=True)}
+        )
+        self.assertEqual(
+            {event['data']['donation_id'] for event in events},
+            {str(donation.id) for donation in self.donations}
+        )
+
+    def test_failed_publish_leaves_rows_unsent(self):
+        """Test rows stay queued with the error recorded when the stream is unreachable"""
+        from .tasks import relay_donation_outbox
+        with patch('causehive_monolith.streams.publish_batch', side_effect=ConnectionError('redis down')):
+            self.assertEqual(relay_donation_outbox(), 0)
+
+        self.assertEqual(DonationOutbox.objects.filter(sent_at__isnull=True).count(), 5)
+        row = DonationOutbox.objects.first()
+        self.assertEqual(row.attempts, 1)
+        self.assertIn('redis down', row.last_error)
+
+        self.assertEqual(relay_donation_outbox(), 5)
+        self.assertEqual(len(self.published_events()), 5)
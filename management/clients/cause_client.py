@@ -1,12 +1,13 @@
-import requests
 from django.conf import settings
 
+from causehive_monolith import http_client
+
 class CauseClient:
     BASE_URL = settings.CAUSE_SERVICE_URL
 
     @staticmethod
     def get_causes(params=None):
-        response = requests.get(
+        response = http_client.get(
             f"{CauseClient.BASE_URL}/admin/causes/",
             headers={'X-ADMIN-SERVICE-API-KEY': settings.ADMIN_SERVICE_API_KEY},
             params=params,
@@ -17,7 +18,7 @@ class CauseClient:
 
     @staticmethod
     def update_cause(cause_id, data):
-        response = requests.patch(
+        response = http_client.patch(
             f"{CauseClient.BASE_URL}/admin/causes/{cause_id}/update/",
             headers={'X-ADMIN-SERVICE-API-KEY': settings.ADMIN_SERVICE_API_KEY},
             json=data,
@@ -101,7 +101,7 @@ class CauseClientTestCase(TestCase):
         CAUSE_SERVICE_URL='http://localhost:8001/causes',
         ADMIN_SERVICE_API_KEY='test-api-key'
     )
-    @patch('management.clients.cause_client.requests.get')
+    @patch('management.clients.cause_client.http_client.get')
     def test_get_causes_success(self, mock_get):
         """Test successful get_causes call"""
         mock_response = MagicMock()
@@ -123,7 +123,7 @@ class CauseClientTestCase(TestCase):
         CAUSE_SERVICE_URL='http://localhost:8001/causes',
         ADMIN_SERVICE_API_KEY='test-api-key'
     )
-    @patch('management.clients.cause_client.requests.get')
+    @patch('management.clients.cause_client.http_client.get')
     def test_get_causes_without_params(self, mock_get):
         """Test get_causes call without parameters"""
         mock_response = MagicMock()
@@ -145,7 +145,7 @@ class CauseClientTestCase(TestCase):
         CAUSE_SERVICE_URL='http://localhost:8001/causes',
         ADMIN_SERVICE_API_KEY='test-api-key'
     )
-    @patch('management.clients.cause_client.requests.get')
+    @patch('management.clients.cause_client.http_client.get')
     def test_get_causes_http_error(self, mock_get):
         """Test get_causes call with HTTP error"""
         mock_response = MagicMock()
@@ -159,7 +159,7 @@ class CauseClientTestCase(TestCase):
         CAUSE_SERVICE_URL='http://localhost:8001/causes',
         ADMIN_SERVICE_API_KEY='test-api-key'
     )
-    @patch('management.clients.cause_client.requests.patch')
+    @patch('management.clients.cause_client.http_client.patch')
     def test_update_cause_success(self, mock_patch):
         """Test successful update_cause call"""
         cause_id = uuid.uuid4()
@@ -184,7 +184,7 @@ class CauseClientTestCase(TestCase):
         CAUSE_SERVICE_URL='http://localhost:8001/causes',
         ADMIN_SERVICE_API_KEY='test-api-key'
     )
-    @patch('management.clients.cause_client.requests.patch')
+    @patch('management.clients.cause_client.http_client.patch')
     def test_update_cause_http_error(self, mock_patch):
         """Test update_cause call with HTTP error"""
         cause_id = uuid.uuid4()
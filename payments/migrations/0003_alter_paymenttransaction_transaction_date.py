@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_alter_paymenttransaction_user_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymenttransaction',
+            name='transaction_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
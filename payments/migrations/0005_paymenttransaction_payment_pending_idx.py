@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_donationoutbox'),
+        ('payments', '0004_paystackwebhookevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymenttransaction',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['transaction_date', 'id'], name='payment_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+def normalize_gateway_statuses(apps, schema_editor):
+    """Payments that stored a raw non-final Paystack status (abandoned, ongoing, ...) go back to pending."""
+    PaymentTransaction = apps.get_model('payments', 'PaymentTransaction')
+    PaymentTransaction.objects.using(schema_editor.connection.alias).exclude(
+        status__in=['pending', 'completed', 'failed']
+    ).update(status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_paymenttransaction_checkout_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_gateway_statuses, migrations.RunPython.noop),
+    ]
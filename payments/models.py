@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.db.models import Q
 from donations.models import Donation
 
 # Create your models here.
@@ -16,8 +17,60 @@ class PaymentTransaction(models.Model):
         ('completed', 'Completed'),
         ('failed', 'Failed')
     ], default='pending')
-    transaction_date = models.DateTimeField(auto_now_add=True)
+    transaction_date = models.DateTimeField(auto_now_add=True, db_index=True)
     payment_method = models.CharField(max_length=50)
+    checkout_id = models.UUIDField(db_index=True, null=True, blank=True, editable=False)  # Cart checkout this payment settles; see donations_for()
+
+    class Meta:
+        indexes = [
+            # Keyset scans of pending payments by payments.reconciliation
+            models.Index(
+                fields=['transaction_date', 'id'], condition=models.Q(status='pending'), name='payment_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Payment for {self.donation} by {self.user_id} - {self.status}"
+
+    @staticmethod
+    def donations_for(payments):
+        """
+        Donations settled by `payments`: every donation of a payment's checkout,
+        or just its own donation for payments made outside a checkout.
+        """
+        checkout_ids = [payment.checkout_id for payment in payments if payment.checkout_id]
+        return Donation.objects.filter(
+            Q(id__in=[payment.donation_id for payment in payments]) | Q(checkout_id__in=checkout_ids)
+        )
+
+    @property
+    def donations(self):
+        return self.donations_for([self])
+
+class PaystackWebhookEvent(models.Model):
+    """
+    Inbox of signed Paystack webhook deliveries. The webhook stores the raw
+    event and answers immediately; payments.tasks.process_paystack_event
+    applies it. event_key is unique, so redelivered events are dropped on insert.
+    """
+    id = models.BigAutoField(primary_key=True)
+    event_key = models.CharField(max_length=255, unique=True)  # "<event>:<Paystack transaction id or reference>"
+    event = models.CharField(max_length=50)
+    reference = models.CharField(max_length=255, db_index=True)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True), name='paystack_event_unprocessed_idx'),
+        ]
 
     def __str__(self):
-        return f"Payment for {self.donation} by {self.user_id} - {self.status}"
\ No newline at end of file
+        return f"{self.event} {self.reference} ({'processed' if self.processed_at else 'pending'})"
+
+    @staticmethod
+    def key_for(event, data):
+        return f"{event}:{data.get('id') or data.get('reference')}"
@@ -1,8 +1,10 @@
-from http.client import responses
+import hashlib
+import hmac
 
-import requests
 from django.conf import settings
 
+from causehive_monolith import http_client
+
 class Paystack:
     BASE_URL = settings.PAYSTACK_BASE_URL
     SECRET_KEY = settings.PAYSTACK_SECRET_KEY
@@ -21,7 +23,7 @@ class Paystack:
             "amount": int(amount * 100), # Convert to pesewas
         }
 
-        response = requests.post(url, json=data, headers=headers)
+        response = http_client.post(url, json=data, headers=headers)
         return response.json()
 
     @classmethod
@@ -33,5 +35,13 @@ class Paystack:
             "Content-Type": "application/json",
         }
 
-        response = requests.get(url, headers=headers)
-        return response.json()
\ No newline at end of file
+        response = http_client.get(url, headers=headers)
+        return response.json()
+
+    @classmethod
+    def verify_signature(cls, payload, signature):
+        """Check the x-paystack-signature header: HMAC-SHA512 of the raw body keyed with the secret key"""
+        if not signature or not cls.SECRET_KEY:
+            return False
+        expected = hmac.new(cls.SECRET_KEY.encode(), payload, hashlib.sha512).hexdigest()
+        return hmac.compare_digest(expected, signature)
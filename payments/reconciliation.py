@@ -0,0 +1,152 @@
+"""
+Reconciliation of payments stuck in pending
+
+A payment stays pending when its webhook never arrives and nobody polls the
+verify endpoint. reconcile_pending_payments() sweeps payments pending for
+longer than PAYMENT_RECONCILE_AFTER seconds:
+- rows are read in keyset-paginated chunks of PAYMENT_RECONCILE_CHUNK_SIZE
+  over the partial payment_pending_idx index, so each chunk is one cheap
+  range scan however large the table is
+- each chunk is verified against Paystack from PAYMENT_RECONCILE_CONCURRENCY
+  threads, sharing a PAYMENT_RECONCILE_RATE_LIMIT calls/second budget
+- settled payments and the donations of their checkouts are updated with
+  one UPDATE per status, completed donations queue their donation.completed
+  events in one outbox insert, and status streams are notified once the
+  chunk commits
+
+Payments Paystack reports as abandoned are failed once they are older than
+PAYMENT_RECONCILE_ABANDON_AFTER seconds; anything else still unsettled is
+left pending for the next sweep.
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PaymentTransaction
+from .paystack import Paystack
+from .status_stream import publish_payment_status
+from .utils import settle_donations
+
+
+class RateLimiter:
+    """Space calls from any number of threads at least 1/per_second apart."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def iter_stale_pending(older_than, chunk_size):
+    """Yield lists of up to chunk_size pending payments created before `older_than`, oldest first."""
+    queryset = PaymentTransaction.objects.filter(status='pending', transaction_date__lt=older_than).only(
+        'id', 'transaction_id', 'transaction_date'
+    ).order_by('transaction_date', 'id')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(
+                Q(transaction_date__gt=last.transaction_date) | Q(transaction_date=last.transaction_date, id__gt=last.id)
+            )
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def fetch_gateway_statuses(references, concurrency, limiter):
+    """Verify `references` with Paystack. Returns {reference: Paystack status}; failed lookups are left out."""
+
+    def verify(reference):
+        limiter.wait()
+        try:
+            response = Paystack.verify_payment(reference)
+        except Exception as e:
+            print(f"Failed to verify payment {reference}: {e}")
+            return reference, None
+        if not response.get('status'):
+            return reference, None
+        return reference, response['data']['status']
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return {reference: status for reference, status in executor.map(verify, references) if status}
+
+
+def resolve_status(gateway_status, transaction_date, abandon_before):
+    """Status to give a pending payment Paystack reports as `gateway_status`, or None to leave it pending."""
+    if gateway_status == 'success':
+        return 'completed'
+    if gateway_status == 'failed':
+        return 'failed'
+    if gateway_status == 'abandoned' and transaction_date < abandon_before:
+        return 'failed'
+    return None
+
+
+def apply_statuses(updates):
+    """
+    Apply {payment id: new status} to payments still pending and to the
+    donations they settle with one UPDATE per status. Returns {status: payments updated}.
+    """
+    if not updates:
+        return {}
+    using = router.db_for_write(PaymentTransaction)
+    with transaction.atomic(using=using):
+        # Rows settled meanwhile by the webhook or verification are no longer pending and are skipped
+        payments = list(
+            PaymentTransaction.objects.select_for_update(skip_locked=True)
+            .filter(id__in=updates.keys(), status='pending')
+            .only('id', 'transaction_id', 'donation_id', 'checkout_id', 'status')
+        )
+        by_status = defaultdict(list)
+        for payment in payments:
+            payment.status = updates[payment.id]
+            by_status[payment.status].append(payment)
+
+        for new_status, settled in by_status.items():
+            PaymentTransaction.objects.filter(id__in=[payment.id for payment in settled]).update(status=new_status)
+            settle_donations(settled, new_status)
+
+        transaction.on_commit(lambda: [publish_payment_status(payment) for payment in payments], using=using)
+    return {new_status: len(settled) for new_status, settled in by_status.items()}
+
+
+def reconcile_pending_payments(older_than=None, chunk_size=None, concurrency=None, rate_limit=None):
+    """Sweep stale pending payments. Returns counts of checked, completed and failed payments."""
+    now = timezone.now()
+    if older_than is None:
+        older_than = now - timedelta(seconds=getattr(settings, 'PAYMENT_RECONCILE_AFTER', 900))
+    abandon_before = now - timedelta(seconds=getattr(settings, 'PAYMENT_RECONCILE_ABANDON_AFTER', 86400))
+    chunk_size = chunk_size or getattr(settings, 'PAYMENT_RECONCILE_CHUNK_SIZE', 200)
+    concurrency = concurrency or getattr(settings, 'PAYMENT_RECONCILE_CONCURRENCY', 4)
+    limiter = RateLimiter(getattr(settings, 'PAYMENT_RECONCILE_RATE_LIMIT', 10) if rate_limit is None else rate_limit)
+
+    counts = {'checked': 0, 'completed': 0, 'failed': 0}
+    for chunk in iter_stale_pending(older_than, chunk_size):
+        statuses = fetch_gateway_statuses([payment.transaction_id for payment in chunk], concurrency, limiter)
+        updates = {}
+        for payment in chunk:
+            new_status = resolve_status(statuses.get(payment.transaction_id), payment.transaction_date, abandon_before)
+            if new_status:
+                updates[payment.id] = new_status
+        for new_status, count in apply_statuses(updates).items():
+            counts[new_status] += count
+        counts['checked'] += len(chunk)
+    return counts
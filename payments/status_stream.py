@@ -0,0 +1,121 @@
+"""
+Live payment status over server-sent events
+
+Status changes are published on Redis pub/sub, one channel per payment
+reference (payment_status:<reference>), once the transaction that made them
+commits (see payments.utils.settle_payment).
+
+Each ASGI process holds one pattern subscription to payment_status:* and
+fans messages out to the SSE clients of that process through per-client
+asyncio queues, so a thousand open streams cost one Redis connection, not
+a thousand.
+
+A stream first sends the current status from the database, then every
+change, and ends once the payment reaches a terminal status or after
+PAYMENT_STATUS_STREAM_TIMEOUT seconds (EventSource clients reconnect).
+"""
+import asyncio
+import json
+import logging
+import weakref
+from collections import defaultdict
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+from causehive_monolith.streams import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHANNEL_PREFIX = 'payment_status'
+
+
+def status_channel(reference):
+    return f"{STATUS_CHANNEL_PREFIX}:{reference}"
+
+
+def status_event(payment):
+    return {
+        "reference": payment.transaction_id,
+        "status": payment.status,
+        "donation_id": str(payment.donation_id),
+    }
+
+
+def publish_payment_status(payment, client=None):
+    """Announce the payment's current status to stream subscribers. Best effort: the database stays the source of truth."""
+    try:
+        (client or get_redis()).publish(status_channel(payment.transaction_id), json.dumps(status_event(payment)))
+    except redis.RedisError as e:
+        print(f"Failed to publish status of payment {payment.transaction_id}: {e}")
+
+
+def async_redis_client():
+    return redis.asyncio.from_url(settings.EVENT_STREAM_REDIS_URL, decode_responses=True)
+
+
+class PaymentStatusHub:
+    """One pattern subscription per event loop, fanned out to the subscribers of each reference."""
+
+    def __init__(self, client_factory=None):
+        self.client_factory = client_factory or async_redis_client
+        self.subscribers = defaultdict(set)
+        self._reader = None
+        self._ready = None
+
+    async def _ensure_reader(self):
+        if self._reader is None:
+            self._ready = asyncio.Event()
+            self._reader = asyncio.create_task(self._read(self._ready))
+        await self._ready.wait()
+
+    async def _read(self, ready):
+        client = self.client_factory()
+        pubsub = client.pubsub()
+        try:
+            await pubsub.psubscribe(status_channel('*'))
+            ready.set()
+            while self.subscribers:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                reference = message['channel'].split(':', 1)[1]
+                for queue in list(self.subscribers.get(reference, ())):
+                    queue.put_nowait(message['data'])
+        except Exception:
+            # Open streams fall back to keepalives until they time out; the next subscriber starts a new reader
+            logger.exception("Payment status reader stopped")
+        finally:
+            # Retire before closing, so a subscriber arriving meanwhile starts a new reader
+            if self._reader is asyncio.current_task():
+                self._reader = None
+            ready.set()
+            await pubsub.aclose()
+            await client.aclose()
+
+    async def subscribe(self, reference):
+        queue = asyncio.Queue()
+        self.subscribers[reference].add(queue)
+        await self._ensure_reader()
+        return queue
+
+    def unsubscribe(self, reference, queue):
+        self.subscribers[reference].discard(queue)
+        if not self.subscribers[reference]:
+            del self.subscribers[reference]
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """Return the hub of the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = PaymentStatusHub()
+    return _hubs[loop]
+
+
+def sse_message(data, event='status'):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
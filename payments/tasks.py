@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PaystackWebhookEvent
+from .reconciliation import reconcile_pending_payments
+from .utils import settle_payment
+
+# Held while a reconciliation sweep runs so beat never starts overlapping sweeps
+RECONCILE_LOCK_KEY = 'payments:reconcile'
+
+# Webhook event -> Paystack transaction status it reports
+CHARGE_EVENTS = {
+    'charge.success': 'success',
+    'charge.failed': 'failed',
+}
+
+
+def apply_paystack_event(inbox_event):
+    """Settle the payment a charge event refers to; other events are only recorded."""
+    gateway_status = CHARGE_EVENTS.get(inbox_event.event)
+    if gateway_status is None:
+        return
+    data = inbox_event.payload.get('data', {})
+    payment = settle_payment(inbox_event.reference, data.get('status') or gateway_status)
+    if payment is None:
+        raise LookupError(f"Payment record not found for {inbox_event.reference}")
+
+
+@shared_task
+def process_paystack_event(inbox_id):
+    """Apply one inbox event. The row is locked so concurrent runs apply it once."""
+    using = router.db_for_write(PaystackWebhookEvent)
+    with transaction.atomic(using=using):
+        inbox_event = (
+            PaystackWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(id=inbox_id, processed_at__isnull=True).first()
+        )
+        if inbox_event is None:
+            return False
+        try:
+            with transaction.atomic(using=using):
+                apply_paystack_event(inbox_event)
+        except Exception as e:
+            PaystackWebhookEvent.objects.filter(id=inbox_id).update(
+                attempts=F('attempts') + 1, last_error=str(e)
+            )
+            print(f"Failed to process Paystack event {inbox_event.event_key}: {e}")
+            return False
+        PaystackWebhookEvent.objects.filter(id=inbox_id).update(
+            processed_at=timezone.now(), attempts=F('attempts') + 1, last_error=''
+        )
+    return True
+
+
+@shared_task
+def process_pending_paystack_events():
+    """
+    Re-drive inbox events still unprocessed PAYSTACK_WEBHOOK_RETRY_AFTER seconds
+    after they arrived (lost task, failed attempt), up to PAYSTACK_WEBHOOK_MAX_ATTEMPTS tries.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'PAYSTACK_WEBHOOK_RETRY_AFTER', 60))
+    pending = PaystackWebhookEvent.objects.filter(
+        processed_at__isnull=True,
+        received_at__lt=cutoff,
+        attempts__lt=getattr(settings, 'PAYSTACK_WEBHOOK_MAX_ATTEMPTS', 10),
+    ).order_by('id').values_list('id', flat=True)[:500]
+    return sum(bool(process_paystack_event(inbox_id)) for inbox_id in pending)
+
+
+@shared_task
+def reconcile_stale_payments():
+    """Settle payments left pending by a missed webhook (see payments.reconciliation)."""
+    if not cache.add(RECONCILE_LOCK_KEY, True, timeout=getattr(settings, 'PAYMENT_RECONCILE_LOCK_TIMEOUT', 3600)):
+        return None
+    try:
+        counts = reconcile_pending_payments()
+        print(f"Reconciled pending payments: {counts}")
+        return counts
+    finally:
+        cache.delete(RECONCILE_LOCK_KEY)
@@ -1,9 +1,10 @@
-from .views import PaystackWebhookView, InitiatePaymentView, VerifyPaymentView, AdminPaymentTransactionListView
+from .views import PaystackWebhookView, InitiatePaymentView, VerifyPaymentView, AdminPaymentTransactionListView, payment_status_stream
 from django.urls import path
 
 urlpatterns = [
     path('webhook/', PaystackWebhookView.as_view(), name='paystack_webhook'),
     path('initiate/', InitiatePaymentView.as_view(), name='initiate_payment'),
     path('verify/<str:reference>/', VerifyPaymentView.as_view(), name='verify_payment'),
+    path('status/<str:reference>/stream/', payment_status_stream, name='payment_status_stream'),
     path('admin/transactions/', AdminPaymentTransactionListView.as_view(), name='admin_payment_transaction_list'),
 ]
\ No newline at end of file
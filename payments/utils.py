@@ -0,0 +1,110 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+
+from donations.models import DonationOutbox
+from .models import PaymentTransaction
+from .paystack import Paystack
+from .status_stream import publish_payment_status
+
+# Paystack transaction status -> PaymentTransaction/Donation status. Every
+# other Paystack status (abandoned, ongoing, processing, queued, ...) is not
+# final, and leaves the payment pending
+GATEWAY_STATUSES = {
+    'success': 'completed',
+    'failed': 'failed',
+}
+
+# Payment statuses Paystack can no longer change
+TERMINAL_STATUSES = ('completed', 'failed')
+
+VERIFY_LOCK_PREFIX = 'paystack:verify-lock'
+VERIFY_PENDING_PREFIX = 'paystack:verify-pending'
+
+
+def settle_payment(reference, gateway_status):
+    """
+    Apply a Paystack transaction status to the payment with `reference` and the
+    donations it pays for in one transaction. A successful payment queues a
+    donation.completed event per donation in the donations outbox, and every status change
+    is announced to payment status streams once committed.
+    Completed payments are left as they are, so a payment settled by both the
+    verify endpoint and the webhook completes its donation once.
+    Returns the payment, or None if no payment has that reference.
+    """
+    using = router.db_for_write(PaymentTransaction)
+    with transaction.atomic(using=using):
+        payment = PaymentTransaction.objects.select_for_update().filter(transaction_id=reference).first()
+        if payment is None or payment.status == 'completed':
+            return payment
+
+        new_status = GATEWAY_STATUSES.get(gateway_status, 'pending')
+        if new_status == payment.status:
+            return payment
+        payment.status = new_status
+        payment.save(update_fields=['status'])
+        transaction.on_commit(lambda: publish_payment_status(payment), using=using)
+
+        if payment.status in TERMINAL_STATUSES:
+            settle_donations([payment], payment.status)
+    return payment
+
+
+def settle_donations(payments, new_status):
+    """
+    Give every donation settled by `payments` (all donations of their
+    checkouts) `new_status` in one UPDATE. Donations newly completed queue
+    their donation.completed events in one outbox insert, relayed to the event
+    stream by donations.tasks.relay_donation_outbox.
+    Call inside the transaction that settles the payments.
+    """
+    donations = PaymentTransaction.donations_for(payments)
+    completed = []
+    if new_status == 'completed':
+        completed = list(donations.exclude(status='completed').only('id', 'cause_id', 'amount'))
+    updated = donations.update(status=new_status)
+    if completed:
+        DonationOutbox.objects.bulk_create([DonationOutbox.completed_event(donation) for donation in completed])
+    return updated
+
+
+def verify_payment(reference):
+    """
+    Verify the payment with `reference`, calling Paystack only when the answer
+    is not known locally:
+    - unknown references and payments in a terminal status are answered from
+      the database
+    - a "still pending" answer from Paystack is cached for
+      PAYSTACK_VERIFY_PENDING_TTL seconds and served to polls in that window
+    - concurrent polls for one reference are collapsed into a single verify
+      call; the others wait for it (up to PAYSTACK_VERIFY_WAIT seconds) and
+      re-read the settled record
+    Returns (payment, error); error is Paystack's message when its verify call fails.
+    """
+    payment = PaymentTransaction.objects.filter(transaction_id=reference).first()
+    if payment is None or payment.status in TERMINAL_STATUSES:
+        return payment, None
+
+    pending_key = f"{VERIFY_PENDING_PREFIX}:{reference}"
+    if cache.get(pending_key):
+        return payment, None
+
+    lock_key = f"{VERIFY_LOCK_PREFIX}:{reference}"
+    if not cache.add(lock_key, True, timeout=getattr(settings, 'PAYSTACK_VERIFY_LOCK_TIMEOUT', 30)):
+        deadline = time.monotonic() + getattr(settings, 'PAYSTACK_VERIFY_WAIT', 10)
+        while cache.get(lock_key) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        return PaymentTransaction.objects.filter(transaction_id=reference).first(), None
+
+    try:
+        paystack_response = Paystack.verify_payment(reference)
+        if not paystack_response.get('status'):
+            return payment, paystack_response.get('message', 'Verification failed')
+        payment = settle_payment(reference, paystack_response['data']['status'])
+        if payment is not None and payment.status not in TERMINAL_STATUSES:
+            cache.set(pending_key, payment.status, timeout=getattr(settings, 'PAYSTACK_VERIFY_PENDING_TTL', 5))
+        return payment, None
+    finally:
+        cache.delete(lock_key)
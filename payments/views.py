@@ -1,15 +1,24 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, router, transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.response import Response
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.views import APIView
-from donations.tasks import publish_donation_completed_event
 
-from .models import PaymentTransaction
+from .models import PaymentTransaction, PaystackWebhookEvent
 from .paystack import Paystack
+from .status_stream import get_hub, sse_message, status_event
 from .serializers import PaymentTransactionSerializer
 from .permissions import IsAdminService
+from .tasks import process_paystack_event
+from .utils import TERMINAL_STATUSES, verify_payment
 
 # Create your views here.
 class PaymentTransactionViewSet(viewsets.ModelViewSet):
@@ -48,73 +57,104 @@ class InitiatePaymentView(APIView):
 
 class VerifyPaymentView(APIView):
     def get(self, request, reference):
-        paystack_response = Paystack.verify_payment(reference)
-        if paystack_response['status']:
-            data = paystack_response['data']
+        payment, error = verify_payment(reference)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        if payment is not None and payment.status == 'completed':
+            # Might send confirmation mails here. Later. ✨
+            return Response({'message': 'Payment verified and updated successfully'}, status=status.HTTP_200_OK)
+        return Response(
+            {'error': 'Payment not successful', 'status': payment.status if payment else None},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+
+async def stream_payment_status(reference):
+    """Yield the payment's current status, then each change, as server-sent events."""
+    hub = get_hub()
+    queue = await hub.subscribe(reference)
+    try:
+        # Read after subscribing so a change committed in between is not missed
+        payment = await PaymentTransaction.objects.filter(transaction_id=reference).afirst()
+        if payment is None:
+            # Removed since the view checked it exists
+            yield sse_message({"reference": reference, "error": "Payment record not found"}, event='error')
+            return
+        yield sse_message(status_event(payment))
+        if payment.status in TERMINAL_STATUSES:
+            return
+
+        loop = asyncio.get_running_loop()
+        keepalive = getattr(settings, 'PAYMENT_STATUS_STREAM_KEEPALIVE', 15)
+        deadline = loop.time() + getattr(settings, 'PAYMENT_STATUS_STREAM_TIMEOUT', 300)
+        while (remaining := deadline - loop.time()) > 0:
             try:
-                payment = PaymentTransaction.objects.get(transaction_id=reference)
-                if data['status'] == 'success':
-                    payment.status = 'completed'
-                    payment.save()
-
-                    if payment.donation:
-                        payment.donation.status = 'completed'
-                        payment.donation.save()
-                        publish_donation_completed_event.delay(payment.donation.cause_id, payment.donation.amount)
-
-                    # Might send confirmation mails here. Later. ✨
-
-                    return Response({'message': 'Payment verified and updated successfully'}, status=status.HTTP_200_OK)
-                else:
-                    payment.status = data['status']
-                    payment.save()
-                    return Response({'error': 'Payment not successful'}, status=status.HTTP_400_BAD_REQUEST)
-
-            except PaymentTransaction.DoesNotExist:
-                return Response({'error': 'Payment not successful'}, status=status.HTTP_400_BAD_REQUEST)
-        return Response({'error': paystack_response['message']}, status=status.HTTP_400_BAD_REQUEST)
-
+                data = await asyncio.wait_for(queue.get(), timeout=min(keepalive, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            event = json.loads(data)
+            yield sse_message(event)
+            if event['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        hub.unsubscribe(reference, queue)
+
+
+async def payment_status_stream(request, reference):
+    """
+    Server-sent events stream of a payment's status, a push alternative to
+    polling the verify endpoint. Needs an ASGI server (e.g. daphne).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The status stream needs an ASGI server'}, status=501)
+    if not await PaymentTransaction.objects.filter(transaction_id=reference).aexists():
+        return JsonResponse({'error': 'Payment record not found'}, status=404)
+
+    response = StreamingHttpResponse(stream_payment_status(reference), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
 
 
 class PaystackWebhookView(APIView):
+    """
+    Verify the x-paystack-signature HMAC, record the event in the inbox and
+    answer straight away; payments.tasks.process_paystack_event applies it.
+    Redelivered events hit the inbox's unique event_key and are dropped.
+    """
     authentication_classes = []
     permission_classes = []
 
     def post(self, request):
-        event = request.data('event')
-        data = request.data('data', {})
+        payload = request.body
+        if not Paystack.verify_signature(payload, request.headers.get('x-paystack-signature')):
+            return Response({'error': 'Invalid signature'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            body = json.loads(payload)
+        except ValueError:
+            return Response({'error': 'Invalid payload'}, status=status.HTTP_400_BAD_REQUEST)
+        event = body.get('event')
+        data = body.get('data') or {}
         reference = data.get('reference')
 
-        if not reference:
+        if not event or not reference:
             return Response({'error': 'Reference not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-        verification = Paystack.verify_payment(reference)
-        if not verification.get('status'):
-            return Response({'error': verification.get('message', 'Verification failed')}, status=status.HTTP_400_BAD_REQUEST)
-
-        payment_status = verification['data']['status']
-
         try:
-            payment = PaymentTransaction.objects.get(transaction_id=reference)
-            if payment_status == 'success':
-                payment.status = 'completed'
-
-                if payment.donation:
-                    payment.donation.status = 'completed'
-                    payment.donation.save()
-                    publish_donation_completed_event.delay(payment.donation.cause_id, payment.donation.amount)
-
-            elif payment_status == 'failed':
-                payment.status = 'failed'
-
-                if payment.donation:
-                    payment.donation.status = 'failed'
-                    payment.donation.save()
-            else:
-                payment.status = payment_status
-            payment.save()
-        except PaymentTransaction.DoesNotExist:
-            return Response({'error': 'Payment record not found'}, status=status.HTTP_400_BAD_REQUEST)
+            using = router.db_for_write(PaystackWebhookEvent)
+            with transaction.atomic(using=using):
+                inbox_event = PaystackWebhookEvent.objects.create(
+                    event_key=PaystackWebhookEvent.key_for(event, data),
+                    event=event,
+                    reference=reference,
+                    payload=body,
+                )
+                transaction.on_commit(lambda: process_paystack_event.delay(inbox_event.id), using=using)
+        except IntegrityError:
+            return Response({'status': 'duplicate'}, status=status.HTTP_200_OK)
 
         return Response({'status': 'success'}, status=status.HTTP_200_OK)
 
@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from causehive_monolith import http_client
+
+
+class HttpClientTestCase(SimpleTestCase):
+    """Test cases for the shared outbound HTTP client"""
+
+    def setUp(self):
+        http_client.reset_session()
+        self.addCleanup(http_client.reset_session)
+
+    def test_session_is_shared(self):
+        """Test every call reuses one pooled session"""
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    @override_settings(HTTP_CLIENT_POOL_CONNECTIONS=4, HTTP_CLIENT_POOL_MAXSIZE=8, HTTP_CLIENT_MAX_RETRIES=3)
+    def test_adapter_configuration(self):
+        """Test pool sizes and retry policy come from settings"""
+        adapter = http_client.get_session().get_adapter('https://api.paystack.co')
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 8)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertNotIn('POST', adapter.max_retries.allowed_methods)
+        self.assertIn('GET', adapter.max_retries.allowed_methods)
+
+    @override_settings(HTTP_CLIENT_CONNECT_TIMEOUT=1, HTTP_CLIENT_READ_TIMEOUT=2)
+    def test_default_timeout_applied(self):
+        """Test calls get the default (connect, read) timeout"""
+        with patch.object(http_client.get_session(), 'request') as mock_request:
+            http_client.get('https://example.com/')
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (1, 2))
+
+    def test_explicit_timeout_kept(self):
+        """Test a caller supplied timeout is not overridden"""
+        with patch.object(http_client.get_session(), 'request') as mock_request:
+            http_client.post('https://example.com/', json={}, timeout=5)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 5)
@@ -0,0 +1,90 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from causehive_monolith.lookup_cache import LocalLRU, lookup_cache, CachedServiceResolver
+
+
+class LocalLRUTestCase(SimpleTestCase):
+    """Test cases for the in-process LRU layer"""
+
+    def test_evicts_least_recently_used(self):
+        lru = LocalLRU(maxsize=2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+
+    def test_expired_entries_are_dropped(self):
+        lru = LocalLRU(maxsize=2)
+        with patch('causehive_monolith.lookup_cache.time.monotonic', return_value=100):
+            lru.set('a', 1, 5)
+        with patch('causehive_monolith.lookup_cache.time.monotonic', return_value=106):
+            self.assertIsNone(lru.get('a'))
+
+
+@override_settings(LOOKUP_CACHE_TTL=60, LOOKUP_CACHE_LOCAL_TTL=5)
+class LookupCacheTestCase(SimpleTestCase):
+    """Test cases for the read-through lookup cache"""
+
+    def setUp(self):
+        cache.clear()
+        lookup_cache.reset()
+        self.user_id = uuid.uuid4()
+
+    def test_read_through_and_counters(self):
+        loader = MagicMock(return_value={'id': str(self.user_id)})
+
+        for _ in range(3):
+            self.assertEqual(lookup_cache.get_or_load('user', self.user_id, loader), {'id': str(self.user_id)})
+
+        loader.assert_called_once()
+        stats = lookup_cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['local_hits'], 2)
+
+    def test_shared_layer_serves_after_local_miss(self):
+        loader = MagicMock(return_value={'id': str(self.user_id)})
+        lookup_cache.get_or_load('user', self.user_id, loader)
+        lookup_cache.local.clear()
+
+        lookup_cache.get_or_load('user', self.user_id, loader)
+
+        loader.assert_called_once()
+        self.assertEqual(lookup_cache.stats()['shared_hits'], 1)
+
+    def test_not_found_is_not_cached(self):
+        loader = MagicMock(return_value=None)
+        lookup_cache.get_or_load('cause', self.user_id, loader)
+        lookup_cache.get_or_load('cause', self.user_id, loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_invalidate_drops_both_layers(self):
+        loader = MagicMock(side_effect=[{'email': 'old@example.com'}, {'email': 'new@example.com'}])
+        lookup_cache.get_or_load('user', self.user_id, loader)
+
+        lookup_cache.invalidate('user', self.user_id)
+
+        self.assertEqual(lookup_cache.get_or_load('user', self.user_id, loader), {'email': 'new@example.com'})
+
+    def test_invalidate_matches_any_id_spelling(self):
+        loader = MagicMock(side_effect=[{'email': 'old@example.com'}, {'email': 'new@example.com'}])
+        lookup_cache.get_or_load('user', str(self.user_id).upper(), loader)
+
+        lookup_cache.invalidate('user', self.user_id)
+
+        self.assertEqual(lookup_cache.get_or_load('user', self.user_id.hex, loader), {'email': 'new@example.com'})
+
+    def test_cached_resolver_wraps_lookups(self):
+        backend = MagicMock()
+        backend.get_cause.return_value = {'id': 'cause'}
+        resolver = CachedServiceResolver(backend)
+
+        resolver.get_cause(self.user_id)
+        resolver.get_cause(self.user_id)
+
+        backend.get_cause.assert_called_once()
@@ -0,0 +1,84 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase, override_settings
+
+from causehive_monolith.lookup_scope import lookup_scope, gather, ScopedServiceResolver
+
+
+class ScopedServiceResolverTestCase(SimpleTestCase):
+    """Test cases for request-scoped lookup memoization"""
+
+    def setUp(self):
+        self.backend = MagicMock()
+        self.backend.get_cause.return_value = {'id': 'cause-1'}
+        self.resolver = ScopedServiceResolver(self.backend)
+
+    def test_identical_lookups_run_once_in_scope(self):
+        with lookup_scope():
+            self.resolver.get_cause('cause-1')
+            self.resolver.get_cause('cause-1')
+            self.resolver.get_cause('cause-2')
+        self.assertEqual(self.backend.get_cause.call_count, 2)
+
+    def test_no_memoization_outside_scope(self):
+        self.resolver.get_cause('cause-1')
+        self.resolver.get_cause('cause-1')
+        self.assertEqual(self.backend.get_cause.call_count, 2)
+
+    def test_scopes_do_not_leak(self):
+        with lookup_scope():
+            self.resolver.get_cause('cause-1')
+        with lookup_scope():
+            self.resolver.get_cause('cause-1')
+        self.assertEqual(self.backend.get_cause.call_count, 2)
+
+    def test_errors_are_shared(self):
+        self.backend.get_user.side_effect = ValueError('boom')
+        with lookup_scope():
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    self.resolver.get_user('user-1')
+        self.backend.get_user.assert_called_once()
+
+
+@override_settings(SERVICE_RESOLVER_BACKEND='http')
+class GatherTestCase(SimpleTestCase):
+    """Test cases for concurrent lookup fan-out"""
+
+    def test_calls_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def call(value):
+            barrier.wait()
+            return value
+
+        started = time.monotonic()
+        results = gather(lambda: call(1), lambda: call(2), lambda: call(3))
+
+        self.assertEqual(results, [1, 2, 3])
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_concurrent_calls_share_scope(self):
+        backend = MagicMock()
+        backend.get_cause.side_effect = lambda cause_id, request: time.sleep(0.05) or {'id': cause_id}
+        resolver = ScopedServiceResolver(backend)
+
+        with lookup_scope():
+            gather(lambda: resolver.get_cause('cause-1'), lambda: resolver.get_cause('cause-1'))
+
+        backend.get_cause.assert_called_once()
+
+    def test_first_error_is_raised(self):
+        def fail(message):
+            raise ValueError(message)
+
+        with self.assertRaisesMessage(ValueError, 'first'):
+            gather(lambda: 1, lambda: fail('first'), lambda: fail('second'))
+
+    @override_settings(SERVICE_RESOLVER_BACKEND='inprocess')
+    def test_inprocess_runs_serially(self):
+        threads = []
+        gather(lambda: threads.append(threading.current_thread()), lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()] * 2)
@@ -0,0 +1,93 @@
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+
+from causehive_monolith import streams
+
+
+@override_settings(EVENT_STREAM_PARTITIONS=4)
+class StreamConsumerTestCase(SimpleTestCase):
+    """Test cases for partitioned Redis streams with consumer groups"""
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(decode_responses=True)
+        streams.set_redis(self.client)
+        self.addCleanup(streams.set_redis, None)
+        self.handled = []
+
+    def consumer(self, name='worker-0', handler=None, worker=0, workers=1, **kwargs):
+        consumer = streams.StreamConsumer(
+            streams.partition_streams('events', worker, workers), 'group', name,
+            handler or self.handled.extend, block_ms=0, **kwargs
+        )
+        consumer.ensure_groups()
+        return consumer
+
+    def test_same_key_lands_on_one_partition(self):
+        for i in range(5):
+            streams.publish('events', 'cause-1', {'n': i})
+
+        partition = streams.stream_name('events', streams.partition_for('cause-1'))
+        self.assertEqual(self.client.xlen(partition), 5)
+
+    def test_partitions_are_split_between_workers(self):
+        owned = [streams.partition_streams('events', worker, 3) for worker in range(3)]
+        self.assertEqual(sorted(sum(owned, [])), [f'events:{p}' for p in range(4)])
+
+    def test_batches_are_read_and_acked(self):
+        consumer = self.consumer(batch_size=2)
+        for i in range(3):
+            streams.publish('events', 'cause-1', {'n': i})
+
+        self.assertEqual(consumer.poll(), 2)
+        self.assertEqual(consumer.poll(), 1)
+        self.assertEqual([event['n'] for event in self.handled], [0, 1, 2])
+        for stream in consumer.streams:
+            self.assertEqual(self.client.xpending(stream, 'group')['pending'], 0)
+
+    def test_events_published_while_consumer_is_down_are_delivered(self):
+        self.consumer()  # group exists, consumer then goes away
+        streams.publish('events', 'cause-1', {'n': 1})
+
+        self.assertEqual(self.consumer(name='worker-restarted').poll(), 1)
+        self.assertEqual(self.handled, [{'n': 1}])
+
+    def test_failed_batch_stays_pending_and_is_reclaimed(self):
+        def fail(events):
+            raise RuntimeError('database unavailable')
+
+        streams.publish('events', 'cause-1', {'n': 1})
+        crashed = self.consumer(name='crashed', handler=fail)
+        self.assertEqual(crashed.poll(), 0)
+
+        partition = streams.stream_name('events', streams.partition_for('cause-1'))
+        self.assertEqual(self.client.xpending(partition, 'group')['pending'], 1)
+
+        rescuer = self.consumer(name='rescuer', reclaim_idle_ms=0)
+        self.assertEqual(rescuer.reclaim(), 1)
+        self.assertEqual(self.handled, [{'n': 1}])
+        self.assertEqual(self.client.xpending(partition, 'group')['pending'], 0)
+
+    def test_malformed_entries_are_dropped(self):
+        partition = streams.stream_name('events', 0)
+        consumer = self.consumer()
+        self.client.xadd(partition, {'other': 'field'})
+
+        self.assertEqual(consumer.poll(), 1)
+        self.assertEqual(self.handled, [])
+
+    def test_rejected_events_are_dead_lettered(self):
+        def validate(event):
+            if event['n'] < 0:
+                raise ValueError('negative')
+
+        consumer = self.consumer(validate=validate)
+        for n in (1, -1, 2):
+            streams.publish('events', 'cause-1', {'n': n})
+
+        self.assertEqual(consumer.poll(), 3)
+        self.assertEqual(self.handled, [{'n': 1}, {'n': 2}])
+        partition = streams.stream_name('events', streams.partition_for('cause-1'))
+        dead = self.client.xrange(streams.dead_letter_stream(partition))
+        self.assertEqual(len(dead), 1)
+        self.assertEqual(dead[0][1]['error'], 'negative')
+        self.assertEqual(self.client.xpending(partition, 'group')['pending'], 0)
@@ -1,8 +1,24 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+
+from causehive_monolith.lookup_cache import lookup_cache
 from .models import User, UserProfile
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        UserProfile.objects.create(user=instance)
\ No newline at end of file
+        UserProfile.objects.create(user=instance)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_lookup(sender, instance, using=None, **kwargs):
+    lookup_cache.invalidate('user', instance.pk)
+    # Drop again once the change is visible to other connections
+    transaction.on_commit(lambda: lookup_cache.invalidate('user', instance.pk), using=using)
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_lookup(sender, instance, using=None, **kwargs):
+    lookup_cache.invalidate('profile', instance.user_id)
+    transaction.on_commit(lambda: lookup_cache.invalidate('profile', instance.user_id), using=using)
@@ -748,4 +748,71 @@ class UserViewsTestCase(APITestCase):
             login_response = self.client.post('/user/auth/login/', login_data)
             self.assertEqual(login_response.status_code, status.HTTP_200_OK)
         else:
-            self.skipTest("Password reset confirm endpoint not found")
\ No newline at end of file
+            self.skipTest("Password reset confirm endpoint not found")
+
+class LookupCacheInvalidationTestCase(TestCase):
+    """Test cases for lookup cache invalidation on user changes"""
+
+    def setUp(self):
+        from causehive_monolith.lookup_cache import lookup_cache
+        from causehive_monolith.service_resolver import get_service_resolver
+
+        cache.clear()
+        lookup_cache.reset()
+        self.resolver = get_service_resolver('inprocess', cached=True)
+        self.user = User.objects.create_user(
+            email='cached@example.com',
+            first_name='Cached',
+            last_name='User',
+            password='testpass123'
+        )
+
+    def test_user_save_invalidates_lookup(self):
+        """Test saving a user drops its cached lookup"""
+        self.assertEqual(self.resolver.get_user(self.user.id)['email'], 'cached@example.com')
+
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+
+        self.assertEqual(self.resolver.get_user(self.user.id)['email'], 'renamed@example.com')
+
+    def test_profile_save_invalidates_lookup(self):
+        """Test saving a profile drops its cached lookup"""
+        self.assertIsNone(self.resolver.get_user_profile(self.user.id)['withdrawal_address'])
+
+        profile = self.user.profile
+        profile.withdrawal_address = {'payment_method': 'mobile_money', 'phone_number': '0240000000'}
+        profile.save()
+
+        self.assertEqual(
+            self.resolver.get_user_profile(self.user.id)['withdrawal_address']['payment_method'],
+            'mobile_money'
+        )
+
+    def test_user_delete_invalidates_lookup(self):
+        """Test deleting a user drops its cached lookup"""
+        user_id = self.user.id
+        self.assertIsNotNone(self.resolver.get_user(user_id))
+
+        self.user.delete()
+
+        self.assertIsNone(self.resolver.get_user(user_id))
+
+
+class CacheStatsViewTestCase(APITestCase):
+    """Test cases for the lookup cache stats endpoint"""
+
+    def setUp(self):
+        cache.clear()  # Throttle history of earlier tests
+
+    @override_settings(ADMIN_SERVICE_API_KEY='test-key-123')
+    def test_requires_admin_service_key(self):
+        """Test cache internals are only shown to the admin service"""
+        url = reverse('cache_stats')
+        denied = (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+        self.assertIn(self.client.get(url).status_code, denied)
+        self.assertIn(self.client.get(url, HTTP_X_ADMIN_SERVICE_API_KEY='wrong-key').status_code, denied)
+
+        response = self.client.get(url, HTTP_X_ADMIN_SERVICE_API_KEY='test-key-123')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('lookup_cache', response.data)
@@ -1,3 +1,4 @@
+import logging
 from tokenize import TokenError
 
 import requests
@@ -13,7 +14,7 @@ from django.utils.encoding import force_bytes
 from django.utils.html import strip_tags
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, generics, permissions
+from rest_framework import status, generics, permissions, serializers
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.exceptions import AuthenticationFailed, NotFound
 from rest_framework.filters import SearchFilter, OrderingFilter
@@ -25,11 +26,16 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from cart.stores import claim_anonymous_cart
+from causehive_monolith import http_client
+
 from .models import User, UserProfile
 from .permissions import IsAdminService
 from .serializers import UserSerializer, UserProfileSerializer
 from .throttles import PasswordResetThrottle
 
+logger = logging.getLogger(__name__)
+
 
 # Create your views here.
 @api_view(['POST'])
@@ -63,6 +69,8 @@ def register_user(request):
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email'
+    # Anonymous cart to merge into the user's cart
+    cart_id = serializers.UUIDField(required=False, write_only=True)
 
     def validate(self, attrs):
         email = attrs.get('email')
@@ -77,6 +85,12 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
                 raise AuthenticationFailed("User account is inactive.")
 
             data = super().validate(attrs)
+            if attrs.get('cart_id'):
+                try:
+                    claim_anonymous_cart(attrs['cart_id'], user.id)
+                except Exception as e:
+                    # Logging in matters more than the cart
+                    logger.exception("Failed to merge cart %s for user %s: %s", attrs['cart_id'], user.id, e)
             data.update({
                 'email': user.email,
                 'first_name': user.first_name,
@@ -233,7 +247,7 @@ class BankListAPIView(APIView):
                     "Content-Type": "application/json"
                 }
 
-                response = requests.get(url, headers=headers)
+                response = http_client.get(url, headers=headers)
                 response.raise_for_status()
 
                 data = response.json()
@@ -270,7 +284,7 @@ class MobileMoneyListAPIView(APIView):
                     "Content-Type": "application/json"
                 }
 
-                response = requests.get(url, headers=headers)
+                response = http_client.get(url, headers=headers)
                 response.raise_for_status()
 
                 data = response.json()
@@ -315,7 +329,7 @@ class ValidateBankAccountAPIView(APIView):
                 "bank_code": bank_code
             }
 
-            response = requests.post(url, json=data, headers=headers)
+            response = http_client.post(url, json=data, headers=headers)
             response.raise_for_status()
 
             result = response.json()
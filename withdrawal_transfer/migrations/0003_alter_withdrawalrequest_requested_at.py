@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawal_transfer', '0002_withdrawalrequest_recipient_code'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='withdrawalrequest',
+            name='requested_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the withdrawal request was made'),
+        ),
+    ]
@@ -28,7 +28,7 @@ class WithdrawalRequest(models.Model):
     transaction_id = models.CharField(max_length=100, blank=True, null=True,
                                       help_text='Transaction ID from the payment gateway')
     failure_reason = models.TextField(blank=True, null=True, help_text='Reason for failure if the request fails')
-    requested_at = models.DateTimeField(auto_now_add=True, help_text='When the withdrawal request was made')
+    requested_at = models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the withdrawal request was made')
     completed_at = models.DateTimeField(auto_now_add=True, help_text='When the withdrawal request was completed')
 
     class Meta:
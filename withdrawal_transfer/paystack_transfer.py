@@ -2,6 +2,8 @@
 import requests
 import json
 from django.conf import settings
+
+from causehive_monolith import http_client
 from .models import WithdrawalRequest
 
 
@@ -40,7 +42,7 @@ class PaystackTransfer:
         }
 
         try:
-            response = requests.post(url, json=transfer_data, headers=headers)
+            response = http_client.post(url, json=transfer_data, headers=headers)
             return response.json()
         except requests.RequestException as e:
             return {
@@ -126,7 +128,7 @@ class PaystackTransfer:
         print(f"Recipient Data: {json.dumps(recipient_data, indent=2)}")
 
         try:
-            response = requests.post(url, json=recipient_data, headers=headers)
+            response = http_client.post(url, json=recipient_data, headers=headers)
             result = response.json()
 
             # Debug logging
@@ -176,7 +178,7 @@ class PaystackTransfer:
         }
 
         try:
-            response = requests.get(url, headers=headers)
+            response = http_client.get(url, headers=headers)
             return response.json()
         except requests.RequestException as e:
             return {
@@ -264,10 +264,11 @@ class WithdrawalStatisticsSerializerTestCase(TestCase):
         self.assertTrue(serializer.is_valid())
 
 
+@override_settings(SERVICE_RESOLVER_BACKEND='http')
 class WithdrawalUtilsTestCase(TestCase):
     """Test cases for withdrawal utility functions."""
 
-    @patch('withdrawal_transfer.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_user_with_service_success(self, mock_get):
         """Test successful user validation with service."""
         mock_response = MagicMock()
@@ -281,7 +282,7 @@ class WithdrawalUtilsTestCase(TestCase):
         self.assertEqual(result['id'], mock_response.json.return_value['id'])
         mock_get.assert_called_once()
 
-    @patch('withdrawal_transfer.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_user_with_service_not_found(self, mock_get):
         """Test user validation when user not found."""
         mock_response = MagicMock()
@@ -293,7 +294,7 @@ class WithdrawalUtilsTestCase(TestCase):
         with self.assertRaises(Exception):
             validate_user_with_service(user_id)
 
-    @patch('withdrawal_transfer.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_cause_with_service_success(self, mock_get):
         """Test successful cause validation with service."""
         user_id = uuid.uuid4()
@@ -313,7 +314,7 @@ class WithdrawalUtilsTestCase(TestCase):
         self.assertEqual(result['id'], str(cause_id))
         self.assertEqual(result['organizer_id'], str(user_id))
 
-    @patch('withdrawal_transfer.utils.requests.get')
+    @patch('causehive_monolith.service_resolver.http_client.get')
     def test_validate_cause_with_service_wrong_organizer(self, mock_get):
         """Test cause validation when user is not the organizer."""
         user_id = uuid.uuid4()
@@ -526,6 +527,51 @@ class WithdrawalRequestViewsTestCase(APITestCase):
     PAYSTACK_SECRET_KEY='test_secret_key',
     ADMIN_SERVICE_API_KEY='test_admin_key'
 )
+class IdempotentWithdrawalTestCase(APITestCase):
+    """Test cases for Idempotency-Key handling on withdrawal creation"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user_id = uuid.uuid4()
+        self.cause_id = uuid.uuid4()
+        self.withdrawal_data = {
+            'cause_id': str(self.cause_id),
+            'amount': '100.00',
+            'currency': 'GHS',
+        }
+
+    @patch('withdrawal_transfer.views.validate_withdrawal_request')
+    @patch('withdrawal_transfer.views.PaystackTransfer.initiate_transfer')
+    def test_retried_withdrawal_starts_one_transfer(self, mock_transfer, mock_validate):
+        """Test a retry with the same key gets the first response without a second transfer"""
+        mock_validate.return_value = {
+            'user_data': {'id': str(self.user_id)},
+            'cause_data': {'id': str(self.cause_id)},
+            'payment_info': {
+                'payment_method': 'bank_transfer',
+                'account_number': '1234567890',
+                'bank_code': '044',
+                'account_name': 'John Doe'
+            }
+        }
+        mock_transfer.return_value = {'status': True, 'data': {'reference': 'TRF-IDEM'}}
+        mock_user = MagicMock()
+        mock_user.id = self.user_id
+        self.client.force_authenticate(user=mock_user)
+
+        with patch('withdrawal_transfer.views.getattr') as mock_getattr:
+            mock_getattr.return_value = self.user_id
+            first = self.client.post('/api/withdrawals/', self.withdrawal_data, format='json', HTTP_IDEMPOTENCY_KEY='wd-1')
+            second = self.client.post('/api/withdrawals/', self.withdrawal_data, format='json', HTTP_IDEMPOTENCY_KEY='wd-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data['id'], first.data['id'])
+        mock_transfer.assert_called_once()
+        self.assertEqual(WithdrawalRequest.objects.count(), 1)
+
+
 class AdminWithdrawalViewsTestCase(APITestCase):
     """Test cases for admin withdrawal views."""
 
@@ -704,7 +750,7 @@ class AdminWithdrawalViewsTestCase(APITestCase):
 class PaystackTransferTestCase(TestCase):
     """Test cases for PaystackTransfer class."""
 
-    @patch('withdrawal_transfer.paystack_transfer.requests.post')
+    @patch('withdrawal_transfer.paystack_transfer.http_client.post')
     def test_initiate_transfer_success(self, mock_post):
         """Test successful transfer initiation."""
         # Mock recipient creation
@@ -743,7 +789,7 @@ class PaystackTransferTestCase(TestCase):
         withdrawal.refresh_from_db()
         self.assertEqual(withdrawal.recipient_code, 'RCP_1234567890')
 
-    @patch('withdrawal_transfer.paystack_transfer.requests.post')
+    @patch('withdrawal_transfer.paystack_transfer.http_client.post')
     def test_initiate_transfer_recipient_creation_failure(self, mock_post):
         """Test transfer initiation when recipient creation fails."""
         mock_response = MagicMock()
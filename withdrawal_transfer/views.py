@@ -8,6 +8,7 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 
 
+from donations.idempotency import run_idempotent
 from .models import WithdrawalRequest
 from .serializers import (
     WithdrawalRequestSerializer,
@@ -32,6 +33,13 @@ class WithdrawalRequestViewSet(viewsets.ModelViewSet):
         return WithdrawalRequest.objects.none()
 
     def create(self, request, *args, **kwargs):
+        """Create a withdrawal request; retries carrying the same Idempotency-Key get the first response."""
+        owner = getattr(request, 'user_id', None) or getattr(request.user, 'id', None)
+        return run_idempotent(
+            request, 'withdrawal_create', owner, lambda: self.create_withdrawal(request, *args, **kwargs)
+        )
+
+    def create_withdrawal(self, request, *args, **kwargs):
         """Create a withdrawal request with validation."""
         data = request.data.copy()
         user_id = getattr(request, 'user_id', None)